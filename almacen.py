@@ -0,0 +1,258 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+
+from db import get_pool
+
+logger = logging.getLogger('sgp.almacen')
+
+
+# --- Almacén de reportes direccionado por contenido ---
+# Cada archivo se guarda una sola vez bajo su sha256, repartido en dos
+# niveles de carpetas (objetos/ab/cd/abcd...). Las filas de reportes apuntan
+# al hash y objetos_reporte lleva la cuenta de referencias mediante
+# triggers; borrar un reporte es sólo un DELETE y el archivo lo recoge el
+# reconciliador cuando nadie lo usa.
+#
+# guardar() puede ver el archivo justo antes de que el reconciliador lo
+# borre. Por eso los dos lados se ordenan con el bloqueo de escritura de
+# SQLite: el reconciliador borra el archivo dentro de la transacción que
+# borra el registro, y quien referencia un objeto vuelve a comprobar el
+# archivo después de registrarlo, dentro de su transacción (ver asegurar).
+#
+# La columna hash, objetos_reporte y sus triggers los crea
+# migraciones/0009_almacen_reportes.py.
+
+# Objeto recién escrito: se registra antes de que alguna fila lo referencie
+REGISTRAR_OBJETO = '''
+    INSERT INTO objetos_reporte (hash, tamano, sin_referencias_desde) VALUES (?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(hash) DO NOTHING
+'''
+
+PATRON_HASH = re.compile(r'^[0-9a-f]{64}$')
+
+
+class AlmacenContenido:
+    def __init__(self, raiz):
+        self.raiz = os.path.abspath(raiz)
+        self.objetos = os.path.join(self.raiz, 'objetos')
+        self.temporales = os.path.join(self.raiz, 'tmp')
+        os.makedirs(self.objetos, exist_ok=True)
+        os.makedirs(self.temporales, exist_ok=True)
+
+    def ruta(self, digest):
+        return os.path.join(self.objetos, digest[:2], digest[2:4], digest)
+
+    def relativa(self, digest):
+        return os.path.relpath(self.ruta(digest), self.raiz)
+
+    def existe(self, digest):
+        return os.path.exists(self.ruta(digest))
+
+    def guardar(self, contenido):
+        """Escribe el contenido si no existe todavía. Devuelve (hash, tamaño).
+
+        La escritura va a un temporal en la misma partición que se renombra
+        al final: un lector nunca ve un archivo a medias.
+        """
+        digest = hashlib.sha256(contenido).hexdigest()
+        destino = self.ruta(digest)
+        if not os.path.exists(destino):
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            temporal = os.path.join(self.temporales, f'{digest}.{uuid.uuid4().hex}')
+            with open(temporal, 'wb') as f:
+                f.write(contenido)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, destino)
+        return digest, len(contenido)
+
+    def asegurar(self, conn, digest, contenido):
+        """Registra el objeto y garantiza que su archivo sigue en disco.
+
+        Se llama dentro de la transacción que insertará la fila que lo
+        referencia: tras REGISTRAR_OBJETO la conexión tiene el bloqueo de
+        escritura, así que el reconciliador ya no puede borrar el archivo
+        hasta el commit, y si lo borró antes se vuelve a escribir aquí.
+        """
+        conn.execute(REGISTRAR_OBJETO, (digest, len(contenido)))
+        if not self.existe(digest):
+            self.guardar(contenido)
+
+    def guardar_archivo(self, ruta):
+        with open(ruta, 'rb') as f:
+            return self.guardar(f.read())
+
+    def eliminar(self, digest):
+        try:
+            os.remove(self.ruta(digest))
+        except FileNotFoundError:
+            pass
+
+    def recorrer(self):
+        """(hash, ruta) de cada objeto almacenado."""
+        for carpeta, _, archivos in os.walk(self.objetos):
+            for archivo in archivos:
+                if PATRON_HASH.match(archivo):
+                    yield archivo, os.path.join(carpeta, archivo)
+
+
+class Reconciliador:
+    """Hilo de fondo que mantiene alineados el almacén y la tabla reportes.
+
+    En cada pasada:
+    - migra al almacén los reportes antiguos (sin hash) cuyo archivo existe
+      y borra los que apuntan a una ruta absoluta inexistente (las relativas
+      que no se encuentran se conservan, ver _candidatas);
+    - borra las filas cuyo objeto ya no está en disco;
+    - elimina los objetos sin referencias desde hace más de ``gracia``
+      segundos, los archivos que no están registrados y los temporales
+      abandonados.
+
+    ``gracia`` protege a los reportes que se están generando en ese momento:
+    el objeto se escribe y registra antes de que exista su fila.
+    """
+
+    def __init__(self, app, almacen, carpeta_anterior=None, intervalo=600, gracia=3600):
+        self.app = app
+        self.almacen = almacen
+        self.carpeta_anterior = carpeta_anterior
+        self.intervalo = intervalo
+        self.gracia = gracia
+        self._detener = threading.Event()
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        """Arranca el hilo si no está corriendo; se puede llamar en cada petición."""
+        if self._hilo is not None or not self.intervalo:
+            return
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._ciclo, name='reconciliador-reportes', daemon=True)
+                self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+
+    def _ciclo(self):
+        while not self._detener.wait(self.intervalo):
+            try:
+                self.ejecutar()
+            except Exception:
+                logger.exception("Falló la reconciliación de reportes")
+
+    def ejecutar(self):
+        """Una pasada completa. Devuelve un resumen de lo que se corrigió."""
+        resumen = {'migrados': 0, 'filas_eliminadas': 0, 'objetos_eliminados': 0, 'huerfanos_eliminados': 0}
+        limite = time.time() - self.gracia
+        with get_pool(self.app).connection() as conn:
+            self._migrar_anteriores(conn, resumen)
+            self._filas_colgantes(conn, resumen)
+            self._objetos_sin_referencias(conn, resumen)
+            registrados = {fila[0] for fila in conn.execute('SELECT hash FROM objetos_reporte')}
+            anteriores = {candidata for (ruta,) in conn.execute(
+                'SELECT ruta_archivo FROM reportes WHERE hash IS NULL') for candidata in self._candidatas(ruta)}
+
+        for digest, ruta in self.almacen.recorrer():
+            if digest not in registrados and os.path.getmtime(ruta) < limite:
+                os.remove(ruta)
+                resumen['huerfanos_eliminados'] += 1
+        for archivo in os.listdir(self.almacen.temporales):
+            ruta = os.path.join(self.almacen.temporales, archivo)
+            if os.path.getmtime(ruta) < limite:
+                os.remove(ruta)
+        if self.carpeta_anterior and os.path.isdir(self.carpeta_anterior):
+            # Archivos del esquema anterior (reportes/reporte_*.txt) sin fila
+            for archivo in os.listdir(self.carpeta_anterior):
+                ruta = os.path.join(self.carpeta_anterior, archivo)
+                if (archivo.startswith('reporte_') and os.path.isfile(ruta)
+                        and os.path.realpath(ruta) not in anteriores and os.path.getmtime(ruta) < limite):
+                    os.remove(ruta)
+                    resumen['huerfanos_eliminados'] += 1
+        if any(resumen.values()):
+            logger.info("Reconciliación de reportes: %s", resumen)
+        return resumen
+
+    def _candidatas(self, ruta):
+        """Rutas absolutas donde puede estar el archivo de una fila antigua.
+
+        Las rutas relativas se guardaron respecto al directorio de trabajo de
+        entonces (normalmente la raíz de la app, p. ej. 'reportes/x.txt'): se
+        buscan ahí y en la carpeta de reportes, nunca respecto al directorio
+        de trabajo actual.
+        """
+        if os.path.isabs(ruta):
+            return [os.path.realpath(ruta)]
+        candidatas = [os.path.join(self.app.root_path, ruta)]
+        if self.carpeta_anterior:
+            candidatas += [os.path.join(self.carpeta_anterior, ruta),
+                           os.path.join(self.carpeta_anterior, os.path.basename(ruta))]
+        return list(dict.fromkeys(os.path.realpath(c) for c in candidatas))
+
+    def _migrar_anteriores(self, conn, resumen):
+        # Varias filas antiguas pueden apuntar al mismo archivo: se migran
+        # juntas y el archivo se borra una sola vez, después de todas
+        por_archivo, faltantes, sin_resolver = {}, [], 0
+        for fila in conn.execute('SELECT id, ruta_archivo FROM reportes WHERE hash IS NULL').fetchall():
+            ruta = fila['ruta_archivo']
+            existente = next((c for c in self._candidatas(ruta) if os.path.isfile(c)), None)
+            if existente is not None:
+                por_archivo.setdefault(existente, []).append(fila['id'])
+            elif os.path.isabs(ruta):
+                faltantes.append(fila['id'])
+            else:
+                # Una ruta relativa que no se encuentra puede ser de otra
+                # instalación: la fila se conserva en lugar de borrarla
+                sin_resolver += 1
+        if sin_resolver:
+            logger.warning("%d reportes antiguos con ruta relativa sin archivo; se conservan", sin_resolver)
+        if faltantes:
+            with conn:
+                conn.executemany('DELETE FROM reportes WHERE id = ?', [(i,) for i in faltantes])
+            resumen['filas_eliminadas'] += len(faltantes)
+        for ruta, ids in por_archivo.items():
+            with open(ruta, 'rb') as f:
+                contenido = f.read()
+            digest, _ = self.almacen.guardar(contenido)
+            with conn:
+                self.almacen.asegurar(conn, digest, contenido)
+                conn.executemany('UPDATE reportes SET hash = ?, ruta_archivo = ? WHERE id = ?',
+                                 [(digest, self.almacen.relativa(digest), i) for i in ids])
+            resumen['migrados'] += len(ids)
+            # El archivo original ya no tiene filas; se borra en la misma pasada
+            os.remove(ruta)
+
+    def _filas_colgantes(self, conn, resumen):
+        faltantes = [digest for (digest,) in conn.execute(
+            'SELECT hash FROM objetos_reporte') if not self.almacen.existe(digest)]
+        if not faltantes:
+            return
+        with conn:
+            for digest in faltantes:
+                resumen['filas_eliminadas'] += conn.execute(
+                    'DELETE FROM reportes WHERE hash = ?', (digest,)).rowcount
+                conn.execute('DELETE FROM objetos_reporte WHERE hash = ?', (digest,))
+
+    def _objetos_sin_referencias(self, conn, resumen):
+        vencidos = [fila[0] for fila in conn.execute('''
+            SELECT hash FROM objetos_reporte
+            WHERE referencias <= 0 AND sin_referencias_desde < datetime('now', ?)
+        ''', (f'-{int(self.gracia)} seconds',))]
+        for digest in vencidos:
+            # El archivo se borra con el bloqueo de escritura tomado: la
+            # condición se vuelve a evaluar dentro de la transacción y quien
+            # registre el objeto después (asegurar) ya encuentra el archivo
+            # borrado y lo reescribe.
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                borrado = conn.execute(
+                    'DELETE FROM objetos_reporte WHERE hash = ? AND referencias <= 0', (digest,)).rowcount
+                if borrado:
+                    self.almacen.eliminar(digest)
+            if borrado:
+                resumen['objetos_eliminados'] += 1
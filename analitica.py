@@ -0,0 +1,251 @@
+import logging
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+logger = logging.getLogger('sgp.analitica')
+
+
+# --- Analítica de asistencia ---
+# Los pases de lista de la ventana (un año por omisión) se cargan en una
+# matriz alumno x día (1 presente, 0 falta, -1 sin sesión) y los indicadores
+# de todos los alumnos se calculan con operaciones de NumPy sobre la matriz
+# completa, sin recorrer alumno por alumno.
+#
+# La matriz vive en memoria del proceso. Cada consulta lee primero el tope de
+# secuencia_asistencias (ver sincronizacion.py): si no cambió, los
+# indicadores guardados siguen valiendo; si cambió, sólo se leen las marcas
+# con secuencia posterior y se parchan las celdas. Así, guardar un pase de
+# lista invalida el resultado en todos los procesos sin avisos explícitos.
+
+SIN_SESION = -1
+QUINCENA = 14
+MIN_SESIONES_QUINCENA = 3
+
+# Subconsulta por sesión en vez de JOIN + GROUP BY: recorre el índice de
+# fecha y el de asistencia_id sin ordenar millones de filas en un B-tree
+# temporal. idx_detalle_asistencia_presente_alumno cubre la subconsulta.
+CARGA = '''
+    SELECT a.fecha, (
+        SELECT group_concat(d.alumno_id * 2 + d.presente)
+        FROM detalle_asistencias d WHERE d.asistencia_id = a.id
+    )
+    FROM asistencias a
+    WHERE a.fecha BETWEEN ? AND ?
+'''
+
+CAMBIOS = '''
+    SELECT a.fecha, d.alumno_id, d.presente
+    FROM detalle_asistencias d
+    JOIN asistencias a ON a.id = d.asistencia_id
+    WHERE d.secuencia > ? AND d.secuencia <= ?
+'''
+
+ALUMNOS = '''
+    SELECT a.id, a.matricula, a.apellidos || ' ' || a.nombre, g.id, g.nombre, g.carrera_id
+    FROM alumnos a
+    JOIN grupos g ON g.id = a.grupo_id
+    WHERE a.id IN (SELECT value FROM json_each(?))
+'''
+
+
+def calcular(matriz, minimo_quincena=MIN_SESIONES_QUINCENA):
+    """Indicadores por fila de la matriz alumno x día.
+
+    La racha de faltas ignora los días sin sesión: se cuentan las faltas
+    acumuladas y se resta el acumulado que había en la última asistencia.
+    """
+    registrada = matriz != SIN_SESION
+    faltas_dia = matriz == 0
+    sesiones = registrada.sum(axis=1)
+    faltas = faltas_dia.sum(axis=1)
+
+    acumuladas = np.cumsum(faltas_dia, axis=1, dtype=np.int32)
+    en_ultima_asistencia = np.maximum.accumulate(np.where(matriz == 1, acumuladas, 0), axis=1)
+    racha = acumuladas - en_ultima_asistencia
+
+    # Ventanas de 14 días naturales terminando en cada día (diferencias de acumulados)
+    ceros = np.zeros((matriz.shape[0], 1), dtype=np.int32)
+    sesiones_acum = np.hstack([ceros, np.cumsum(registrada, axis=1, dtype=np.int32)])
+    faltas_acum = np.hstack([ceros, acumuladas])
+    ancho = min(QUINCENA, matriz.shape[1])
+    sesiones_q = sesiones_acum[:, ancho:] - sesiones_acum[:, :-ancho]
+    faltas_q = faltas_acum[:, ancho:] - faltas_acum[:, :-ancho]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tasa_q = np.where(sesiones_q >= minimo_quincena, faltas_q / sesiones_q, 0.0)
+
+    return {
+        'sesiones': sesiones,
+        'faltas': faltas,
+        'tasa_faltas': faltas / np.maximum(sesiones, 1),
+        'racha_max': racha.max(axis=1, initial=0),
+        'racha_actual': racha[:, -1] if matriz.shape[1] else np.zeros(len(matriz), np.int32),
+        'sesiones_quincena': sesiones_q[:, -1],
+        'tasa_quincena': np.where(sesiones_q[:, -1] > 0, faltas_q[:, -1] / np.maximum(sesiones_q[:, -1], 1), 0.0),
+        'tasa_quincena_max': tasa_q.max(axis=1, initial=0.0),
+    }
+
+
+class AnalisisAsistencia:
+    def __init__(self, dias=365):
+        self.dias = dias
+        self._lock = threading.Lock()
+        self._matriz = None
+        self._ids = np.empty(0, dtype=np.int64)        # alumno de cada fila
+        self._filas = np.empty(0, dtype=np.int64)      # alumno_id -> fila (-1 si no tiene)
+        self._inicio = None
+        self._token = None
+        self._indicadores = None
+        self._hilo = None
+        self.cargas = 0
+        self.parches = 0
+
+    def precalentar(self, pool):
+        """Carga la matriz en un hilo de fondo para que la primera consulta no la espere.
+
+        La carga de un año completo toma del orden de un segundo; se lanza al
+        iniciar cada worker. Si falla, la primera consulta vuelve a intentarla.
+        """
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._precalentar, args=(pool,),
+                                          name='precalentar-analitica', daemon=True)
+            self._hilo.start()
+
+    def _precalentar(self, pool):
+        inicio = time.perf_counter()
+        try:
+            with pool.connection() as conn:
+                ids, _, _ = self.indicadores(conn)
+        except Exception:
+            logger.exception("Falló la carga anticipada de la analítica de asistencia")
+            return
+        logger.info("Analítica de asistencia cargada: %d alumnos en %.0f ms",
+                    len(ids), (time.perf_counter() - inicio) * 1000)
+
+    def indicadores(self, conn, hoy=None):
+        """(ids, indicadores, token) de la ventana que termina en ``hoy``."""
+        hoy = hoy or date.today()
+        inicio = hoy - timedelta(days=self.dias - 1)
+        with self._lock:
+            # El tope se lee antes que las marcas: lo confirmado después tendrá
+            # una secuencia mayor y se aplicará en la siguiente consulta.
+            tope = conn.execute('SELECT valor FROM secuencia_asistencias WHERE id = 1').fetchone()[0]
+            if self._matriz is not None and inicio != self._inicio:
+                self._desplazar(inicio)
+            if self._matriz is None:
+                self._cargar(conn, inicio, tope)
+            elif tope != self._token:
+                self._aplicar_cambios(conn, tope)
+            if self._indicadores is None:
+                self._indicadores = calcular(self._matriz)
+            return self._ids, self._indicadores, self._token
+
+    def _cargar(self, conn, inicio, tope):
+        # Una fila por sesión con sus marcas concatenadas (alumno_id * 2 + presente):
+        # np.fromstring(sep=',') convierte el texto completo en C, mucho más
+        # rápido que millones de tuplas o que partir la cadena en Python. Ante
+        # un valor que no es entero se detiene sin error (sólo avisa), así que
+        # se compara con el número de marcas esperado.
+        fechas, marcas = [], []
+        fin = inicio + timedelta(days=self.dias - 1)
+        for fecha, concatenadas in conn.execute(CARGA, (inicio.isoformat(), fin.isoformat())):
+            if concatenadas is None:
+                continue
+            fechas.append((date.fromisoformat(fecha) - inicio).days)
+            marcas.append(concatenadas)
+        por_sesion = [m.count(',') + 1 for m in marcas]
+        valores = np.fromstring(','.join(marcas), dtype=np.int64, sep=',') if marcas else np.empty(0, np.int64)
+        if len(valores) != sum(por_sesion):
+            raise ValueError(f'Marcas de asistencia ilegibles: {len(valores)} de {sum(por_sesion)}')
+        dias = np.repeat(np.array(fechas, dtype=np.int32), por_sesion)
+        alumnos = valores >> 1
+
+        self._ids = np.flatnonzero(np.bincount(alumnos)) if len(alumnos) else np.empty(0, np.int64)
+        self._filas = np.full(int(self._ids[-1]) + 1 if len(self._ids) else 1, -1, dtype=np.int64)
+        self._filas[self._ids] = np.arange(len(self._ids))
+        self._matriz = np.full((len(self._ids), self.dias), SIN_SESION, dtype=np.int8)
+        self._matriz[self._filas[alumnos], dias] = valores & 1
+        self._inicio = inicio
+        self._token = tope
+        self._indicadores = None
+        self.cargas += 1
+
+    def _desplazar(self, inicio):
+        # Cambió el día: se descartan las columnas viejas sin volver a la base
+        corrimiento = (inicio - self._inicio).days
+        if not 0 < corrimiento < self.dias:
+            self._matriz = None
+            return
+        self._matriz = np.hstack([
+            self._matriz[:, corrimiento:],
+            np.full((len(self._ids), corrimiento), SIN_SESION, dtype=np.int8),
+        ])
+        self._inicio = inicio
+        self._indicadores = None
+
+    def _aplicar_cambios(self, conn, tope):
+        filas = conn.execute(CAMBIOS, (self._token, tope)).fetchall()
+        dias, alumnos, presentes = [], [], []
+        for fecha, alumno_id, presente in filas:
+            dia = (date.fromisoformat(fecha) - self._inicio).days
+            if 0 <= dia < self.dias:
+                dias.append(dia)
+                alumnos.append(alumno_id)
+                presentes.append(presente)
+        if alumnos:
+            alumnos = np.array(alumnos, dtype=np.int64)
+            self._agregar_alumnos(alumnos)
+            self._matriz[self._filas[alumnos], dias] = presentes
+            self._indicadores = None
+        self._token = tope
+        self.parches += 1
+
+    def _agregar_alumnos(self, alumnos):
+        if alumnos.max() >= len(self._filas):
+            self._filas = np.concatenate([self._filas, np.full(int(alumnos.max()) + 1 - len(self._filas), -1)])
+        nuevos = np.unique(alumnos[self._filas[alumnos] < 0])
+        if len(nuevos):
+            self._filas[nuevos] = np.arange(len(self._ids), len(self._ids) + len(nuevos))
+            self._ids = np.concatenate([self._ids, nuevos])
+            self._matriz = np.vstack([self._matriz, np.full((len(nuevos), self.dias), SIN_SESION, dtype=np.int8)])
+
+
+def alertas(conn, analisis, umbrales, grupo_id=None, carrera_id=None, limite=100):
+    """Alumnos en riesgo, del más al menos ausente, con los motivos de la alerta."""
+    ids, ind, token = analisis.indicadores(conn)
+    motivos = {
+        'faltas': (ind['tasa_faltas'] > umbrales['max_faltas']) & (ind['sesiones'] >= umbrales['min_sesiones']),
+        'racha': ind['racha_actual'] >= umbrales['racha'],
+        'quincena': (ind['tasa_quincena'] > umbrales['quincena'])
+                    & (ind['sesiones_quincena'] >= MIN_SESIONES_QUINCENA),
+    }
+    en_riesgo = np.flatnonzero(motivos['faltas'] | motivos['racha'] | motivos['quincena'])
+    # Más faltas primero; a igual tasa, la racha actual más larga
+    orden = en_riesgo[np.lexsort((-ind['racha_actual'][en_riesgo], -ind['tasa_faltas'][en_riesgo]))]
+
+    datos = {fila[0]: fila for fila in conn.execute(ALUMNOS, (
+        '[' + ','.join(str(i) for i in ids[orden].tolist()) + ']',))}
+    resultado = []
+    for i in orden.tolist():
+        alumno = datos.get(int(ids[i]))
+        # Alumnos dados de baja o fuera del filtro
+        if alumno is None or (grupo_id is not None and alumno[3] != grupo_id) \
+                or (carrera_id is not None and alumno[5] != carrera_id):
+            continue
+        resultado.append({
+            'id': alumno[0],
+            'matricula': alumno[1],
+            'nombre': alumno[2],
+            'grupo': {'id': alumno[3], 'nombre': alumno[4]},
+            'sesiones': int(ind['sesiones'][i]),
+            'faltas': int(ind['faltas'][i]),
+            'tasa_faltas': round(float(ind['tasa_faltas'][i]), 3),
+            'racha_actual': int(ind['racha_actual'][i]),
+            'racha_max': int(ind['racha_max'][i]),
+            'tasa_quincena': round(float(ind['tasa_quincena'][i]), 3),
+            'tasa_quincena_max': round(float(ind['tasa_quincena_max'][i]), 3),
+            'motivos': [nombre for nombre, marca in motivos.items() if marca[i]],
+        })
+    return {'token': token, 'total': len(resultado), 'alumnos': resultado[:limite]}
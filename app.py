@@ -1,204 +1,90 @@
 from flask import Flask, render_template, request, redirect, session, url_for, flash, jsonify
+from flask import Response, stream_with_context, Blueprint, current_app, make_response
+from markupsafe import Markup
+from werkzeug.middleware.proxy_fix import ProxyFix
 import sqlite3
-from werkzeug.security import generate_password_hash, check_password_hash
+import math
 import os
+import threading
 import uuid
+import hashlib
+import json
+import logging
 from datetime import datetime
 from io import BytesIO
 from flask import send_file
 import tempfile
 from flask import send_from_directory
-from datetime import datetime 
+from datetime import date, datetime
+from db import get_db, get_pool, init_app as init_db_app  # noqa: F401 (los benchmarks lo importan de aquí)
+from campus import PRINCIPAL, campus_actual, enrutador, get_campus_db, init_app as init_campus
+import click
+import migraciones
+from semillas import sembrar, sembrar_catalogo
+import zipfile
+from concurrent.futures import TimeoutError as FuturoTimeout
+import analitica
+import estadisticas
+import eventos
+import exportacion
+import observaciones as obs
+import proyectos as proyectos_db
+import sincronizacion
+from metricas import init_app as init_metricas
+from cache import CacheTTL, respuesta_cacheada
+from importacion import importar, leer_csv, leer_xlsx
+from trabajos_reporte import ColaReportes, cerrar_interrumpidos
+from almacen import AlmacenContenido, Reconciliador
+from estaticos import estatico, init_app as init_estaticos
+from autenticacion import claves_intento, crear_limitador, verificar
+from pdf_asistencia import GeneradorPDF, datos_asistencia, huella
+from asistencias import (
+    HISTORIAL_LIMITE, AsistenciaInvalida, guardar_lista, historial, hoja_asistencia, normalizar_payload
+)
 
 
-# --- Inicialización de la app y configuración ---
-app = Flask(__name__)
-app.secret_key = 'tu_clave_secreta'
+logger = logging.getLogger('sgp.app')
 
-# Configuración
-REPORTES_FOLDER = os.path.join(os.path.dirname(__file__), 'reportes')
-os.makedirs(REPORTES_FOLDER, exist_ok=True)
 
+# --- Rutas ---
+# Las rutas se registran en un blueprint y la app se arma en create_app();
+# importar este módulo no abre la base de datos.
+bp = Blueprint('sgp', __name__, cli_group=None)
 
-# --- Inicializar la base de datos ---
-def init_db():
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
 
-    # Tabla de administradores
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS admin (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL
-        )
-    ''')
-
-    # Tabla de observaciones
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS observaciones (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            texto TEXT NOT NULL,
-            fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS proyectos (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        nombre TEXT NOT NULL,
-        descripcion TEXT,
-        estado TEXT DEFAULT 'Sin iniciar',
-        responsable TEXT,
-        fecha_inicio TEXT,
-        avance TEXT DEFAULT '0%',
-        inversion TEXT,
-        recursos TEXT,
-        ultima_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-''')
-    # Tabla de reportes
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS reportes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            proyecto_id INTEGER NOT NULL,
-            nombre_archivo TEXT NOT NULL,
-            ruta_archivo TEXT NOT NULL,
-            fecha_generacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            tipo TEXT NOT NULL,
-            FOREIGN KEY (proyecto_id) REFERENCES proyectos (id)
-        )
-    ''')
-    # Tabla de carreras
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS carreras (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nombre TEXT NOT NULL UNIQUE,
-            codigo TEXT NOT NULL UNIQUE
-        )
-    ''')
-
-    # Tabla de grupos
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS grupos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            carrera_id INTEGER NOT NULL,
-            nombre TEXT NOT NULL,
-            codigo TEXT NOT NULL UNIQUE,
-            FOREIGN KEY (carrera_id) REFERENCES carreras (id)
-        )
-    ''')
-
-    # Tabla de alumnos
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS alumnos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            grupo_id INTEGER NOT NULL,
-            matricula TEXT NOT NULL UNIQUE,
-            apellidos TEXT NOT NULL,
-            nombre TEXT NOT NULL,
-            FOREIGN KEY (grupo_id) REFERENCES grupos (id)
-        )
-    ''')
-
-    # Tabla de asistencias
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS asistencias (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            grupo_id INTEGER NOT NULL,
-            fecha DATE NOT NULL,
-            FOREIGN KEY (grupo_id) REFERENCES grupos (id),
-            UNIQUE(grupo_id, fecha)
-        )
-    ''')
-
-    # Tabla de detalle_asistencias
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS detalle_asistencias (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            asistencia_id INTEGER NOT NULL,
-            alumno_id INTEGER NOT NULL,
-            presente BOOLEAN NOT NULL DEFAULT 0,
-            FOREIGN KEY (asistencia_id) REFERENCES asistencias (id),
-            FOREIGN KEY (alumno_id) REFERENCES alumnos (id),
-            UNIQUE(asistencia_id, alumno_id)
-        )
-    ''')
+def catalogo_cache():
+    return current_app.extensions['catalogo_cache']
 
-    # Insertar datos iniciales
-    insertar_datos_iniciales(cursor)
 
-        # Crear admin por defecto
-    cursor.execute('''
-        INSERT OR IGNORE INTO admin (username, password)
-        VALUES (?, ?)
-    ''', ('ADMIN', generate_password_hash('Admin123!')))
-    
-    cursor.execute('SELECT COUNT(*) FROM proyectos')
-    if cursor.fetchone()[0] == 0:
-        proyectos_base = [
-            (1, 'Bomba/Sistema de Riego', 'Sistema de riego automatizado para el invernadero'),
-            (2, 'Hidroponía', 'Cultivo de plantas usando soluciones minerales en lugar de suelo agrícola'),
-            (3, 'Composta', 'Producción de abono orgánico'),
-            (4, 'Germinación', 'Proceso de desarrollo de plantas a partir de semillas'),
-            (5, 'Iluminación', 'Sistema de iluminación para el invernadero'),
-            (6, 'Hotel de Insectos', 'Estructura para albergar insectos beneficiosos'),
-            (7, 'Producto Pomada', 'Elaboración de pomadas con plantas medicinales'),
-            (8, 'Eólico', 'Sistema de energía eólica para el invernadero'),
-            (9, 'Mantenimiento', 'Mantenimiento general del invernadero')
-        ]
-        cursor.executemany('''
-            INSERT INTO proyectos (id, nombre, descripcion)
-            VALUES (?, ?, ?)
-        ''', proyectos_base)
-
-    conn.commit()
-    conn.close()
-    
-    
+def cola_reportes():
+    return current_app.extensions['cola_reportes']
 
 
+def almacen_reportes():
+    return current_app.extensions['almacen_reportes']
 
-def insertar_datos_iniciales(cursor):
-    # Insertar carreras
-    carreras = [
-        ('Ingeniería en Software', 'IS'),
-        ('Ingeniería en Manufactura', 'ITM'),
-        ('Ingeniería Mecánica A', 'IMA')
-    ]
-    cursor.executemany('INSERT OR IGNORE INTO carreras (nombre, codigo) VALUES (?, ?)', carreras)
-
-    # Obtener IDs de carreras
-    cursor.execute('SELECT id, codigo FROM carreras')
-    carrera_ids = {codigo: id for id, codigo in cursor.fetchall()}
-
-    # Insertar grupos
-    grupos = [
-        (carrera_ids['IS'], '1925° IS - INGENIERÍA DE SOFTWARE', 'IS-1925'),
-        (carrera_ids['IS'], '2925° IS - INGENIERÍA DE SOFTWARE', 'IS-2925'),
-        (carrera_ids['IS'], '3925° IS - INGENIERÍA DE SOFTWARE', 'IS-3925'),
-        (carrera_ids['ITM'], '1625° ITM - Ingeniería en Manufactura', 'ITM-1625'),
-        (carrera_ids['ITM'], '1325° ITM - Ingeniería en Manufactura', 'ITM-1325'),
-        (carrera_ids['ITM'], '2326° ITM - Ingeniería en Manufactura', 'ITM-2326'),
-        (carrera_ids['IMA'], '1925° IMA - Ingeniería Mecánica A', 'IMA-1925'),
-        (carrera_ids['IMA'], '2325° IMA - Ingeniería Mecánica A', 'IMA-2325'),
-        (carrera_ids['IMA'], '3325° IMA - Ingeniería Mecánica A', 'IMA-3325')
-    ]
-    cursor.executemany('INSERT OR IGNORE INTO grupos (carrera_id, nombre, codigo) VALUES (?, ?, ?)', grupos)
-
-    cursor.execute('SELECT id FROM grupos WHERE codigo = "IS-1925"')
-    grupo_id = cursor.fetchone()[0]
-    
-    alumnos_ejemplo = [
-        (grupo_id, 'A12345', 'Pérez', 'Juan'),
-        (grupo_id, 'A54321', 'García', 'María')
-    ]
-    cursor.executemany('INSERT OR IGNORE INTO alumnos (grupo_id, matricula, apellidos, nombre) VALUES (?, ?, ?, ?)', alumnos_ejemplo)
-    
-    
-init_db()
 
-# --- Rutas ---
-@app.route('/', methods=['GET', 'POST'])
+def limitador_login():
+    return current_app.extensions['limitador_login']
+
+
+def analisis_asistencia():
+    return current_app.extensions['analisis_asistencia'][campus_actual()]
+
+
+def alertas_cache():
+    return current_app.extensions['alertas_cache']
+
+
+def publicar_evento(tipo, datos):
+    current_app.extensions['eventos'].publicar(tipo, datos)
+
+
+def generador_pdf():
+    return current_app.extensions['generador_pdf']
+
+
+@bp.route('/', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
         username = request.form.get('username', '').strip().upper()
@@ -208,57 +94,67 @@ def login():
             flash("Por favor, completa todos los campos.", "warning")
             return render_template('login.html')
 
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, password FROM admin WHERE username = ?', (username,))
-        admin = cursor.fetchone()
-        conn.close()
-        
-        if admin and check_password_hash(admin[1], password):
-            session['admin_id'] = admin[0]
+        # El límite se revisa antes de tocar la base o calcular el hash
+        limitador = limitador_login()
+        claves = claves_intento(username, request.remote_addr)
+        espera = limitador.espera(claves)
+        if espera:
+            flash(f"Demasiados intentos fallidos. Intenta de nuevo en {math.ceil(espera / 60)} min.", "danger")
+            respuesta = make_response(render_template('login.html'), 429)
+            respuesta.headers['Retry-After'] = str(math.ceil(espera))
+            return respuesta
+
+        conn = get_db()
+        admin = conn.execute('SELECT id, username, password FROM admin WHERE username = ?', (username,)).fetchone()
+
+        if admin and verificar(conn, admin, password, current_app.config['PASSWORD_METODO']):
+            limitador.exito(claves)
+            session.clear()
+            # La identidad va en la sesión firmada: /api/user-info no consulta la base
+            session['admin_id'] = admin['id']
+            session['admin_usuario'] = admin['username']
             flash("Inicio de sesión exitoso.", "success")
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('.dashboard'))
         else:
+            limitador.fallo(claves)
             flash("Acceso denegado. Credenciales incorrectas.", "danger")
 
     return render_template('login.html')
 
-@app.route('/dashboard')
+@bp.route('/dashboard')
 def dashboard():
     if 'admin_id' not in session:
         flash("Inicia sesión para acceder.", "warning")
-        return redirect(url_for('login'))
+        return redirect(url_for('.login'))
     return render_template('dashboard.html')
 
-@app.route('/asistencia')
+@bp.route('/asistencia')
 def asistencia():
     if 'admin_id' not in session:
         flash("Acceso restringido. Inicia sesión.", "warning")
-        return redirect(url_for('login'))
+        return redirect(url_for('.login'))
     return render_template('asistencia.html')
 
-@app.route('/proyectos')
+@bp.route('/proyectos')
 def proyectos():
     if 'admin_id' not in session:
         flash("Acceso restringido. Inicia sesión.", "warning")
-        return redirect(url_for('login'))
+        return redirect(url_for('.login'))
     
     # Obtener todos los proyectos de la base de datos
-    with sqlite3.connect('database.db') as conn:
-        conn.row_factory = sqlite3.Row
+    with get_db() as conn:
         proyectos = conn.execute('SELECT * FROM proyectos ORDER BY id').fetchall()
     
     return render_template('proyectos.html', proyectos=proyectos)
 
-@app.route('/reportes')
+@bp.route('/reportes')
 def reportes():
     if 'admin_id' not in session:
         flash("Acceso restringido. Inicia sesión.", "warning")
-        return redirect(url_for('login'))
+        return redirect(url_for('.login'))
     
     # Obtener todos los reportes
-    with sqlite3.connect('database.db') as conn:
-        conn.row_factory = sqlite3.Row
+    with get_db() as conn:
         reportes = conn.execute('''
             SELECT r.*, p.nombre as proyecto_nombre 
             FROM reportes r
@@ -268,35 +164,51 @@ def reportes():
     
     return render_template('reportes.html', reportes=reportes)
 
-@app.route('/observaciones', methods=['GET', 'POST'])
+@bp.route('/observaciones', methods=['GET', 'POST'])
 def observaciones():
     if 'admin_id' not in session:
         flash("Acceso restringido. Inicia sesión.", "warning")
-        return redirect(url_for('login'))
+        return redirect(url_for('.login'))
 
     if request.method == 'POST':
         texto = request.form.get('observacion', '').strip()
         if texto:
-            with sqlite3.connect('database.db') as conn:
+            with get_db() as conn:
                 conn.execute('INSERT INTO observaciones (texto, fecha) VALUES (?, datetime("now"))', (texto,))
             flash("Observación guardada correctamente.", "success")
-            return redirect(url_for('observaciones'))
+            return redirect(url_for('.observaciones'))
+
+    try:
+        lista, siguiente = obs.pagina(get_db(), cursor=request.args.get('cursor'))
+    except obs.CursorInvalido:
+        return redirect(url_for('.observaciones'))
 
-    with sqlite3.connect('database.db') as conn:
-        conn.row_factory = sqlite3.Row
-        observaciones = conn.execute('SELECT texto, fecha FROM observaciones ORDER BY fecha DESC').fetchall()
+    return render_template('observaciones.html', observaciones=lista, siguiente=siguiente)
 
-    return render_template('observaciones.html', observaciones=observaciones)
+# Búsqueda de texto completo en observaciones
+@bp.route('/api/observaciones/buscar')
+def buscar_observaciones():
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    try:
+        resultados, siguiente = obs.buscar(
+            get_db(),
+            request.args.get('q', ''),
+            cursor=request.args.get('cursor'),
+            limite=request.args.get('limite', obs.POR_PAGINA, type=int)
+        )
+    except obs.CursorInvalido as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"items": resultados, "siguiente": siguiente})
 
 
 
-@app.route('/get-proyecto/<int:proyecto_id>')
+@bp.route('/get-proyecto/<int:proyecto_id>')
 def get_proyecto(proyecto_id):
-    with sqlite3.connect('database.db') as conn:
-        conn.row_factory = sqlite3.Row
+    with get_db() as conn:
         proyecto = conn.execute('''
             SELECT id, nombre, descripcion, estado, responsable, 
-                   fecha_inicio, avance, inversion, recursos 
+                   fecha_inicio, avance, inversion, recursos, version
             FROM proyectos WHERE id = ?
         ''', (proyecto_id,)).fetchone()
     
@@ -304,296 +216,849 @@ def get_proyecto(proyecto_id):
         return jsonify(dict(proyecto))
     return jsonify({"error": "Proyecto no encontrado"}), 404
 
-@app.route('/actualizar-proyecto/<int:proyecto_id>', methods=['POST'])
+@bp.route('/actualizar-proyecto/<int:proyecto_id>', methods=['POST'])
 def actualizar_proyecto(proyecto_id):
+    if 'admin_id' not in session:
+        return jsonify({"success": False, "error": "No autenticado"}), 401
+    datos = request.get_json(silent=True)
     try:
-        datos = request.get_json()
-        if not datos:
-            return jsonify({"success": False, "error": "Datos no proporcionados"}), 400
-        
-        with sqlite3.connect('database.db') as conn:
-            cursor = conn.cursor()
-            
-            # Construir la consulta dinámicamente
-            set_clause = ', '.join([f"{key} = ?" for key in datos.keys()])
-            valores = list(datos.values())
-            valores.append(proyecto_id)
-            
-            cursor.execute(
-                f"UPDATE proyectos SET {set_clause} WHERE id = ?",
-                valores
-            )
-            
-            conn.commit()
-            return jsonify({"success": True})
-            
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
-    
-@app.route('/generar-reporte/<int:proyecto_id>')
-def generar_reporte(proyecto_id):
-    try:
-        # 1. Obtener datos del proyecto
-        with sqlite3.connect('database.db') as conn:
-            conn.row_factory = sqlite3.Row
-            proyecto = conn.execute('SELECT * FROM proyectos WHERE id = ?', (proyecto_id,)).fetchone()
-        
-        if not proyecto:
-            return jsonify({"success": False, "error": "Proyecto no encontrado"}), 404
+        # version es opcional aquí; si se envía, el cambio usa bloqueo optimista
+        version = proyectos_db.normalizar_version(datos.pop('version', None)) if isinstance(datos, dict) else None
+        cambios = proyectos_db.normalizar_cambios(datos)
+    except proyectos_db.ProyectoInvalido as e:
+        return jsonify({"success": False, "error": str(e)}), 400
 
-        # 2. Crear archivo de reporte (ejemplo en texto plano)
-        nombre_archivo = f"reporte_{proyecto['nombre']}_{datetime.now().strftime('%Y%m%d')}.txt"
-        ruta_archivo = os.path.join(REPORTES_FOLDER, nombre_archivo)
-        
-        with open(ruta_archivo, 'w', encoding='utf-8') as f:
-            f.write(f"Reporte del proyecto: {proyecto['nombre']}\n")
-            f.write(f"Estado: {proyecto['estado']}\n")
-            f.write(f"Avance: {proyecto['avance']}\n")
-            f.write(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-
-        # 3. Registrar en BD
-        with sqlite3.connect('database.db') as conn:
-            conn.execute('''
-                INSERT INTO reportes (proyecto_id, nombre_archivo, ruta_archivo, tipo)
-                VALUES (?, ?, ?, ?)
-            ''', (proyecto_id, nombre_archivo, ruta_archivo, 'texto'))
-            conn.commit()
+    try:
+        nueva_version = proyectos_db.actualizar(get_db(), proyecto_id, cambios, version)
+    except proyectos_db.ProyectoNoEncontrado as e:
+        return jsonify({"success": False, "error": str(e)}), 404
+    except proyectos_db.ConflictoVersion as e:
+        return jsonify({"success": False, "error": str(e), "conflictos": e.conflictos}), 409
+    publicar_evento('proyecto', {"id": proyecto_id, "version": nueva_version, "cambios": cambios})
+    return jsonify({"success": True, "version": nueva_version})
 
-        # 4. Devolver el archivo para descarga
-        return send_from_directory(
-            directory=REPORTES_FOLDER,
-            path=nombre_archivo,
-            as_attachment=True
-        )
+# Actualización de varios proyectos en una transacción (revisión semanal)
+@bp.route('/api/proyectos/lote', methods=['POST'])
+def actualizar_proyectos_lote():
+    if 'admin_id' not in session:
+        return jsonify({"success": False, "error": "No autenticado"}), 401
+    try:
+        lote = proyectos_db.normalizar_lote(request.get_json(silent=True))
+    except proyectos_db.ProyectoInvalido as e:
+        return jsonify({"success": False, "error": str(e)}), 400
 
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
-    
-@app.route('/eliminar-reporte/<int:reporte_id>', methods=['DELETE'])
-def eliminar_reporte(reporte_id):
     try:
-    
-        with sqlite3.connect('database.db') as conn:
-            conn.row_factory = sqlite3.Row
-            reporte = conn.execute('SELECT ruta_archivo FROM reportes WHERE id = ?', (reporte_id,)).fetchone()
-            
-            if reporte:
-                # Eliminar archivo físico
-                if os.path.exists(reporte['ruta_archivo']):
-                    os.remove(reporte['ruta_archivo'])
-                
-                # Eliminar registro de BD
-                conn.execute('DELETE FROM reportes WHERE id = ?', (reporte_id,))
-                conn.commit()
-                return jsonify({"success": True})
-            
-            return jsonify({"success": False, "error": "Reporte no encontrado"}), 404
-            
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        versiones = proyectos_db.actualizar_lote(get_db(), lote)
+    except proyectos_db.ProyectoNoEncontrado as e:
+        return jsonify({"success": False, "error": str(e), "ids": e.ids}), 404
+    except proyectos_db.ConflictoVersion as e:
+        return jsonify({"success": False, "error": str(e), "conflictos": e.conflictos}), 409
+    for proyecto_id, _, cambios in lote:
+        publicar_evento('proyecto', {"id": proyecto_id, "version": versiones[proyecto_id], "cambios": cambios})
+    return jsonify({"success": True, "proyectos": [
+        {"id": proyecto_id, "version": version} for proyecto_id, version in versiones.items()
+    ]})
 
+# Agregados de todos los proyectos en una sola consulta
+@bp.route('/api/proyectos/resumen')
+def resumen_proyectos():
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    return jsonify(proyectos_db.resumen(get_db()))
 
+# Evolución de estado, avance e inversión de un proyecto
+@bp.route('/api/proyectos/<int:proyecto_id>/historial')
+def historial_proyecto(proyecto_id):
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    return jsonify(proyectos_db.historial(get_db(), proyecto_id, request.args.get('desde')))
 
-@app.route('/api/carreras/<int:carrera_id>/grupos')
-def get_grupos_carrera(carrera_id):
-    with sqlite3.connect('database.db') as conn:
-        conn.row_factory = sqlite3.Row
-        grupos = conn.execute('''
-            SELECT * FROM grupos 
-            WHERE carrera_id = ?
-            ORDER BY nombre
-        ''', (carrera_id,)).fetchall()
-    return jsonify([dict(grupo) for grupo in grupos])
+@bp.route('/generar-reporte', methods=['POST'])
+@bp.route('/generar-reporte/<int:proyecto_id>', methods=['POST'])
+def generar_reporte(proyecto_id=None):
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    conn = get_db()
+    if proyecto_id is not None:
+        if not conn.execute('SELECT 1 FROM proyectos WHERE id = ?', (proyecto_id,)).fetchone():
+            return jsonify({"success": False, "error": "Proyecto no encontrado"}), 404
+
+    trabajo_id = cola_reportes().encolar(conn, proyecto_id)
+    return jsonify({
+        "success": True,
+        "trabajo_id": trabajo_id,
+        "estado_url": url_for('.estado_trabajo_reporte', trabajo_id=trabajo_id)
+    }), 202
+
+@bp.route('/api/trabajos-reporte/<trabajo_id>')
+def estado_trabajo_reporte(trabajo_id):
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    trabajo = cola_reportes().estado(get_db(), trabajo_id)
+    if trabajo is None:
+        return jsonify({"error": "Trabajo no encontrado"}), 404
+    for reporte in trabajo['reportes']:
+        reporte['url'] = url_for('.descargar_reporte', reporte_id=reporte['id'])
+    return jsonify(trabajo)
+
+@bp.route('/descargar-reporte/<int:reporte_id>')
+def descargar_reporte(reporte_id):
+    if 'admin_id' not in session:
+        return jsonify({"success": False, "error": "No autenticado"}), 401
+    reporte = get_db().execute(
+        'SELECT nombre_archivo, ruta_archivo, hash FROM reportes WHERE id = ?', (reporte_id,)
+    ).fetchone()
+    if not reporte:
+        return jsonify({"success": False, "error": "Reporte no encontrado"}), 404
+    if reporte['hash'] is None:
+        # Reporte anterior al almacén; el reconciliador lo migrará
+        return send_from_directory(
+            directory=current_app.config['REPORTES_FOLDER'],
+            path=os.path.basename(reporte['ruta_archivo']),
+            as_attachment=request.args.get('ver') is None
+        )
 
+    ruta = almacen_reportes().ruta(reporte['hash'])
+    if not os.path.exists(ruta):
+        return jsonify({"success": False, "error": "Archivo del reporte no disponible"}), 404
+    # El contenido de un hash nunca cambia: ETag fijo y soporte de Range (206)
+    return send_file(
+        ruta,
+        mimetype='text/plain',
+        as_attachment=request.args.get('ver') is None,
+        download_name=reporte['nombre_archivo'],
+        etag=reporte['hash'],
+        conditional=True,
+        max_age=86400
+    )
+
+# Sólo se borra la fila; el archivo lo elimina el reconciliador cuando ningún
+# otro reporte con el mismo contenido lo referencia.
+@bp.route('/eliminar-reporte/<int:reporte_id>', methods=['DELETE'])
+def eliminar_reporte(reporte_id):
+    if 'admin_id' not in session:
+        return jsonify({"success": False, "error": "No autenticado"}), 401
+    with get_db() as conn:
+        borrado = conn.execute('DELETE FROM reportes WHERE id = ?', (reporte_id,)).rowcount
+    if not borrado:
+        return jsonify({"success": False, "error": "Reporte no encontrado"}), 404
+    return jsonify({"success": True})
 
 
 # API para obtener información del usuario
-@app.route('/api/user-info')
+@bp.route('/api/user-info')
 def get_user_info():
     if 'admin_id' not in session:
         return jsonify({"error": "No autenticado"}), 401
-    
-    with sqlite3.connect('database.db') as conn:
-        conn.row_factory = sqlite3.Row
-        user = conn.execute('SELECT username FROM admin WHERE id = ?', (session['admin_id'],)).fetchone()
-    
+
+    usuario = session.get('admin_usuario')
+    if usuario is None:
+        # Sesiones iniciadas antes de guardar el usuario en ellas
+        user = get_db().execute('SELECT username FROM admin WHERE id = ?', (session['admin_id'],)).fetchone()
+        if user is None:
+            session.clear()
+            return jsonify({"error": "No autenticado"}), 401
+        usuario = session['admin_usuario'] = user['username']
+
     return jsonify({
-        "username": user['username'],
-        "nombre": user['username'] 
+        "username": usuario,
+        "nombre": usuario
     })
 
-# API para obtener carreras y grupos
+# API para obtener carreras y grupos (con caché en proceso y ETag)
+def invalidar_catalogo(prefijo=''):
+    catalogo_cache().invalidar(f'{campus_actual()}:{prefijo}')
+
 # Obtener todas las carreras
-@app.route('/api/carreras')
+@bp.route('/api/carreras')
 def get_carreras():
-    with sqlite3.connect('database.db') as conn:
-        conn.row_factory = sqlite3.Row
-        carreras = conn.execute('SELECT * FROM carreras ORDER BY nombre').fetchall()
-    return jsonify([dict(carrera) for carrera in carreras])
+    def consultar():
+        carreras = get_campus_db().execute('SELECT * FROM carreras ORDER BY nombre').fetchall()
+        return [dict(carrera) for carrera in carreras]
+    return respuesta_cacheada(catalogo_cache(), f'{campus_actual()}:carreras', consultar)
 
 # Obtener grupos por carrera
-@app.route('/api/grupos/<int:carrera_id>')
+@bp.route('/api/grupos/<int:carrera_id>')
+@bp.route('/api/carreras/<int:carrera_id>/grupos')
 def get_grupos(carrera_id):
-    with sqlite3.connect('database.db') as conn:
-        conn.row_factory = sqlite3.Row
-        grupos = conn.execute('''
+    def consultar():
+        grupos = get_campus_db().execute('''
             SELECT * FROM grupos 
             WHERE carrera_id = ?
             ORDER BY nombre
         ''', (carrera_id,)).fetchall()
-    return jsonify([dict(grupo) for grupo in grupos])
+        return [dict(grupo) for grupo in grupos]
+    return respuesta_cacheada(catalogo_cache(), f'{campus_actual()}:grupos:{carrera_id}', consultar)
 
 # Obtener alumnos por grupo
-@app.route('/api/alumnos/<int:grupo_id>')
+@bp.route('/api/alumnos/<int:grupo_id>')
 def get_alumnos(grupo_id):
-    with sqlite3.connect('database.db') as conn:
-        conn.row_factory = sqlite3.Row
-        alumnos = conn.execute('''
+    def consultar():
+        alumnos = get_campus_db().execute('''
             SELECT * FROM alumnos 
             WHERE grupo_id = ?
             ORDER BY apellidos, nombre
         ''', (grupo_id,)).fetchall()
-    return jsonify([dict(alumno) for alumno in alumnos])
+        return [dict(alumno) for alumno in alumnos]
+    return respuesta_cacheada(catalogo_cache(), f'{campus_actual()}:alumnos:{grupo_id}', consultar)
+
+# Estadísticas de la caché de catálogos
+@bp.route('/api/cache-catalogos')
+def get_cache_catalogos():
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    return jsonify(catalogo_cache().estadisticas())
 
 # Añadir nuevo alumno
-@app.route('/api/alumnos', methods=['POST'])
+@bp.route('/api/alumnos', methods=['POST'])
 def add_alumno():
     data = request.get_json()
     try:
-        with sqlite3.connect('database.db') as conn:
+        with get_campus_db() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO alumnos (grupo_id, matricula, apellidos, nombre)
                 VALUES (?, ?, ?, ?)
             ''', (data['grupo_id'], data['matricula'], data['apellidos'], data['nombre']))
             conn.commit()
+        invalidar_catalogo(f"alumnos:{data['grupo_id']}")
         return jsonify({"success": True, "id": cursor.lastrowid})
     except sqlite3.IntegrityError:
         return jsonify({"success": False, "error": "Matrícula ya existe"}), 400
 
+# Importar alumnos desde CSV o XLSX
+@bp.route('/api/alumnos/importar', methods=['POST'])
+def importar_alumnos():
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    archivo = request.files.get('archivo')
+    if not archivo or not archivo.filename:
+        return jsonify({"success": False, "error": "Archivo no proporcionado"}), 400
+
+    formato = request.form.get('formato') or archivo.filename.rsplit('.', 1)[-1].lower()
+    try:
+        if formato == 'csv':
+            filas = leer_csv(archivo.stream)
+        elif formato == 'xlsx':
+            filas = leer_xlsx(archivo.stream)
+        else:
+            return jsonify({"success": False, "error": "Formato no soportado (csv o xlsx)"}), 400
+        resultado = importar(get_campus_db(), filas)
+    except (ValueError, KeyError, zipfile.BadZipFile, UnicodeDecodeError) as e:
+        # Los lotes anteriores al error ya quedaron guardados
+        return jsonify({"success": False, "error": f"Archivo inválido: {e}"}), 400
+    finally:
+        invalidar_catalogo('alumnos:')
+
+    return jsonify({"success": True, **resultado})
+
 # Eliminar alumno
-@app.route('/api/alumnos/<int:alumno_id>', methods=['DELETE'])
+@bp.route('/api/alumnos/<int:alumno_id>', methods=['DELETE'])
 def delete_alumno(alumno_id):
     try:
-        with sqlite3.connect('database.db') as conn:
+        with get_campus_db() as conn:
             conn.execute('DELETE FROM alumnos WHERE id = ?', (alumno_id,))
             conn.commit()
+        invalidar_catalogo('alumnos:')
         return jsonify({"success": True})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 # Ruta para guardar asistencia
-@app.route('/api/guardar-asistencia', methods=['POST'])
+@bp.route('/api/guardar-asistencia', methods=['POST'])
 def guardar_asistencia():
+    if 'admin_id' not in session:
+        return jsonify({"success": False, "error": "No autenticado"}), 401
     try:
-        data = request.get_json()
-        
-        # Aquí iría la lógica para guardar en la base de datos
-        print("Datos recibidos para guardar:", data)
-        
+        grupo_id, fecha, marcas = normalizar_payload(request.get_json(silent=True))
+        asistencia_id = guardar_lista(get_campus_db(), grupo_id, fecha, marcas)
+        presentes = sum(presente for _, presente in marcas)
+        publicar_evento('asistencia', {
+            "campus": campus_actual(), "grupo_id": grupo_id, "fecha": fecha, "asistencia_id": asistencia_id,
+            "presentes": presentes, "total": len(marcas)
+        })
+
         return jsonify({
             "success": True,
-            "message": "Asistencia guardada correctamente"
+            "message": "Asistencia guardada correctamente",
+            "asistencia_id": asistencia_id,
+            "presentes": presentes,
+            "total": len(marcas)
         })
-    except Exception as e:
+    except AsistenciaInvalida as e:
         return jsonify({
             "success": False,
             "error": str(e)
+        }), 400
+    except Exception:
+        logger.exception("Error al guardar la asistencia")
+        return jsonify({
+            "success": False,
+            "error": "No se pudo guardar la asistencia"
         }), 500
 
+# Sincronización incremental de marcas capturadas sin conexión
+@bp.route('/api/sync-asistencia', methods=['POST'])
+def sync_asistencia():
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    try:
+        token, grupo_id, cambios = sincronizacion.normalizar_lote(request.get_json(silent=True))
+    except sincronizacion.SincronizacionInvalida as e:
+        return jsonify({"error": str(e)}), 400
+    resultado = sincronizacion.sincronizar(get_campus_db(), token, grupo_id, cambios)
+    # Un reenvío o una marca vieja no cambia nada: no se avisa a los demás
+    if resultado['aceptados']:
+        publicar_evento('asistencia', {
+            "campus": campus_actual(), "grupo_id": grupo_id, "aceptados": resultado['aceptados']
+        })
+    return jsonify(resultado)
+
+# Eventos en vivo (asistencia, proyectos y reportes) por Server-Sent Events.
+# EventSource reconecta solo y manda Last-Event-ID; ?ultimo= sirve para la
+# primera conexión de una página que ya conoce el último id.
+@bp.route('/api/eventos')
+def eventos_en_vivo():
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    broker = current_app.extensions['eventos']
+    suscripcion = broker.suscribir(request.headers.get('Last-Event-ID') or request.args.get('ultimo'))
+    if suscripcion is None:
+        respuesta = jsonify({"error": "Demasiadas conexiones de eventos"})
+        respuesta.status_code = 503
+        respuesta.headers['Retry-After'] = '30'
+        return respuesta
+    respuesta = Response(
+        eventos.flujo(broker, suscripcion, latido=current_app.config['EVENTOS_LATIDO'],
+                      detener=current_app.extensions['apagado']),
+        mimetype='text/event-stream')
+    respuesta.headers['Cache-Control'] = 'no-cache'
+    respuesta.headers['X-Accel-Buffering'] = 'no'
+    return respuesta
+
+# Recursos que el service worker precarga para abrir el pase de lista sin conexión
+SW_RECURSOS = ('css/lista_asistencia.css', 'js/lista_asistencia.js', 'js/cola_asistencia.js')
+
+# El service worker se sirve desde la raíz para que su alcance cubra toda la
+# app. Se le anteponen las URL versionadas de sus recursos: cuando uno cambia
+# cambia el script y el navegador instala el nuevo (ver static/js/sw.js)
+@bp.route('/sw.js')
+def service_worker():
+    recursos = {ruta: estatico(ruta) for ruta in SW_RECURSOS}
+    with open(os.path.join(current_app.config['ESTATICOS_FOLDER'], 'js', 'sw.js'), encoding='utf-8') as f:
+        script = f'const RECURSOS = {json.dumps(recursos)};\n{f.read()}'
+    respuesta = Response(script, mimetype='text/javascript')
+    respuesta.headers['Cache-Control'] = 'no-cache'
+    respuesta.add_etag()
+    return respuesta.make_conditional(request)
+
 # Ruta para obtener historial
-@app.route('/api/historial-asistencia')
+@bp.route('/api/historial-asistencia')
 def obtener_historial():
-    carrera = request.args.get('carrera')
-    grupo = request.args.get('grupo')
-    
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    try:
+        items, siguiente = historial(
+            get_campus_db(),
+            carrera=request.args.get('carrera'),
+            grupo=request.args.get('grupo_id', request.args.get('grupo')),
+            desde=request.args.get('desde'),
+            hasta=request.args.get('hasta'),
+            cursor=request.args.get('cursor'),
+            limite=request.args.get('limite', HISTORIAL_LIMITE, type=int)
+        )
+    except AsistenciaInvalida as e:
+        return jsonify({"error": str(e)}), 400
 
-    historial = [
-        {
-            "id": 1,
-            "fecha": "2024-05-01",
-            "carrera": carrera,
-            "grupo": grupo,
-            "presentes": 15,
-            "total": 20,
-            "porcentaje": 75
-        }
-    ]
-    
-    return jsonify(historial)
+    return jsonify({"items": items, "siguiente": siguiente})
+
+# Alumnos en riesgo por faltas. Los indicadores se recalculan sólo cuando
+# hubo marcas nuevas; la respuesta lleva ETag por token y filtros.
+@bp.route('/api/alertas-asistencia')
+def alertas_asistencia():
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    grupo_id = request.args.get('grupo_id', type=int)
+    carrera_id = request.args.get('carrera', type=int)
+    limite = min(max(request.args.get('limite', 100, type=int), 1), 1000)
+    conn = get_campus_db()
+    analisis = analisis_asistencia()
+    _, _, token = analisis.indicadores(conn)
+    umbrales = {
+        'max_faltas': current_app.config['ALERTAS_MAX_FALTAS'],
+        'min_sesiones': current_app.config['ALERTAS_MIN_SESIONES'],
+        'racha': current_app.config['ALERTAS_RACHA'],
+        'quincena': current_app.config['ALERTAS_QUINCENA'],
+    }
+
+    def consultar():
+        resultado = analitica.alertas(conn, analisis, umbrales, grupo_id, carrera_id, limite)
+        return {**resultado, 'umbrales': umbrales}
+    clave = f'{campus_actual()}:{date.today()}:{token}:{grupo_id}:{carrera_id}:{limite}'
+    return respuesta_cacheada(alertas_cache(), clave, consultar)
+
+# Campus configurados y campus de la sesión (POST {"campus": "norte"} lo cambia)
+@bp.route('/api/campus', methods=['GET', 'POST'])
+def campus_sesion():
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    if request.method == 'POST':
+        nombre = (request.get_json(silent=True) or {}).get('campus')
+        if nombre not in enrutador().rutas:
+            return jsonify({"error": "Campus desconocido"}), 400
+        session['campus'] = nombre
+        return jsonify({"actual": nombre, "campus": enrutador().nombres()})
+    return jsonify({"actual": campus_actual(), "campus": enrutador().nombres()})
+
+# Resumen de asistencia por campus y carrera: cada campus calcula su parcial
+# en paralelo y aquí se combinan las sumas
+@bp.route('/api/campus/resumen')
+def resumen_campus():
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    try:
+        desde, hasta = (
+            date.fromisoformat(valor).isoformat() if valor else None
+            for valor in (request.args.get('desde'), request.args.get('hasta'))
+        )
+    except ValueError:
+        return jsonify({"error": "Fechas inválidas (AAAA-MM-DD)"}), 400
+    seleccion = request.args.get('campus')
+    parciales = enrutador().repartir(
+        lambda conn: estadisticas.parcial_carreras(conn, desde, hasta),
+        seleccion.split(',') if seleccion else None
+    )
+    return jsonify(estadisticas.combinar_parciales(parciales))
+
+# Exportación en streaming (CSV o NDJSON, opcionalmente gzip)
+@bp.route('/api/export/<tipo>')
+def exportar(tipo):
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    if tipo not in exportacion.CONSULTAS:
+        return jsonify({"error": "Exportación no encontrada"}), 404
+    formato = request.args.get('formato', 'csv')
+    if formato not in exportacion.FORMATOS:
+        return jsonify({"error": "Formato no soportado (csv o ndjson)"}), 400
+    try:
+        sql, params = exportacion.consulta(
+            tipo,
+            carrera=request.args.get('carrera'),
+            grupo=request.args.get('grupo_id', request.args.get('grupo')),
+            desde=request.args.get('desde'),
+            hasta=request.args.get('hasta')
+        )
+    except ValueError:
+        return jsonify({"error": "Filtros inválidos: grupo numérico y fechas AAAA-MM-DD"}), 400
+
+    comprimir = request.args.get('gzip') == '1'
+    nombre = f"{tipo}_{datetime.now().strftime('%Y%m%d')}.{formato}" + ('.gz' if comprimir else '')
+    return Response(
+        stream_with_context(exportacion.generar(get_campus_db(), sql, params, formato, comprimir)),
+        mimetype='application/gzip' if comprimir else exportacion.FORMATOS[formato],
+        headers={'Content-Disposition': f'attachment; filename={nombre}'}
+    )
+
+# Estadísticas materializadas de asistencia
+@bp.route('/api/estadisticas/alumno/<int:alumno_id>')
+def get_estadisticas_alumno(alumno_id):
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    datos = estadisticas.por_alumno(get_campus_db(), alumno_id)
+    if datos is None:
+        return jsonify({"error": "Alumno no encontrado"}), 404
+    return jsonify(datos)
+
+@bp.route('/api/estadisticas/grupo/<int:grupo_id>')
+def get_estadisticas_grupo(grupo_id):
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    datos = estadisticas.por_grupo(get_campus_db(), grupo_id, request.args.get('semanas', type=int))
+    if datos is None:
+        return jsonify({"error": "Grupo no encontrado"}), 404
+    return jsonify(datos)
 
 # Ruta para generar PDF
-@app.route('/generar-pdf-asistencia/<int:asistencia_id>')
+@bp.route('/generar-pdf-asistencia/<int:asistencia_id>')
 def generar_pdf_asistencia(asistencia_id):
-    # Datos de ejemplo
-    data = {
-        "fecha": "2024-05-01",
-        "carrera": "Ingeniería en Software",
-        "grupo": "1925° IS",
-        "presentes": 15,
-        "total": 20,
-        "porcentaje": 75,
-        "alumnos": [
-            {"matricula": "A123", "nombre": "Juan Pérez", "asistencia": True},
-            {"matricula": "A456", "nombre": "María García", "asistencia": False}
-        ]
-    }
-    
+    if 'admin_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    datos = datos_asistencia(get_campus_db(), asistencia_id)
+    if datos is None:
+        return jsonify({"error": "Asistencia no encontrada"}), 404
 
-    from flask import make_response
-    html = render_template('pdf_asistencia.html', **data)
-    response = make_response(html)
-    response.headers['Content-Type'] = 'application/pdf'
-    response.headers['Content-Disposition'] = f'attachment; filename=asistencia_{asistencia_id}.pdf'
-    return response
+    # La huella de los datos sirve de ETag y de clave en la caché
+    clave = huella(datos)
+    if clave in request.if_none_match:
+        return '', 304, {'ETag': f'"{clave}"'}
+
+    # Los ids de asistencia se repiten entre campus: la caché va por campus
+    campus = None if campus_actual() == PRINCIPAL else campus_actual()
+    ruta = generador_pdf().ruta(asistencia_id, clave, campus)
+    if not os.path.exists(ruta):
+        try:
+            generador_pdf().solicitar(asistencia_id, datos, clave, campus).result(timeout=current_app.config['PDF_ESPERA'])
+        except FuturoTimeout:
+            return jsonify({"pendiente": True, "mensaje": "Generando PDF, intenta de nuevo"}), 202, {'Retry-After': '1'}
+
+    return send_file(
+        ruta,
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=f'asistencia_{asistencia_id}.pdf',
+        etag=clave,
+        conditional=True,
+        max_age=0
+    )
 
 
-@app.route('/lista-asistencia')
+@bp.route('/lista-asistencia')
 def lista_asistencia():
-    # Obtener parámetros de la URL
-    grupo_id = request.args.get('grupo_id')
-    fecha = request.args.get('fecha')
-    
-    if not grupo_id or not fecha:
+    if 'admin_id' not in session:
+        flash("Acceso restringido. Inicia sesión.", "warning")
+        return redirect(url_for('.login'))
+    try:
+        grupo_id = int(request.args.get('grupo_id', ''))
+        fecha = date.fromisoformat(request.args.get('fecha', '')).isoformat()
+    except ValueError:
         flash("Faltan parámetros necesarios", "error")
-        return redirect(url_for('asistencia'))
-    
-    # Obtener datos del grupo y alumnos desde la BD
-    with sqlite3.connect('database.db') as conn:
-        conn.row_factory = sqlite3.Row
-        
-        # Obtener información del grupo
-        grupo = conn.execute('''
-            SELECT g.*, c.nombre as carrera_nombre 
-            FROM grupos g
-            JOIN carreras c ON g.carrera_id = c.id
-            WHERE g.id = ?
-        ''', (grupo_id,)).fetchone()
-        
-        # Obtener alumnos del grupo
-        alumnos = conn.execute('''
-            SELECT * FROM alumnos 
-            WHERE grupo_id = ?
-            ORDER BY apellidos, nombre
-        ''', (grupo_id,)).fetchall()
-    
-    if not grupo:
+        return redirect(url_for('.asistencia'))
+
+    conn = get_campus_db()
+    # Token de sincronización de la página: se lee antes que la hoja, así lo
+    # que se confirme en medio llega en la primera sincronización
+    token = sincronizacion.token_actual(conn)
+    hoja = hoja_asistencia(conn, grupo_id, fecha)
+    if hoja is None:
         flash("Grupo no encontrado", "error")
-        return redirect(url_for('asistencia'))
-    
-    return render_template(
+        return redirect(url_for('.asistencia'))
+    # La página manda su campus en cada petición (la sesión puede cambiar)
+    hoja['campus'] = campus_actual()
+
+    # El payload compacto se embebe en la página y su huella es el ETag: si
+    # el grupo y las marcas no cambiaron, volver a la misma lista es un 304
+    # sin renderizar la plantilla. El token no entra en la huella (cambia con
+    # cualquier marca del campus); una copia con un token viejo sólo recibe
+    # de nuevo marcas que ya muestra.
+    etag = hashlib.sha1(json.dumps(hoja, ensure_ascii=False, separators=(',', ':')).encode('utf-8')).hexdigest()[:20]
+    cabeceras = {'Cache-Control': 'private, no-cache'}
+    if request.if_none_match.contains_weak(etag):
+        return '', 304, {'ETag': f'W/"{etag}"', **cabeceras}
+    hoja['token'] = token
+    datos_json = json.dumps(hoja, ensure_ascii=False, separators=(',', ':'))
+
+    respuesta = make_response(render_template(
         'lista_asistencia.html',
-        grupo=dict(grupo),
-        alumnos=[dict(a) for a in alumnos],
-        fecha=fecha
-    )
+        hoja=hoja,
+        datos_json=Markup(datos_json.replace('<', '\\u003c').replace('>', '\\u003e').replace('&', '\\u0026'))
+    ))
+    respuesta.set_etag(etag, weak=True)
+    respuesta.headers.update(cabeceras)
+    return respuesta
 
-@app.route('/logout', methods=['POST'])
+@bp.route('/logout', methods=['POST'])
 def logout():
     session.clear()
     flash("Sesión cerrada correctamente.", "info")
-    return redirect(url_for('login'))
+    return redirect(url_for('.login'))
+
+# Salud del proceso (liveness) y disponibilidad para recibir tráfico (readiness)
+@bp.route('/health')
+def health():
+    return jsonify({"estado": "ok"})
+
+@bp.route('/ready')
+def ready():
+    if current_app.extensions['apagado'].is_set():
+        return jsonify({"estado": "apagando"}), 503
+    try:
+        get_db().execute('SELECT 1').fetchone()
+    except sqlite3.Error as e:
+        return jsonify({"estado": "sin base de datos", "error": str(e)}), 503
+    return jsonify({"estado": "listo"})
+
+# Métricas en formato Prometheus
+@bp.route('/metrics')
+def metrics():
+    return Response(current_app.extensions['metricas'].texto(), mimetype='text/plain; version=0.0.4')
+
+# Activar o desactivar la instrumentación en caliente. Con varios workers
+# (servidor.py) el cambio sólo afecta al proceso que atiende la petición
+@bp.route('/metrics/estado', methods=['GET', 'POST'])
+def metrics_estado():
+    if request.method == 'POST':
+        if 'admin_id' not in session:
+            return jsonify({"error": "No autenticado"}), 401
+        datos = request.get_json(silent=True) or {}
+        if 'activas' in datos and not isinstance(datos['activas'], bool):
+            return jsonify({"error": "activas debe ser true o false"}), 400
+        lento = datos.get('lento_ms')
+        if lento is not None and (isinstance(lento, bool) or not isinstance(lento, (int, float))
+                                  or not math.isfinite(lento) or lento < 0):
+            return jsonify({"error": "lento_ms debe ser un número mayor o igual a 0, o null"}), 400
+        if 'activas' in datos:
+            current_app.config['METRICAS_ACTIVAS'] = datos['activas']
+        if 'lento_ms' in datos:
+            current_app.config['METRICAS_LENTO_MS'] = datos['lento_ms']
+    return jsonify({
+        "activas": current_app.config['METRICAS_ACTIVAS'],
+        "lento_ms": current_app.config['METRICAS_LENTO_MS']
+    })
+
+
+# --- Comandos de consola ---
+@bp.cli.group('estadisticas')
+def estadisticas_cli():
+    """Mantenimiento de las estadísticas materializadas."""
+
+
+@estadisticas_cli.command('reconstruir')
+def estadisticas_reconstruir():
+    """Recalcula las tablas de resumen desde detalle_asistencias en cada campus."""
+    for nombre in enrutador().nombres():
+        with enrutador().pool(nombre).connection() as conn:
+            estadisticas.reconstruir(conn)
+        click.echo(f"{nombre}: estadísticas reconstruidas.")
+
+
+@estadisticas_cli.command('verificar')
+def estadisticas_verificar():
+    """Compara las estadísticas materializadas con un recálculo completo en cada campus."""
+    diferencias = []
+    for nombre, encontradas in enrutador().repartir(estadisticas.verificar).items():
+        for diferencia in encontradas:
+            click.echo(f"{nombre}: {diferencia}")
+        diferencias.extend(encontradas)
+    if diferencias:
+        raise click.ClickException(f"{len(diferencias)} diferencias encontradas")
+    click.echo("Estadísticas consistentes.")
+
+
+@bp.cli.group('alumnos')
+def alumnos_cli():
+    """Administración de alumnos."""
+
+
+@alumnos_cli.command('importar')
+@click.argument('archivo', type=click.Path(exists=True, dir_okay=False))
+@click.option('--campus', default=PRINCIPAL, show_default=True, help='Campus al que pertenecen los alumnos.')
+def alumnos_importar(archivo, campus):
+    """Importa alumnos desde un CSV o XLSX (matricula, apellidos, nombre, grupo)."""
+    if campus not in enrutador().rutas:
+        raise click.BadParameter(f"campus desconocido: {campus}", param_hint='--campus')
+    with open(archivo, 'rb') as f, enrutador().pool(campus).connection() as conn:
+        filas = leer_xlsx(f) if archivo.lower().endswith('.xlsx') else leer_csv(f)
+        resultado = importar(conn, filas)
+    for error in resultado['errores']:
+        click.echo(f"Fila {error['fila']} ({error['matricula']}): {error['error']}")
+    click.echo(f"{resultado['insertados']} alumnos importados, {resultado['total_errores']} errores.")
+
+
+@bp.cli.group('reportes')
+def reportes_cli():
+    """Mantenimiento del almacén de reportes."""
+
+
+@reportes_cli.command('reconciliar')
+@click.option('--gracia', type=int, default=None,
+              help='Segundos sin referencias antes de borrar un archivo (por omisión RECONCILIAR_GRACIA).')
+def reportes_reconciliar(gracia):
+    """Migra reportes antiguos y elimina archivos huérfanos y filas colgantes."""
+    reconciliador = current_app.extensions['reconciliador_reportes']
+    if gracia is not None:
+        reconciliador.gracia = gracia
+    for nombre, cantidad in reconciliador.ejecutar().items():
+        click.echo(f"{nombre}: {cantidad}")
+
+
+@bp.cli.group('estaticos')
+def estaticos_cli():
+    """Archivos estáticos."""
+
+
+@estaticos_cli.command('comprimir')
+def estaticos_comprimir():
+    """Genera las variantes gzip/brotli de static/css y static/js."""
+    escritas = current_app.extensions['estaticos'].comprimir()
+    click.echo(f"{escritas} archivos comprimidos.")
+
+
+@bp.cli.group('db')
+def db_cli():
+    """Migraciones y datos iniciales de la base de datos."""
+
+
+@db_cli.command('upgrade')
+def db_upgrade():
+    """Aplica las migraciones pendientes en la base principal y en cada campus."""
+    for campus, aplicadas in enrutador().migrar().items():
+        for numero, nombre in aplicadas:
+            click.echo(f"{campus}: aplicada {numero:04d}_{nombre}")
+        with enrutador().pool(campus).connection() as conn:
+            click.echo(f"{campus}: esquema en la versión {migraciones.version_actual(conn)}.")
+
+
+@db_cli.command('seed')
+@click.option('--campus', default=None, help='Carga sólo las carreras y grupos base en este campus.')
+def db_seed(campus):
+    """Inserta los datos iniciales (carreras, grupos, proyectos y admin) en la base principal."""
+    if campus is None or campus == PRINCIPAL:
+        with enrutador().pool(PRINCIPAL).connection() as conn:
+            sembrar(conn)
+    else:
+        if campus not in enrutador().rutas:
+            raise click.BadParameter(f"campus desconocido: {campus}", param_hint='--campus')
+        with enrutador().pool(campus).connection() as conn:
+            sembrar_catalogo(conn, ejemplos=False)
+    click.echo("Datos iniciales cargados.")
+
+
+# --- Inicialización de la app y configuración ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def create_app(config=None):
+    # La ruta /static la registra estaticos.init_app (versiones y precompresión)
+    app = Flask(__name__, static_folder=None)
+    app.secret_key = 'tu_clave_secreta'
+    app.config.update(
+        ESTATICOS_FOLDER=os.path.join(BASE_DIR, 'static'),
+        ESTATICOS_COMPRIMIDOS_FOLDER=os.path.join(BASE_DIR, 'cache', 'estaticos'),
+        REPORTES_FOLDER=os.path.join(BASE_DIR, 'reportes'),
+        # Caché de PDF de asistencia y segundos que una petición espera a que se genere
+        PDF_CACHE_FOLDER=os.path.join(BASE_DIR, 'cache', 'pdf'),
+        PDF_ESPERA=2,
+        # Segundos entre pasadas del reconciliador de reportes (0 lo desactiva)
+        # y antigüedad mínima de un archivo sin referencias antes de borrarlo
+        RECONCILIAR_INTERVALO=600,
+        RECONCILIAR_GRACIA=3600,
+        # Intentos fallidos de login permitidos por usuario y por IP dentro de
+        # la ventana (segundos); 'sqlite' comparte el conteo entre procesos
+        LOGIN_MAX_INTENTOS_USUARIO=5,
+        LOGIN_MAX_INTENTOS_IP=20,
+        LOGIN_VENTANA=300,
+        LOGIN_LIMITADOR='memoria',
+        # Proxies inversos de confianza delante de la app (nginx, balanceador).
+        # Con 1 o más, request.remote_addr sale de X-Forwarded-For y el
+        # limitador de login cuenta por la IP del cliente, no la del proxy.
+        # Debe coincidir con los saltos reales: un valor mayor deja que el
+        # cliente elija su IP con un X-Forwarded-For inventado
+        PROXIES_CONFIABLES=0,
+        # Método y factor de trabajo de los hashes; los que no coincidan se
+        # recalculan en el siguiente inicio de sesión correcto
+        PASSWORD_METODO='scrypt:32768:8:1',
+        # Alertas de asistencia: tasa de faltas máxima (con un mínimo de
+        # sesiones), faltas seguidas y tasa de faltas en los últimos 14 días
+        ALERTAS_DIAS=365,
+        ALERTAS_MAX_FALTAS=0.2,
+        ALERTAS_MIN_SESIONES=5,
+        ALERTAS_RACHA=3,
+        ALERTAS_QUINCENA=0.3,
+        # Segundos entre latidos de /api/eventos y conexiones simultáneas por
+        # proceso. Cada una ocupa un hilo del servidor: servidor.py lo fija en
+        # hilos - HILOS_LIBRES; el valor por defecto sólo vale para el servidor
+        # de desarrollo, que crea un hilo por conexión
+        EVENTOS_LATIDO=15,
+        EVENTOS_MAX_CLIENTES=100,
+        # Campus con base propia para catálogos y asistencia, p. ej.
+        # FLASK_DB_CAMPUS='{"norte": "/datos/norte.db"}' (ver campus.py)
+        DB_CAMPUS={},
+    )
+    # Variables FLASK_<CLAVE> del entorno (el lanzador de servidor.py las usa
+    # para ajustar cada worker); la configuración explícita tiene prioridad
+    app.config.from_prefixed_env()
+    app.config.update(config or {})
+    os.makedirs(app.config['REPORTES_FOLDER'], exist_ok=True)
+    if app.config['PROXIES_CONFIABLES']:
+        saltos = app.config['PROXIES_CONFIABLES']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=saltos, x_proto=saltos, x_host=saltos)
+
+    init_db_app(app)
+    campus = init_campus(app)
+    metricas = init_metricas(app)
+    init_estaticos(app)
+    # Se activa al recibir SIGTERM: /ready responde 503 mientras se drena
+    app.extensions['apagado'] = threading.Event()
+
+    # Caché de catálogos (carreras, grupos y alumnos por grupo)
+    cache = CacheTTL(maximo=256, ttl=300)
+    app.extensions['catalogo_cache'] = cache
+    metricas.colectores.append(lambda: [
+        f'sgp_cache_catalogos_{nombre} {valor}'
+        for nombre, valor in cache.estadisticas().items()
+    ])
+
+    # Indicadores de asistencia en memoria (matriz alumno x día, una por campus) y respuestas
+    # de /api/alertas-asistencia por token de secuencia
+    app.extensions['analisis_asistencia'] = {
+        nombre: analitica.AnalisisAsistencia(dias=app.config['ALERTAS_DIAS']) for nombre in campus.nombres()
+    }
+    app.extensions['alertas_cache'] = CacheTTL(maximo=64, ttl=300)
+
+    limitador = crear_limitador(app)
+    app.extensions['limitador_login'] = limitador
+    metricas.colectores.append(lambda: [f'sgp_login_rechazados_total {limitador.rechazados}'])
+
+    broker = eventos.Broker(max_clientes=app.config['EVENTOS_MAX_CLIENTES'])
+    app.extensions['eventos'] = broker
+    metricas.colectores.append(lambda: [
+        f'sgp_eventos_clientes {broker.clientes()}',
+        f'sgp_eventos_publicados_total {broker.publicados}',
+        f'sgp_eventos_desbordados_total {broker.desbordados}',
+    ])
+
+    app.extensions['generador_pdf'] = GeneradorPDF(app.config['PDF_CACHE_FOLDER'], trabajadores=4)
+    # Almacén de reportes por contenido y cola de trabajos para generarlos
+    # fuera del hilo de la petición
+    almacen = AlmacenContenido(app.config['REPORTES_FOLDER'])
+    app.extensions['almacen_reportes'] = almacen
+    app.extensions['cola_reportes'] = ColaReportes(app, almacen, trabajadores=2, eventos=broker)
+    reconciliador = Reconciliador(app, almacen, carpeta_anterior=app.config['REPORTES_FOLDER'],
+                                  intervalo=app.config['RECONCILIAR_INTERVALO'],
+                                  gracia=app.config['RECONCILIAR_GRACIA'])
+    app.extensions['reconciliador_reportes'] = reconciliador
+    # El hilo arranca con la primera petición, ya dentro del worker: crear la
+    # app (CLI, pruebas, el proceso padre de servidor.py) no deja hilos vivos
+    app.before_request(reconciliador.iniciar)
+
+    app.register_blueprint(bp)
+    return app
+
+
+def preparar_db(app):
+    """Migra y siembra las bases; lo usan el servidor de desarrollo y los benchmarks."""
+    enrutador(app).migrar(semillas=True)
+    with get_pool(app).connection() as conn:
+        cerrar_interrumpidos(conn)
+
+
+def precalentar_analisis(app):
+    """Carga en segundo plano la analítica de asistencia de cada campus (al iniciar un worker)."""
+    campus = app.extensions['campus']
+    for nombre, analisis in app.extensions['analisis_asistencia'].items():
+        analisis.precalentar(campus.pool(nombre))
+
+
+_app = None
+_app_lock = threading.Lock()
+
+
+def __getattr__(nombre):
+    # `from app import app` (servidor.py, flask run, benchmarks) crea la app
+    # al primer uso; importar el módulo no crea carpetas ni hilos
+    global _app
+    if nombre != 'app':
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    with _app_lock:
+        if _app is None:
+            _app = create_app()
+    return _app
+
 
 if __name__ == '__main__':
+    app = create_app()
+    preparar_db(app)
+    app.extensions['estaticos'].comprimir()
+    precalentar_analisis(app)
     app.run(debug=True)
@@ -0,0 +1,185 @@
+from datetime import date
+
+
+# --- Persistencia de pase de lista ---
+UPSERT_ASISTENCIA = '''
+    INSERT INTO asistencias (grupo_id, fecha) VALUES (?, ?)
+    ON CONFLICT(grupo_id, fecha) DO NOTHING
+'''
+
+UPSERT_DETALLE = '''
+    INSERT INTO detalle_asistencias (asistencia_id, alumno_id, presente, marcado_en)
+    VALUES (?, ?, ?, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+    ON CONFLICT(asistencia_id, alumno_id) DO UPDATE
+    SET presente = excluded.presente, marcado_en = excluded.marcado_en
+'''
+
+
+class AsistenciaInvalida(ValueError):
+    """El payload de asistencia no es válido."""
+
+
+def normalizar_payload(data):
+    """Valida el JSON recibido y devuelve (grupo_id, fecha, [(alumno_id, presente)])."""
+    if not isinstance(data, dict):
+        raise AsistenciaInvalida("Datos no proporcionados")
+    try:
+        grupo_id = int(data['grupo_id'])
+        fecha = date.fromisoformat(str(data['fecha'])).isoformat()
+    except (KeyError, TypeError, ValueError):
+        raise AsistenciaInvalida("grupo_id y fecha (AAAA-MM-DD) son obligatorios")
+
+    alumnos = data.get('alumnos')
+    if not isinstance(alumnos, list) or not alumnos:
+        raise AsistenciaInvalida("La lista de alumnos está vacía")
+    marcas = {}
+    try:
+        for alumno in alumnos:
+            alumno_id = int(alumno.get('alumno_id', alumno.get('id')))
+            marcas[alumno_id] = 1 if alumno.get('presente', alumno.get('asistencia')) else 0
+    except (AttributeError, TypeError, ValueError):
+        raise AsistenciaInvalida("Cada alumno requiere un id numérico")
+    return grupo_id, fecha, list(marcas.items())
+
+
+def guardar_lista(conn, grupo_id, fecha, marcas):
+    """Guarda un pase de lista completo en una sola transacción.
+
+    Reenviar el mismo pase de lista es idempotente: la cabecera se reutiliza
+    y cada detalle se actualiza por la restricción UNIQUE(asistencia_id, alumno_id).
+    Devuelve el id de la asistencia.
+    """
+    inscritos = {row[0] for row in conn.execute(
+        'SELECT id FROM alumnos WHERE grupo_id = ?', (grupo_id,))}
+    ajenos = [alumno_id for alumno_id, _ in marcas if alumno_id not in inscritos]
+    if ajenos:
+        raise AsistenciaInvalida(f"Alumnos que no pertenecen al grupo: {ajenos}")
+
+    # La transacción arranca con una escritura para tomar el bloqueo de
+    # escritura desde el inicio y no fallar al promover una lectura en WAL.
+    with conn:
+        conn.execute(UPSERT_ASISTENCIA, (grupo_id, fecha))
+        asistencia_id = conn.execute(
+            'SELECT id FROM asistencias WHERE grupo_id = ? AND fecha = ?',
+            (grupo_id, fecha)
+        ).fetchone()[0]
+        conn.executemany(UPSERT_DETALLE, [
+            (asistencia_id, alumno_id, presente) for alumno_id, presente in marcas
+        ])
+    return asistencia_id
+
+
+# --- Historial de asistencias ---
+HISTORIAL_LIMITE = 50
+HISTORIAL_LIMITE_MAX = 200
+
+
+def _cursor_historial(fila):
+    return f"{fila['fecha']}_{fila['id']}"
+
+
+def _leer_cursor(cursor):
+    try:
+        fecha, asistencia_id = cursor.rsplit('_', 1)
+        return date.fromisoformat(fecha).isoformat(), int(asistencia_id)
+    except (AttributeError, ValueError):
+        raise AsistenciaInvalida("Cursor de paginación inválido")
+
+
+def historial(conn, carrera=None, grupo=None, desde=None, hasta=None,
+              cursor=None, limite=HISTORIAL_LIMITE):
+    """Resumen por sesión (presentes/total/porcentaje) paginado por (fecha, id).
+
+    La página de asistencias se elige primero por índice y sólo después se
+    agregan sus detalles, de modo que el costo no crece con el historial.
+    Devuelve (items, siguiente_cursor).
+    """
+    condiciones, params = [], []
+    if carrera:
+        condiciones.append('g.carrera_id = ?' if str(carrera).isdigit()
+                           else 'g.carrera_id = (SELECT id FROM carreras WHERE codigo = ?)')
+        params.append(carrera)
+    try:
+        if grupo:
+            condiciones.append('a.grupo_id = ?')
+            params.append(int(grupo))
+        if desde:
+            condiciones.append('a.fecha >= ?')
+            params.append(date.fromisoformat(desde).isoformat())
+        if hasta:
+            condiciones.append('a.fecha <= ?')
+            params.append(date.fromisoformat(hasta).isoformat())
+    except ValueError:
+        raise AsistenciaInvalida("Filtros inválidos: grupo numérico y fechas AAAA-MM-DD")
+    if cursor:
+        fecha, asistencia_id = _leer_cursor(cursor)
+        condiciones.append('(a.fecha < ? OR (a.fecha = ? AND a.id < ?))')
+        params.extend([fecha, fecha, asistencia_id])
+
+    limite = max(1, min(int(limite), HISTORIAL_LIMITE_MAX))
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+    filas = conn.execute(f'''
+        WITH pagina AS (
+            SELECT a.id, a.fecha, a.grupo_id, g.nombre AS grupo, c.nombre AS carrera
+            FROM asistencias a
+            JOIN grupos g ON g.id = a.grupo_id
+            JOIN carreras c ON c.id = g.carrera_id
+            {where}
+            ORDER BY a.fecha DESC, a.id DESC
+            LIMIT ?
+        )
+        SELECT p.id, p.fecha, p.grupo_id, p.grupo, p.carrera,
+               COALESCE(SUM(d.presente), 0) AS presentes,
+               COUNT(d.asistencia_id) AS total,
+               CAST(ROUND(100.0 * COALESCE(SUM(d.presente), 0)
+                          / MAX(COUNT(d.asistencia_id), 1)) AS INTEGER) AS porcentaje
+        FROM pagina p
+        LEFT JOIN detalle_asistencias d ON d.asistencia_id = p.id
+        GROUP BY p.id
+        ORDER BY p.fecha DESC, p.id DESC
+    ''', params + [limite + 1]).fetchall()
+
+    items = [dict(fila) for fila in filas[:limite]]
+    siguiente = _cursor_historial(filas[limite - 1]) if len(filas) > limite else None
+    return items, siguiente
+
+
+# --- Hoja de pase de lista ---
+# Campos de cada alumno en el payload embebido en la página; los alumnos van
+# como listas en este orden para que el JSON sea compacto.
+CAMPOS_HOJA = ('id', 'matricula', 'nombre', 'presente')
+
+
+def hoja_asistencia(conn, grupo_id, fecha):
+    """Grupo, alumnos ordenados y marcas ya guardadas para la fecha, en una consulta.
+
+    presente es None para los alumnos sin marca en esa fecha. Devuelve None
+    si el grupo no existe.
+    """
+    # Tuplas simples en lugar de sqlite3.Row: cada fila se lee una sola vez
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    filas = cursor.execute('''
+        SELECT g.id AS grupo_id, g.nombre AS grupo, c.nombre AS carrera,
+               al.id, al.matricula, al.apellidos, al.nombre, d.presente
+        FROM grupos g
+        JOIN carreras c ON c.id = g.carrera_id
+        LEFT JOIN alumnos al ON al.grupo_id = g.id
+        LEFT JOIN asistencias a ON a.grupo_id = g.id AND a.fecha = ?
+        LEFT JOIN detalle_asistencias d ON d.asistencia_id = a.id AND d.alumno_id = al.id
+        WHERE g.id = ?
+        ORDER BY al.apellidos, al.nombre, al.id
+    ''', (fecha, grupo_id)).fetchall()
+    if not filas:
+        return None
+    grupo_id, grupo, carrera = filas[0][:3]
+    return {
+        'grupo': {'id': grupo_id, 'nombre': grupo, 'carrera': carrera},
+        'fecha': fecha,
+        'campos': CAMPOS_HOJA,
+        'alumnos': [
+            [alumno_id, matricula, f'{apellidos} {nombre}', None if presente is None else bool(presente)]
+            for _, _, _, alumno_id, matricula, apellidos, nombre, presente in filas
+            if alumno_id is not None
+        ],
+    }
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import deque
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from db import get_pool
+
+
+# --- Límite de intentos de inicio de sesión ---
+# Ventana deslizante de intentos fallidos por usuario y por IP. La consulta
+# del límite va antes de buscar al usuario y de calcular el hash, así que un
+# ataque de fuerza bruta bloqueado cuesta una búsqueda en memoria en vez de
+# un scrypt/PBKDF2 completo. Un acceso correcto limpia el contador del
+# usuario, no el de la IP.
+#
+# LimitadorMemoria es por proceso; con varios workers cada uno cuenta por su
+# lado. LimitadorSQLite comparte los contadores entre procesos a cambio de
+# una escritura por intento fallido.
+#
+# La tabla intentos_login la crea migraciones/0010_intentos_login.py.
+
+MAX_CLAVES = 10000
+
+
+def claves_intento(usuario, ip):
+    """(clave, tipo) a revisar para un intento; tipo elige el límite que aplica."""
+    claves = [(f'ip:{ip}', 'ip')]
+    if usuario:
+        claves.append((f'usuario:{usuario}', 'usuario'))
+    return claves
+
+
+class LimitadorMemoria:
+    def __init__(self, limites, ventana=300):
+        self.limites = limites
+        self.ventana = ventana
+        self._intentos = {}
+        self._lock = threading.Lock()
+        self.rechazados = 0
+
+    def espera(self, claves):
+        """Segundos que faltan para poder intentar de nuevo (0 si se permite)."""
+        ahora = time.monotonic()
+        espera = 0
+        with self._lock:
+            for clave, tipo in claves:
+                intentos = self._intentos.get(clave)
+                # Con maxlen = límite, el más antiguo es el que abre la ventana
+                if intentos and len(intentos) >= self.limites[tipo]:
+                    espera = max(espera, intentos[0] + self.ventana - ahora)
+            if espera > 0:
+                self.rechazados += 1
+        return max(espera, 0)
+
+    def fallo(self, claves):
+        ahora = time.monotonic()
+        with self._lock:
+            if len(self._intentos) >= MAX_CLAVES:
+                self._purgar(ahora)
+            for clave, tipo in claves:
+                intentos = self._intentos.get(clave)
+                if intentos is None:
+                    intentos = self._intentos[clave] = deque(maxlen=self.limites[tipo])
+                intentos.append(ahora)
+
+    def exito(self, claves):
+        with self._lock:
+            for clave, tipo in claves:
+                if tipo == 'usuario':
+                    self._intentos.pop(clave, None)
+
+    def _purgar(self, ahora):
+        vencidas = [c for c, intentos in self._intentos.items() if intentos[-1] + self.ventana <= ahora]
+        for clave in vencidas:
+            del self._intentos[clave]
+        # Si todas siguen vigentes se descartan las más antiguas
+        while len(self._intentos) >= MAX_CLAVES:
+            del self._intentos[next(iter(self._intentos))]
+
+
+class LimitadorSQLite:
+    def __init__(self, app, limites, ventana=300):
+        self.app = app
+        self.limites = limites
+        self.ventana = ventana
+        self.rechazados = 0
+
+    def espera(self, claves):
+        ahora = time.time()
+        espera = 0
+        with get_pool(self.app).connection() as conn:
+            for clave, tipo in claves:
+                filas = conn.execute('''
+                    SELECT momento FROM intentos_login WHERE clave = ? AND momento > ?
+                    ORDER BY momento DESC LIMIT ?
+                ''', (clave, ahora - self.ventana, self.limites[tipo])).fetchall()
+                if len(filas) >= self.limites[tipo]:
+                    espera = max(espera, filas[-1][0] + self.ventana - ahora)
+        if espera > 0:
+            self.rechazados += 1
+        return espera
+
+    def fallo(self, claves):
+        ahora = time.time()
+        with get_pool(self.app).connection() as conn, conn:
+            conn.executemany('INSERT INTO intentos_login (clave, momento) VALUES (?, ?)',
+                             [(clave, ahora) for clave, _ in claves])
+            conn.execute('DELETE FROM intentos_login WHERE momento <= ?', (ahora - self.ventana,))
+
+    def exito(self, claves):
+        with get_pool(self.app).connection() as conn, conn:
+            conn.executemany('DELETE FROM intentos_login WHERE clave = ?',
+                             [(clave,) for clave, tipo in claves if tipo == 'usuario'])
+
+
+def crear_limitador(app):
+    limites = {'usuario': app.config['LOGIN_MAX_INTENTOS_USUARIO'], 'ip': app.config['LOGIN_MAX_INTENTOS_IP']}
+    if app.config['LOGIN_LIMITADOR'] == 'sqlite':
+        return LimitadorSQLite(app, limites, app.config['LOGIN_VENTANA'])
+    return LimitadorMemoria(limites, app.config['LOGIN_VENTANA'])
+
+
+# --- Verificación con rehash ---
+
+def verificar(conn, admin, password, metodo):
+    """Comprueba la contraseña y, si el hash guardado usa otro método o
+    factor de trabajo, lo reemplaza por uno con ``metodo``."""
+    if not check_password_hash(admin['password'], password):
+        return False
+    if admin['password'].split('$', 1)[0] != metodo:
+        with conn:
+            conn.execute('UPDATE admin SET password = ? WHERE id = ?',
+                         (generate_password_hash(password, method=metodo), admin['id']))
+    return True
@@ -0,0 +1,107 @@
+"""Benchmark de la analítica de asistencia (/api/alertas-asistencia).
+
+Mide, sobre un año de pases de lista: la carga inicial de la matriz alumno x
+día, el cálculo vectorizado completo, una consulta sin cambios (caché), la
+actualización incremental después de guardar un pase de lista y la ruta HTTP.
+
+La carga inicial corre al iniciar cada worker (ver servidor.py); si pasa de
+--presupuesto-ms el benchmark termina con código 1.
+
+Uso: python benchmarks/bench_alertas.py [--db base.db | --alumnos 10000 --dias 365] [--repeticiones 20]
+                                        [--presupuesto-ms 1500]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import datos as generador  # noqa: E402
+
+
+def medir(nombre, funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    print(f'{nombre:38} mediana {statistics.median(tiempos):9.2f} ms  máx {max(tiempos):9.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', help='base generada con benchmarks/datos.py (se usa una copia)')
+    parser.add_argument('--alumnos', type=int, default=10000)
+    parser.add_argument('--dias', type=int, default=365)
+    parser.add_argument('--repeticiones', type=int, default=20)
+    parser.add_argument('--presupuesto-ms', type=float, default=1500,
+                        help='tiempo máximo de la carga inicial + cálculo')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='bench_alertas_')
+    ruta_db = os.path.join(tmp_dir, 'bench.db')
+    if args.db:
+        shutil.copy(args.db, ruta_db)
+    os.environ['DATABASE_PATH'] = ruta_db
+
+    import analitica
+    from app import create_app, get_pool, preparar_db
+    from asistencias import guardar_lista
+
+    app = create_app({
+        'REPORTES_FOLDER': os.path.join(tmp_dir, 'reportes'),
+        'RECONCILIAR_INTERVALO': 0,
+        'METRICAS_LENTO_MS': None,
+    })
+    try:
+        preparar_db(app)
+        with get_pool(app).connection() as conn:
+            if args.db:
+                escala = generador.resumen(conn)
+            else:
+                print('Generando datos...')
+                escala = generador.generar(conn, alumnos=args.alumnos, dias=args.dias, observaciones=0)
+            print(f"Escala: {escala['alumnos']:,} alumnos, {escala['sesiones']:,} sesiones")
+
+            analisis = analitica.AnalisisAsistencia()
+            inicio = time.perf_counter()
+            ids, _, _ = analisis.indicadores(conn)
+            carga_ms = (time.perf_counter() - inicio) * 1000
+            print(f'{"carga inicial + cálculo":38} {carga_ms:9.2f} ms '
+                  f'({len(ids):,} alumnos x {analisis.dias} días)')
+            medir('cálculo vectorizado completo', lambda: analitica.calcular(analisis._matriz), args.repeticiones)
+            medir('consulta sin cambios', lambda: analisis.indicadores(conn), args.repeticiones)
+
+            alumnos = [fila[0] for fila in conn.execute(
+                'SELECT id FROM alumnos WHERE grupo_id = ?', (escala['grupo_id'],))]
+            marcas = {'valor': 0}
+
+            def guardar_y_consultar():
+                marcas['valor'] ^= 1
+                guardar_lista(conn, escala['grupo_id'], escala['fecha'], [(a, marcas['valor']) for a in alumnos])
+                analisis.indicadores(conn)
+            medir('guardar pase de lista + actualizar', guardar_y_consultar, args.repeticiones)
+
+        client = app.test_client()
+        with client.session_transaction() as sesion:
+            sesion['admin_id'] = 1
+        client.get('/api/alertas-asistencia')
+        medir('GET /api/alertas-asistencia (caché)', lambda: client.get('/api/alertas-asistencia'),
+              args.repeticiones)
+        respuesta = client.get('/api/alertas-asistencia')
+        print(f"Alumnos en riesgo: {respuesta.get_json()['total']:,}")
+    finally:
+        get_pool(app).close_all()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    if carga_ms > args.presupuesto_ms:
+        print(f'La carga inicial ({carga_ms:.0f} ms) supera el presupuesto de {args.presupuesto_ms:.0f} ms')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark de arranque en frío de un worker.
+
+Mide en subprocesos nuevos el tiempo de ``from app import app`` (lo que hace
+cada worker de gunicorn al arrancar: importar y crear la app) sobre una base
+ya migrada. Con ``--ref`` se
+mide también otra revisión del repositorio (p. ej. la anterior a las
+migraciones, que creaba el esquema y calculaba el hash del admin al importar).
+
+Uso: python benchmarks/bench_arranque.py [--ref <commit>] [--repeticiones 10]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def medir(directorio, base, repeticiones, codigo='from app import app'):
+    entorno = {**os.environ, 'DATABASE_PATH': base}
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, '-c', codigo], cwd=directorio, env=entorno, check=True)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ref', help='revisión de git con la que comparar')
+    parser.add_argument('--repeticiones', type=int, default=10)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='bench_arranque_')
+    try:
+        base = os.path.join(tmp, 'bench.db')
+        subprocess.run([sys.executable, '-c', 'from app import app, preparar_db; preparar_db(app)'],
+                       cwd=BASE_DIR, env={**os.environ, 'DATABASE_PATH': base}, check=True)
+        vacio = medir(tmp, base, args.repeticiones, 'pass')  # costo del intérprete solo
+        actual = medir(BASE_DIR, base, args.repeticiones)
+        print(f"{'árbol actual':20} {actual:8.1f} ms  (import app: {actual - vacio:.1f} ms)")
+
+        if args.ref:
+            arbol = os.path.join(tmp, 'ref')
+            subprocess.run(['git', 'worktree', 'add', '--detach', arbol, args.ref],
+                           cwd=BASE_DIR, check=True, capture_output=True)
+            try:
+                base_ref = os.path.join(tmp, 'ref.db')
+                shutil.copy(base, base_ref)
+                anterior = medir(arbol, base_ref, args.repeticiones)
+                print(f"{args.ref[:20]:20} {anterior:8.1f} ms  (import app: {anterior - vacio:.1f} ms)")
+            finally:
+                subprocess.run(['git', 'worktree', 'remove', '--force', arbol], cwd=BASE_DIR, check=True)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
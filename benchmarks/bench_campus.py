@@ -0,0 +1,159 @@
+"""Benchmark de escrituras de asistencia concurrentes: un archivo frente a campus.
+
+Varios procesos (como los workers de servidor.py) con varios hilos cada uno
+guardan pases de lista durante unos segundos. Con un solo archivo todas las
+transacciones esperan el mismo bloqueo de escritura de SQLite; con --campus N
+cada grupo vive en el archivo de su campus (grupo % N) y sólo compiten las
+escrituras del mismo campus. También se mide el resumen entre campus
+(Enrutador.repartir) frente a la misma consulta sobre el archivo único.
+
+Uso: python benchmarks/bench_campus.py [--campus 4] [--procesos 4] [--hilos 4]
+                                       [--segundos 5] [--grupos 80] [--alumnos 40]
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+TMP_DIR = tempfile.mkdtemp(prefix='bench_campus_')
+os.environ['DATABASE_PATH'] = os.path.join(TMP_DIR, 'principal.db')
+
+from asistencias import guardar_lista  # noqa: E402
+import comun  # noqa: E402
+from db import ConnectionPool  # noqa: E402
+import estadisticas  # noqa: E402
+import migraciones  # noqa: E402
+
+ESQUEMA = os.path.join(TMP_DIR, 'esquema.db')
+INICIO = date(2020, 1, 1)
+
+
+def preparar(rutas, grupos, alumnos):
+    """Copia el esquema a cada archivo y siembra en él los grupos que le tocan."""
+    pool = ConnectionPool(ESQUEMA, size=1)
+    with pool.connection() as conn:
+        migraciones.aplicar(conn)
+    pool.close_all()
+    for indice, ruta in enumerate(rutas):
+        shutil.copy(ESQUEMA, ruta)
+        pool = ConnectionPool(ruta, size=1)
+        with pool.connection() as conn, conn:
+            conn.execute("INSERT INTO carreras (id, nombre, codigo) VALUES (1, 'Bench', 'B')")
+            propios = [g for g in range(1, grupos + 1) if g % len(rutas) == indice]
+            conn.executemany('INSERT INTO grupos (id, carrera_id, nombre, codigo) VALUES (?, 1, ?, ?)',
+                             [(g, f'G{g}', f'B-{g}') for g in propios])
+            conn.executemany("INSERT INTO alumnos (grupo_id, matricula, apellidos, nombre) VALUES (?, ?, 'A', 'N')",
+                             [(g, f'B{g}-{a}') for g in propios for a in range(alumnos)])
+        pool.close_all()
+
+
+def trabajador(rutas, proceso, hilos, segundos, grupos):
+    import threading
+
+    pools = [ConnectionPool(ruta, size=hilos, timeout=30) for ruta in rutas]
+    por_grupo = {}
+    for pool in pools:
+        with pool.connection() as conn:
+            for alumno_id, grupo_id in conn.execute('SELECT id, grupo_id FROM alumnos'):
+                por_grupo.setdefault(grupo_id, []).append(alumno_id)
+
+    latencias = []
+    limite = time.perf_counter() + segundos
+
+    def hilo(numero):
+        grupo_id = (proceso * hilos + numero) % grupos + 1
+        pool = pools[grupo_id % len(pools)]
+        marcas = [(a, a % 5 != 0) for a in por_grupo[grupo_id]]
+        # Cada hilo escribe fechas propias para que todas sean inserciones nuevas
+        dia = (proceso * hilos + numero) * 100000
+        while time.perf_counter() < limite:
+            fecha = (INICIO + timedelta(days=dia % 2900000)).isoformat()
+            inicio = time.perf_counter()
+            with pool.connection() as conn:
+                guardar_lista(conn, grupo_id, fecha, marcas)
+            latencias.append(time.perf_counter() - inicio)
+            dia += 1
+
+    threads = [threading.Thread(target=hilo, args=(n,)) for n in range(hilos)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for pool in pools:
+        pool.close_all()
+    return latencias
+
+
+def escribir(nombre, rutas, args):
+    preparar(rutas, args.grupos, args.alumnos)
+    with multiprocessing.get_context('fork').Pool(args.procesos) as procesos:
+        inicio = time.perf_counter()
+        partes = procesos.starmap(trabajador, [
+            (rutas, p, args.hilos, args.segundos, args.grupos) for p in range(args.procesos)
+        ])
+        total = time.perf_counter() - inicio
+    latencias = [x for parte in partes for x in parte]
+    r = comun.resumir(latencias, total)
+    print(f'{nombre:14} {r["n"]:7,} pases ({r["por_segundo"] * args.alumnos:10,.0f} marcas/s)  '
+          f'p50 {r["p50_ms"]:7.2f} ms  p95 {r["p95_ms"]:7.2f} ms  p99 {r["p99_ms"]:7.2f} ms')
+    return r
+
+
+def resumen(nombre, rutas, repeticiones):
+    from flask import Flask
+
+    from campus import Enrutador, PRINCIPAL
+
+    app = Flask(__name__)
+    app.config.update(DATABASE=rutas[0], DB_POOL_SIZE=2, DB_BUSY_TIMEOUT=30, DB_JOURNAL_MODE='WAL',
+                      DB_CONNECTION_FACTORY=sqlite3.Connection, DB_CAMPUS_HILOS=None,
+                      DB_CAMPUS={f'c{i}': ruta for i, ruta in enumerate(rutas[1:], 1)})
+    enrutador = Enrutador(app)
+    enrutador.pool(PRINCIPAL)  # crea el pool principal fuera de la medición
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        combinado = estadisticas.combinar_parciales(enrutador.repartir(estadisticas.parcial_carreras))
+        tiempos.append(time.perf_counter() - inicio)
+    enrutador.close_all()
+    app.extensions['sqlite_pool'].close_all()
+    r = comun.resumir(tiempos)
+    print(f'{nombre:14} resumen entre campus: p50 {r["p50_ms"]:7.2f} ms  '
+          f'({combinado["total"]["registros"]:,} marcas)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--campus', type=int, default=4)
+    parser.add_argument('--procesos', type=int, default=4)
+    parser.add_argument('--hilos', type=int, default=4)
+    parser.add_argument('--segundos', type=float, default=5)
+    parser.add_argument('--grupos', type=int, default=80)
+    parser.add_argument('--alumnos', type=int, default=40)
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        print(f'{args.procesos} procesos x {args.hilos} hilos, {args.segundos:g} s, '
+              f'{args.grupos} grupos x {args.alumnos} alumnos')
+        unico = [os.path.join(TMP_DIR, 'unico.db')]
+        campus = [os.path.join(TMP_DIR, f'campus{i}.db') for i in range(args.campus)]
+        a = escribir('un archivo', unico, args)
+        b = escribir(f'{args.campus} campus', campus, args)
+        print(f'rendimiento x{b["por_segundo"] / a["por_segundo"]:.2f}, p95 x{a["p95_ms"] / b["p95_ms"]:.2f} menor')
+        resumen('un archivo', unico, args.repeticiones)
+        resumen(f'{args.campus} campus', campus, args.repeticiones)
+    finally:
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark de descargas concurrentes de reportes.
+
+Levanta la app en un servidor WSGI local con hilos y lanza N descargas con
+C conexiones simultáneas de un reporte de T KiB: completas desde el almacén
+por contenido, parciales con Range y, como referencia, completas por la ruta
+anterior (archivo suelto en REPORTES_FOLDER).
+
+Uso: python benchmarks/bench_descargas_reportes.py [--descargas 1000] [--concurrencia 100] [--kib 256]
+"""
+import argparse
+import http.client
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+TMP_DIR = tempfile.mkdtemp(prefix='bench_descargas_')
+os.environ['DATABASE_PATH'] = os.path.join(TMP_DIR, 'bench.db')
+
+from werkzeug.serving import make_server  # noqa: E402
+
+from almacen import REGISTRAR_OBJETO  # noqa: E402
+from app import create_app, get_pool, preparar_db  # noqa: E402
+
+
+def preparar(app, kib):
+    contenido = (b'Reporte de prueba del invernadero\n' * (kib * 32))[:kib * 1024]
+    almacen = app.extensions['almacen_reportes']
+    digest, tamano = almacen.guardar(contenido)
+    anterior = os.path.join(app.config['REPORTES_FOLDER'], 'reporte_anterior.txt')
+    with open(anterior, 'wb') as f:
+        f.write(contenido)
+    with get_pool(app).connection() as conn, conn:
+        conn.execute(REGISTRAR_OBJETO, (digest, tamano))
+        nuevo = conn.execute('''
+            INSERT INTO reportes (proyecto_id, nombre_archivo, ruta_archivo, tipo, hash)
+            VALUES (1, 'reporte_bench.txt', ?, 'texto', ?)
+        ''', (almacen.relativa(digest), digest)).lastrowid
+        viejo = conn.execute('''
+            INSERT INTO reportes (proyecto_id, nombre_archivo, ruta_archivo, tipo)
+            VALUES (1, 'reporte_anterior.txt', ?, 'texto')
+        ''', (anterior,)).lastrowid
+    return nuevo, viejo, tamano
+
+
+def descargar(puerto, ruta, cabeceras):
+    inicio = time.perf_counter()
+    conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=60)
+    conexion.request('GET', ruta, headers=cabeceras)
+    respuesta = conexion.getresponse()
+    recibidos = len(respuesta.read())
+    conexion.close()
+    return time.perf_counter() - inicio, respuesta.status, recibidos
+
+
+def ronda(nombre, puerto, ruta, cabeceras, descargas, concurrencia):
+    with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+        inicio = time.perf_counter()
+        resultados = list(pool.map(lambda _: descargar(puerto, ruta, cabeceras), range(descargas)))
+        total = time.perf_counter() - inicio
+    tiempos = sorted(r[0] * 1000 for r in resultados)
+    estados = {r[1] for r in resultados}
+    megas = sum(r[2] for r in resultados) / 2 ** 20
+    percentil = statistics.quantiles(tiempos, n=100)
+    print(f'{nombre:18} {descargas / total:8.0f} desc/s {megas / total:8.1f} MiB/s  '
+          f'p50 {percentil[49]:7.1f} ms  p95 {percentil[94]:7.1f} ms  p99 {percentil[98]:7.1f} ms  '
+          f'estados {sorted(estados)}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--descargas', type=int, default=1000)
+    parser.add_argument('--concurrencia', type=int, default=100)
+    parser.add_argument('--kib', type=int, default=256)
+    args = parser.parse_args()
+
+    app = create_app({
+        'REPORTES_FOLDER': os.path.join(TMP_DIR, 'reportes'),
+        'RECONCILIAR_INTERVALO': 0,
+        'METRICAS_LENTO_MS': None,
+        'DB_POOL_SIZE': args.concurrencia,
+    })
+    servidor = None
+    try:
+        preparar_db(app)
+        nuevo, viejo, tamano = preparar(app, args.kib)
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        servidor = make_server('127.0.0.1', 0, app, threaded=True)
+        servidor.daemon_threads = True
+        servidor.request_queue_size = args.concurrencia
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+        client = app.test_client()
+        with client.session_transaction() as sesion:
+            sesion['admin_id'] = 1
+        cookie = client.get_cookie('session')
+        cabeceras = {'Cookie': f'session={cookie.value}'} if cookie else {}
+
+        print(f'{args.descargas} descargas de {tamano // 1024} KiB, {args.concurrencia} simultáneas')
+        ronda('ruta anterior', servidor.port, f'/descargar-reporte/{viejo}', cabeceras,
+              args.descargas, args.concurrencia)
+        ronda('almacén completo', servidor.port, f'/descargar-reporte/{nuevo}', cabeceras,
+              args.descargas, args.concurrencia)
+        ronda('almacén Range 4K', servidor.port, f'/descargar-reporte/{nuevo}',
+              {**cabeceras, 'Range': 'bytes=0-4095'}, args.descargas, args.concurrencia)
+    finally:
+        if servidor is not None:
+            servidor.shutdown()
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark de guardado de pases de lista.
+
+Guarda N grupos x M alumnos en paralelo, como ocurre en el cambio de clase,
+comparando un commit por alumno frente a ``guardar_lista`` (una transacción
+con ``executemany`` por pase de lista).
+
+Uso: python benchmarks/bench_guardar_asistencia.py [--grupos 40] [--alumnos 45]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+TMP_DIR = tempfile.mkdtemp(prefix='bench_asistencia_')
+ESQUEMA = os.path.join(TMP_DIR, 'esquema.db')
+os.environ['DATABASE_PATH'] = ESQUEMA
+
+from app import app, get_pool, preparar_db  # noqa: E402
+from asistencias import UPSERT_ASISTENCIA, UPSERT_DETALLE, guardar_lista  # noqa: E402
+from db import ConnectionPool  # noqa: E402
+
+
+def sembrar(pool, grupos, alumnos):
+    with pool.connection() as conn, conn:
+        conn.execute('INSERT OR IGNORE INTO carreras (id, nombre, codigo) VALUES (1, "Bench", "B")')
+        conn.executemany('INSERT INTO grupos (id, carrera_id, nombre, codigo) VALUES (?, 1, ?, ?)',
+                         [(g, f'G{g}', f'B-{g}') for g in range(1, grupos + 1)])
+        conn.executemany('INSERT INTO alumnos (grupo_id, matricula, apellidos, nombre) VALUES (?, ?, "A", "N")',
+                         [(g, f'B{g}-{a}') for g in range(1, grupos + 1) for a in range(alumnos)])
+        por_grupo = {}
+        for alumno_id, grupo_id in conn.execute('SELECT id, grupo_id FROM alumnos'):
+            por_grupo.setdefault(grupo_id, []).append(alumno_id)
+    return por_grupo
+
+
+def fila_por_fila(conn, grupo_id, fecha, marcas):
+    with conn:
+        conn.execute(UPSERT_ASISTENCIA, (grupo_id, fecha))
+    asistencia_id = conn.execute('SELECT id FROM asistencias WHERE grupo_id = ? AND fecha = ?',
+                                 (grupo_id, fecha)).fetchone()[0]
+    for alumno_id, presente in marcas:
+        with conn:
+            conn.execute(UPSERT_DETALLE, (asistencia_id, alumno_id, presente))
+
+
+def ejecutar(nombre, guardar, grupos, alumnos):
+    ruta = os.path.join(TMP_DIR, f'{nombre}.db')
+    shutil.copy(ESQUEMA, ruta)
+    pool = ConnectionPool(ruta, size=grupos, timeout=30)
+    por_grupo = sembrar(pool, grupos, alumnos)
+
+    def tarea(grupo_id):
+        marcas = [(a, a % 5 != 0) for a in por_grupo[grupo_id]]
+        with pool.connection() as conn:
+            guardar(conn, grupo_id, '2025-01-15', marcas)
+
+    threads = [threading.Thread(target=tarea, args=(g,)) for g in por_grupo]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    total = time.perf_counter() - inicio
+    pool.close_all()
+    print(f'{nombre:14} {grupos} grupos x {alumnos} alumnos: {total * 1000:8.1f} ms '
+          f'({grupos * alumnos / total:,.0f} marcas/s)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--grupos', type=int, default=40)
+    parser.add_argument('--alumnos', type=int, default=45)
+    args = parser.parse_args()
+
+    try:
+        preparar_db(app)
+        with get_pool(app).connection() as conn, conn:
+            conn.execute('DELETE FROM alumnos')
+            conn.execute('DELETE FROM grupos')
+        get_pool(app).close_all()
+
+        ejecutar('fila_por_fila', fila_por_fila, args.grupos, args.alumnos)
+        ejecutar('guardar_lista', guardar_lista, args.grupos, args.alumnos)
+    finally:
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark de importación masiva de alumnos.
+
+Genera un CSV de N filas (por defecto 50 000, con un 1 % de matrículas
+repetidas) y lo importa con ``importacion.importar``, reportando filas/s y
+memoria máxima asignada durante la importación.
+
+Uso: python benchmarks/bench_importar_alumnos.py [--filas 50000]
+"""
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+TMP_DIR = tempfile.mkdtemp(prefix='bench_importar_')
+os.environ['DATABASE_PATH'] = os.path.join(TMP_DIR, 'bench.db')
+
+from app import app, get_pool, preparar_db  # noqa: E402
+from importacion import importar, leer_csv  # noqa: E402
+
+
+def generar_csv(ruta, filas):
+    grupos = ['IS-1925', 'IS-2925', 'IS-3925', 'ITM-1625', 'ITM-1325',
+              'ITM-2326', 'IMA-1925', 'IMA-2325', 'IMA-3325']
+    with open(ruta, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(['matricula', 'apellidos', 'nombre', 'grupo'])
+        for i in range(filas):
+            numero = i - 1 if i % 100 == 99 else i
+            escritor.writerow([f'M{numero:07d}', f'Apellido{i % 700}', f'Nombre{i % 300}', grupos[i % 9]])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--filas', type=int, default=50000)
+    args = parser.parse_args()
+
+    try:
+        preparar_db(app)
+        ruta = os.path.join(TMP_DIR, 'alumnos.csv')
+        generar_csv(ruta, args.filas)
+        tamano = os.path.getsize(ruta) / 1024 / 1024
+
+        with open(ruta, 'rb') as f, get_pool(app).connection() as conn:
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            resultado = importar(conn, leer_csv(f))
+            total = time.perf_counter() - inicio
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        print(f"archivo: {args.filas} filas ({tamano:.1f} MB)")
+        print(f"insertados: {resultado['insertados']}  errores: {resultado['total_errores']}")
+        print(f"tiempo: {total:.2f} s  ({args.filas / total:,.0f} filas/s)  "
+              f"memoria pico: {pico / 1024 / 1024:.1f} MB")
+    finally:
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark de la hoja de pase de lista (/lista-asistencia).
+
+Para un grupo de N alumnos con un pase de lista guardado mide el tiempo
+hasta el primer byte de la página completa (200), de la revalidación con
+If-None-Match (304) y, a nivel SQL, las dos consultas anteriores frente a
+la consulta única de ``hoja_asistencia``.
+
+Uso: python benchmarks/bench_lista_asistencia.py [--alumnos 60] [--peticiones 500]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+TMP_DIR = tempfile.mkdtemp(prefix='bench_lista_')
+os.environ['DATABASE_PATH'] = os.path.join(TMP_DIR, 'bench.db')
+
+from app import app, get_pool, preparar_db  # noqa: E402
+from asistencias import guardar_lista, hoja_asistencia  # noqa: E402
+
+FECHA = '2025-03-10'
+
+
+def sembrar(conn, alumnos):
+    with conn:
+        conn.execute("INSERT INTO grupos (carrera_id, nombre, codigo) VALUES (1, 'Bench', 'BENCH-1')")
+        grupo_id = conn.execute("SELECT id FROM grupos WHERE codigo = 'BENCH-1'").fetchone()[0]
+        conn.executemany('INSERT INTO alumnos (grupo_id, matricula, apellidos, nombre) VALUES (?, ?, ?, ?)',
+                         [(grupo_id, f'BENCH{i:04d}', f'Apellido{(i * 37) % alumnos:03d}', f'Nombre{i}')
+                          for i in range(alumnos)])
+    ids = [fila[0] for fila in conn.execute('SELECT id FROM alumnos WHERE grupo_id = ?', (grupo_id,))]
+    guardar_lista(conn, grupo_id, FECHA, [(alumno_id, alumno_id % 4 != 0) for alumno_id in ids])
+    return grupo_id
+
+
+def consultas_anteriores(conn, grupo_id):
+    grupo = conn.execute('''
+        SELECT g.*, c.nombre as carrera_nombre
+        FROM grupos g JOIN carreras c ON g.carrera_id = c.id
+        WHERE g.id = ?
+    ''', (grupo_id,)).fetchone()
+    alumnos = conn.execute('SELECT * FROM alumnos WHERE grupo_id = ? ORDER BY apellidos, nombre',
+                           (grupo_id,)).fetchall()
+    return dict(grupo), [dict(a) for a in alumnos]
+
+
+def medir(nombre, funcion, repeticiones):
+    funcion()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    print(f'{nombre:34} {(time.perf_counter() - inicio) * 1e6 / repeticiones:8.1f} µs')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--alumnos', type=int, default=60)
+    parser.add_argument('--peticiones', type=int, default=500)
+    args = parser.parse_args()
+
+    app.config['METRICAS_LENTO_MS'] = None
+    try:
+        preparar_db(app)
+        with get_pool(app).connection() as conn:
+            grupo_id = sembrar(conn, args.alumnos)
+            print(f'Grupo de {args.alumnos} alumnos')
+            medir('SQL: dos consultas + dict()', lambda: consultas_anteriores(conn, grupo_id), args.peticiones)
+            medir('SQL: hoja_asistencia', lambda: hoja_asistencia(conn, grupo_id, FECHA), args.peticiones)
+
+        client = app.test_client()
+        with client.session_transaction() as sesion:
+            sesion['admin_id'] = 1
+        url = f'/lista-asistencia?grupo_id={grupo_id}&fecha={FECHA}'
+        respuesta = client.get(url)
+        etag = respuesta.headers['ETag']
+        print(f'página: {len(respuesta.data):,} bytes, ETag {etag}')
+
+        def primer_byte(cabeceras):
+            # El test client devuelve la respuesta ya generada; el tiempo hasta
+            # tenerla equivale al TTFB sin red.
+            return lambda: client.get(url, headers=cabeceras, buffered=False).close()
+
+        medir('TTFB 200 (página completa)', primer_byte({}), args.peticiones)
+        medir('TTFB 304 (If-None-Match)', primer_byte({'If-None-Match': etag}), args.peticiones)
+    finally:
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark del inicio de sesión con límite de intentos.
+
+Mide el CPU por intento fallido que todavía llega al hash de la contraseña
+frente al de un intento rechazado por el limitador (antes de consultar la
+base), con ambos limitadores, y la latencia de /api/user-info con la
+identidad en la sesión frente a la consulta a la base de antes.
+
+Uso: python benchmarks/bench_login.py [--intentos 200]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+TMP_DIR = tempfile.mkdtemp(prefix='bench_login_')
+os.environ['DATABASE_PATH'] = os.path.join(TMP_DIR, 'bench.db')
+
+from app import create_app, get_pool, preparar_db  # noqa: E402
+
+
+def cpu_por_intento(client, n, ip):
+    inicio_cpu, inicio = time.process_time(), time.perf_counter()
+    estados = set()
+    for _ in range(n):
+        respuesta = client.post('/', data={'username': 'ADMIN', 'password': 'incorrecta'},
+                                environ_base={'REMOTE_ADDR': ip})
+        estados.add(respuesta.status_code)
+    return ((time.process_time() - inicio_cpu) / n * 1000,
+            (time.perf_counter() - inicio) / n * 1000, sorted(estados))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--intentos', type=int, default=200)
+    args = parser.parse_args()
+
+    try:
+        for tipo in ('memoria', 'sqlite'):
+            app = create_app({
+                'REPORTES_FOLDER': os.path.join(TMP_DIR, 'reportes'),
+                'RECONCILIAR_INTERVALO': 0,
+                'METRICAS_LENTO_MS': None,
+                'LOGIN_LIMITADOR': tipo,
+                'LOGIN_MAX_INTENTOS_USUARIO': 5,
+            })
+            preparar_db(app)
+            client = app.test_client()
+            # Los primeros 5 fallos llegan al hash; con el límite alcanzado el
+            # resto se rechaza sin tocarlo
+            cpu, pared, estados = cpu_por_intento(client, 5, '10.0.0.1')
+            print(f'[{tipo:7}] fallo con hash:     {cpu:8.3f} ms CPU  {pared:8.3f} ms  estados {estados}')
+            cpu, pared, estados = cpu_por_intento(client, args.intentos, '10.0.0.1')
+            print(f'[{tipo:7}] intento rechazado:  {cpu:8.3f} ms CPU  {pared:8.3f} ms  estados {estados}')
+            get_pool(app).close_all()
+
+        app.config['LOGIN_LIMITADOR'] = 'memoria'
+        client = app.test_client()
+        with client.session_transaction() as sesion:
+            sesion['admin_id'] = 1
+        for nombre, usuario in (('consulta a la base', None), ('identidad en sesión', 'ADMIN')):
+            with client.session_transaction() as sesion:
+                sesion.pop('admin_usuario', None)
+            if usuario:
+                client.get('/api/user-info')  # la primera respuesta la deja en la sesión
+            inicio = time.perf_counter()
+            for _ in range(args.intentos):
+                # Mismo costo de preparar la cookie en los dos casos
+                with client.session_transaction() as sesion:
+                    if not usuario:
+                        sesion.pop('admin_usuario', None)
+                client.get('/api/user-info')
+            print(f'/api/user-info {nombre:20} {(time.perf_counter() - inicio) / args.intentos * 1000:8.3f} ms')
+    finally:
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark del costo de la instrumentación.
+
+Ejecuta las mismas peticiones con las métricas activas y desactivadas
+(``METRICAS_ACTIVAS``) y reporta el costo adicional por petición.
+
+Uso: python benchmarks/bench_metricas.py [--peticiones 5000]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+TMP_DIR = tempfile.mkdtemp(prefix='bench_metricas_')
+os.environ['DATABASE_PATH'] = os.path.join(TMP_DIR, 'bench.db')
+
+from app import app, preparar_db  # noqa: E402
+
+RUTAS = ('/api/alumnos/1', '/get-proyecto/1', '/api/historial-asistencia?grupo_id=1')
+
+
+def medir(client, peticiones):
+    inicio = time.perf_counter()
+    for i in range(peticiones):
+        client.get(RUTAS[i % len(RUTAS)])
+    return (time.perf_counter() - inicio) / peticiones * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--peticiones', type=int, default=5000)
+    parser.add_argument('--rondas', type=int, default=3)
+    args = parser.parse_args()
+
+    app.config['METRICAS_LENTO_MS'] = None
+    client = app.test_client()
+    try:
+        preparar_db(app)
+        medir(client, 200)  # calentamiento
+        resultados = {True: [], False: []}
+        for _ in range(args.rondas):
+            for activas in (False, True):
+                app.config['METRICAS_ACTIVAS'] = activas
+                resultados[activas].append(medir(client, args.peticiones))
+        sin, con = min(resultados[False]), min(resultados[True])
+        print(f'sin métricas: {sin:8.1f} µs/petición')
+        print(f'con métricas: {con:8.1f} µs/petición')
+        print(f'sobrecosto:   {con - sin:8.1f} µs/petición ({(con - sin) / sin * 100:.1f} %)')
+    finally:
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark de paginación y búsqueda de observaciones.
+
+Con N observaciones compara OFFSET frente al cursor (fecha, id) para la
+primera página y para una página profunda, y mide la búsqueda FTS5 frente
+a ``LIKE '%...%'`` con un término frecuente y uno raro (1 de cada 1000).
+
+Uso: python benchmarks/bench_observaciones.py [--filas 100000] [--repeticiones 20]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+TMP_DIR = tempfile.mkdtemp(prefix='bench_observaciones_')
+os.environ['DATABASE_PATH'] = os.path.join(TMP_DIR, 'bench.db')
+
+from app import app, get_pool, preparar_db  # noqa: E402
+import observaciones as obs  # noqa: E402
+
+PALABRAS = ('riego', 'plaga', 'hongo', 'tomate', 'chile', 'pepino', 'humedad', 'temperatura',
+            'fertilizante', 'poda', 'cosecha', 'invernadero', 'sustrato', 'germinación', 'hoja')
+
+
+def sembrar(conn, filas):
+    rnd = random.Random(1)
+    with conn:
+        conn.executemany(
+            "INSERT INTO observaciones (texto, fecha) VALUES (?, datetime('2020-01-01', ? || ' minutes'))",
+            ((' '.join(rnd.choice(PALABRAS) for _ in range(12)) + (' nematodo' if i % 1000 == 0 else ''), i)
+             for i in range(filas)))
+
+
+def medir(nombre, funcion, repeticiones):
+    funcion()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    ms = (time.perf_counter() - inicio) * 1000 / repeticiones
+    print(f'{nombre:32} {ms:8.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--filas', type=int, default=100000)
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        preparar_db(app)
+        with get_pool(app).connection() as conn:
+            sembrar(conn, args.filas)
+            profundo = args.filas - obs.POR_PAGINA * 2
+            fila = conn.execute('SELECT id, fecha FROM observaciones ORDER BY fecha DESC, id DESC '
+                                'LIMIT 1 OFFSET ?', (profundo - 1,)).fetchone()
+            cursor = f"{fila['fecha']}_{fila['id']}"
+
+            def offset(desplazamiento):
+                return lambda: conn.execute(
+                    'SELECT id, texto, fecha FROM observaciones ORDER BY fecha DESC LIMIT ? OFFSET ?',
+                    (obs.POR_PAGINA, desplazamiento)).fetchall()
+
+            print(f'{args.filas:,} observaciones, páginas de {obs.POR_PAGINA}')
+            medir('OFFSET primera página', offset(0), args.repeticiones)
+            medir(f'OFFSET página en {profundo:,}', offset(profundo), args.repeticiones)
+            medir('cursor primera página', lambda: obs.pagina(conn), args.repeticiones)
+            medir(f'cursor página en {profundo:,}', lambda: obs.pagina(conn, cursor), args.repeticiones)
+            for termino in ('germinación', 'nematodo'):
+                medir(f"LIKE '%{termino}%'", lambda t=termino: conn.execute(
+                    'SELECT id, texto, fecha FROM observaciones WHERE texto LIKE ? '
+                    'ORDER BY fecha DESC LIMIT ?', (f'%{t}%', obs.POR_PAGINA)).fetchall(), args.repeticiones)
+                medir(f'FTS5 "{termino}"', lambda t=termino: obs.buscar(conn, t), args.repeticiones)
+            medir('FTS5 "plaga hongo"', lambda: obs.buscar(conn, 'plaga hongo'), args.repeticiones)
+        get_pool(app).close_all()
+    finally:
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
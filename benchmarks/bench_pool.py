@@ -0,0 +1,98 @@
+"""Benchmark del pool de conexiones SQLite.
+
+Lanza peticiones concurrentes a ``GET /api/alumnos/<grupo_id>`` y
+``POST /observaciones`` y reporta p50/p99 con la configuración anterior
+(conexión nueva por petición, journal DELETE) frente al pool con WAL.
+
+Uso: python benchmarks/bench_pool.py [--hilos 16] [--peticiones 200]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+TMP_DIR = tempfile.mkdtemp(prefix='bench_pool_')
+os.environ.setdefault('DATABASE_PATH', os.path.join(TMP_DIR, 'inicial.db'))
+
+from app import app, preparar_db  # noqa: E402
+
+
+MODOS = {
+    'antes': {'DB_POOL_SIZE': 0, 'DB_JOURNAL_MODE': 'DELETE'},
+    'despues': {'DB_POOL_SIZE': 8, 'DB_JOURNAL_MODE': 'WAL'},
+}
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    k = max(0, min(len(valores) - 1, round(p / 100 * (len(valores) - 1))))
+    return valores[k]
+
+
+def trabajador(peticiones, latencias, lock):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['admin_id'] = 1
+    locales = []
+    for i in range(peticiones):
+        inicio = time.perf_counter()
+        if i % 4 == 0:
+            client.post('/observaciones', data={'observacion': f'bench {i}'})
+        else:
+            client.get('/api/alumnos/1')
+        locales.append((time.perf_counter() - inicio) * 1000)
+    with lock:
+        latencias.extend(locales)
+
+
+def ejecutar(modo, hilos, peticiones):
+    ruta = os.path.join(TMP_DIR, f'{modo}.db')
+    shutil.copy(os.path.join(BASE_DIR, 'database.db'), ruta)
+    pool = app.extensions.pop('sqlite_pool', None)
+    if pool is not None:
+        pool.close_all()
+    app.config.update(DATABASE=ruta, **MODOS[modo])
+    preparar_db(app)
+
+    latencias, lock = [], threading.Lock()
+    threads = [threading.Thread(target=trabajador, args=(peticiones, latencias, lock))
+               for _ in range(hilos)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    total = time.perf_counter() - inicio
+    return {
+        'peticiones': len(latencias),
+        'req_s': len(latencias) / total,
+        'p50_ms': statistics.median(latencias),
+        'p99_ms': percentil(latencias, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hilos', type=int, default=16)
+    parser.add_argument('--peticiones', type=int, default=200)
+    args = parser.parse_args()
+
+    app.config['METRICAS_LENTO_MS'] = None
+    try:
+        for modo in MODOS:
+            r = ejecutar(modo, args.hilos, args.peticiones)
+            print(f"{modo:8} {r['peticiones']:6d} peticiones  {r['req_s']:8.1f} req/s  "
+                  f"p50={r['p50_ms']:.2f} ms  p99={r['p99_ms']:.2f} ms")
+    finally:
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
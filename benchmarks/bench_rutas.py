@@ -0,0 +1,124 @@
+"""Micro-benchmark por endpoint con el test client de Flask.
+
+Mide cada ruta de app.py (más el login) sobre una base sintética y escribe
+percentiles de latencia en JSON. Con --comparar se contrasta contra una
+ejecución anterior y el proceso termina con código 1 si alguna ruta empeoró
+más que la tolerancia.
+
+Uso: python benchmarks/bench_rutas.py [--db base.db | --alumnos 2000 --dias 60]
+                                      [--repeticiones 200] [--salida rutas.json]
+                                      [--comparar base.json] [--tolerancia 0.2]
+"""
+import argparse
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import comun  # noqa: E402
+import datos as generador  # noqa: E402
+
+
+def medir_ruta(client, metodo, ruta, cuerpo, repeticiones):
+    for _ in range(3):  # calentamiento (cachés, sentencias preparadas)
+        client.open(ruta, method=metodo, json=cuerpo)
+    latencias, errores = [], 0
+    inicio_total = time.perf_counter()
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        respuesta = client.open(ruta, method=metodo, json=cuerpo)
+        respuesta.get_data()
+        latencias.append(time.perf_counter() - inicio)
+        errores += respuesta.status_code >= 400
+    resultado = comun.resumir(latencias, time.perf_counter() - inicio_total)
+    resultado['errores'] = errores
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', help='base generada con benchmarks/datos.py (se usa una copia)')
+    parser.add_argument('--alumnos', type=int, default=2000)
+    parser.add_argument('--dias', type=int, default=60)
+    parser.add_argument('--observaciones', type=int, default=5000)
+    parser.add_argument('--repeticiones', type=int, default=200)
+    parser.add_argument('--logins', type=int, default=10)
+    parser.add_argument('--rutas', help='nombres separados por comas (por omisión todas)')
+    parser.add_argument('--salida', help='archivo JSON de resultados')
+    parser.add_argument('--comparar', help='JSON de una ejecución previa')
+    parser.add_argument('--tolerancia', type=float, default=0.2)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='bench_rutas_')
+    ruta_db = os.path.join(tmp_dir, 'bench.db')
+    if args.db:
+        shutil.copy(args.db, ruta_db)
+    os.environ['DATABASE_PATH'] = ruta_db
+
+    from app import create_app, get_pool, preparar_db
+
+    app = create_app({
+        'REPORTES_FOLDER': os.path.join(tmp_dir, 'reportes'),
+        'PDF_CACHE_FOLDER': os.path.join(tmp_dir, 'pdf'),
+        'RECONCILIAR_INTERVALO': 0,
+        'METRICAS_LENTO_MS': None,
+    })
+    try:
+        preparar_db(app)
+        with get_pool(app).connection() as conn:
+            if args.db:
+                escala = generador.resumen(conn)
+            else:
+                escala = generador.generar(conn, alumnos=args.alumnos, dias=args.dias,
+                                           observaciones=args.observaciones)
+        print(f"Escala: {escala['alumnos']:,} alumnos, {escala['sesiones']:,} sesiones, "
+              f"{escala['observaciones']:,} observaciones")
+
+        client = app.test_client()
+        resultados = {}
+
+        # El login es lento a propósito (hash de la contraseña): pocas repeticiones
+        latencias = []
+        for _ in range(args.logins):
+            inicio = time.perf_counter()
+            respuesta = client.post('/', data={'username': comun.USUARIO, 'password': comun.PASSWORD})
+            latencias.append(time.perf_counter() - inicio)
+        if respuesta.status_code != 302:
+            raise SystemExit('El login de prueba falló')
+        resultados['login'] = {**comun.resumir(latencias), 'errores': 0}
+
+        elegidas = set(args.rutas.split(',')) if args.rutas else None
+        for nombre, metodo, ruta, cuerpo in comun.rutas(escala):
+            if elegidas and nombre not in elegidas:
+                continue
+            resultados[nombre] = medir_ruta(client, metodo, ruta, cuerpo, args.repeticiones)
+
+        print(f"{'ruta':24} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} errores")
+        for nombre, r in resultados.items():
+            print(f"{nombre:24} {r['p50_ms']:9.3f} {r['p95_ms']:9.3f} {r['p99_ms']:9.3f} "
+                  f"{r.get('por_segundo', 0):9.1f} {r['errores']}")
+
+        salida = {
+            'herramienta': 'bench_rutas',
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'escala': escala,
+            'rutas': resultados,
+        }
+        if args.salida:
+            comun.guardar(salida, args.salida)
+        if args.comparar and comun.comparar(salida, args.comparar, tolerancia=args.tolerancia):
+            sys.exit(1)
+    finally:
+        get_pool(app).close_all()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
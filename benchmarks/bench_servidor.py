@@ -0,0 +1,137 @@
+"""Benchmark del servidor de producción frente al servidor de depuración.
+
+Levanta cada servidor en un proceso aparte sobre la misma base sintética y
+mide peticiones por segundo con C clientes simultáneos para un recurso
+estático (CSS con gzip), /health y dos rutas dinámicas.
+
+Uso: python benchmarks/bench_servidor.py [--duracion 5] [--clientes 16] [--workers 4] [--hilos 8]
+"""
+import argparse
+import http.client
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import comun  # noqa: E402
+
+DEPURACION = '''
+import logging, sys
+sys.path.insert(0, {base!r})
+from app import app
+logging.getLogger('werkzeug').setLevel(logging.ERROR)
+app.run(host='127.0.0.1', port={puerto}, debug=True, use_reloader=False)
+'''
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def esperar(puerto, limite=60):
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        try:
+            conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=2)
+            conexion.request('GET', '/health')
+            if conexion.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'El servidor en el puerto {puerto} no arrancó')
+
+
+def iniciar_sesion(puerto):
+    conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+    conexion.request('POST', '/', body=urlencode({'username': comun.USUARIO, 'password': comun.PASSWORD}),
+                     headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    respuesta = conexion.getresponse()
+    respuesta.read()
+    return respuesta.getheader('Set-Cookie').split(';', 1)[0]
+
+
+def ronda(puerto, ruta, cabeceras, clientes, duracion):
+    fin = time.monotonic() + duracion
+    cuentas = [0] * clientes
+    errores = [0] * clientes
+
+    def cliente(n):
+        conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+        while time.monotonic() < fin:
+            try:
+                conexion.request('GET', ruta, headers=cabeceras)
+                respuesta = conexion.getresponse()
+                respuesta.read()
+                cuentas[n] += 1
+                errores[n] += respuesta.status >= 400
+                if respuesta.will_close:
+                    conexion.close()
+            except (OSError, http.client.HTTPException):
+                conexion.close()
+                errores[n] += 1
+
+    hilos = [threading.Thread(target=cliente, args=(n,)) for n in range(clientes)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return sum(cuentas) / duracion, sum(errores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duracion', type=float, default=5)
+    parser.add_argument('--clientes', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--hilos', type=int, default=8)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='bench_servidor_')
+    entorno = {**os.environ, 'DATABASE_PATH': os.path.join(tmp_dir, 'bench.db'),
+               'FLASK_RECONCILIAR_INTERVALO': '0', 'FLASK_METRICAS_LENTO_MS': 'null'}
+    # La base se migra y siembra una vez con los datos sintéticos
+    subprocess.run([sys.executable, os.path.join(BASE_DIR, 'benchmarks', 'datos.py'), entorno['DATABASE_PATH'],
+                    '--alumnos', '2000', '--dias', '60', '--observaciones', '2000'],
+                   env=entorno, check=True, stdout=subprocess.DEVNULL)
+    servidores = {
+        'depuración': lambda p: [sys.executable, '-c', DEPURACION.format(base=BASE_DIR, puerto=p)],
+        f'producción {args.workers}x{args.hilos}': lambda p: [
+            sys.executable, os.path.join(BASE_DIR, 'servidor.py'), '--motor', 'werkzeug',
+            '--bind', f'127.0.0.1:{p}', '--workers', str(args.workers), '--hilos', str(args.hilos)],
+    }
+    try:
+        for nombre, comando in servidores.items():
+            puerto = puerto_libre()
+            proceso = subprocess.Popen(comando(puerto), env=entorno, cwd=tmp_dir,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                esperar(puerto)
+                cookie = {'Cookie': iniciar_sesion(puerto)}
+                rutas = [
+                    ('static css (gzip)', '/static/css/styles.css', {'Accept-Encoding': 'gzip'}),
+                    ('/health', '/health', {}),
+                    ('/api/carreras', '/api/carreras', cookie),
+                    ('/lista-asistencia', '/lista-asistencia?grupo_id=10', cookie),
+                ]
+                for ruta_nombre, ruta, cabeceras in rutas:
+                    por_segundo, errores = ronda(puerto, ruta, cabeceras, args.clientes, args.duracion)
+                    print(f'{nombre:20} {ruta_nombre:20} {por_segundo:9.1f} req/s  errores {errores}')
+            finally:
+                proceso.terminate()
+                proceso.wait(timeout=30)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""Generador de carga HTTP con varios procesos.
+
+Cada proceso inicia sesión y recorre durante --duracion segundos una mezcla
+ponderada de las rutas de la app, parecida al uso real (muchas lecturas de
+listas y catálogos, pocas escrituras). Al final se juntan las latencias de
+todos los procesos y se escriben throughput y percentiles por ruta en JSON.
+
+Sin --url levanta la app en un proceso aparte (servidor WSGI con hilos)
+sobre una base sintética temporal.
+
+Uso: python benchmarks/carga.py [--url http://host:puerto] [--procesos 4] [--hilos 8]
+                                [--duracion 30] [--alumnos 2000] [--dias 60]
+                                [--salida carga.json] [--comparar base.json] [--tolerancia 0.2]
+"""
+import argparse
+import http.client
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import comun  # noqa: E402
+import datos as generador  # noqa: E402
+
+# Peso relativo de cada ruta en la mezcla; las que no aparecen pesan 1
+PESOS = {
+    'lista_asistencia': 10,
+    'alumnos': 8,
+    'guardar_asistencia': 6,
+    'sync_asistencia': 6,
+    'carreras': 5,
+    'grupos': 5,
+    'user_info': 4,
+    'dashboard': 3,
+    'historial_asistencia': 3,
+    'observaciones': 2,
+    'buscar_observaciones': 2,
+    'metrics': 0,
+}
+
+
+def servir(tmp_dir, alumnos, dias, observaciones, hilos, cola):
+    """Proceso del servidor: siembra la base, avisa el puerto y atiende."""
+    os.environ['DATABASE_PATH'] = os.path.join(tmp_dir, 'carga.db')
+    from werkzeug.serving import make_server
+
+    from app import create_app, get_pool, preparar_db
+
+    app = create_app({
+        'REPORTES_FOLDER': os.path.join(tmp_dir, 'reportes'),
+        'PDF_CACHE_FOLDER': os.path.join(tmp_dir, 'pdf'),
+        'RECONCILIAR_INTERVALO': 0,
+        'METRICAS_LENTO_MS': None,
+        'DB_POOL_SIZE': hilos,
+    })
+    preparar_db(app)
+    with get_pool(app).connection() as conn:
+        escala = generador.generar(conn, alumnos=alumnos, dias=dias, observaciones=observaciones)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    servidor.daemon_threads = True
+    servidor.request_queue_size = hilos
+    cola.put((servidor.port, escala))
+    servidor.serve_forever()
+
+
+def iniciar_sesion(destino):
+    conexion = http.client.HTTPConnection(destino.hostname, destino.port, timeout=30)
+    conexion.request('POST', '/', body=urlencode({'username': comun.USUARIO, 'password': comun.PASSWORD}),
+                     headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    respuesta = conexion.getresponse()
+    respuesta.read()
+    conexion.close()
+    cookie = respuesta.getheader('Set-Cookie')
+    if respuesta.status != 302 or not cookie:
+        raise RuntimeError(f'El login de prueba falló ({respuesta.status})')
+    return cookie.split(';', 1)[0]
+
+
+def trabajador(url, mezcla, duracion, hilos, semilla):
+    """Un proceso de carga: ``hilos`` clientes secuenciales con su propia sesión.
+
+    Devuelve {ruta: ([latencias], errores)}.
+    """
+    destino = urlsplit(url)
+    cookie = iniciar_sesion(destino)
+    resultados = {nombre: ([], [0]) for nombre, *_ in mezcla}
+    pesos = [PESOS.get(nombre, 1) for nombre, *_ in mezcla]
+    fin = time.monotonic() + duracion
+
+    def cliente(n):
+        rnd = random.Random(semilla * 1000 + n)
+        conexion = http.client.HTTPConnection(destino.hostname, destino.port, timeout=30)
+        while time.monotonic() < fin:
+            nombre, metodo, ruta, cuerpo = rnd.choices(mezcla, pesos)[0]
+            cabeceras = {'Cookie': cookie}
+            if cuerpo is not None:
+                cabeceras['Content-Type'] = 'application/json'
+                cuerpo = json.dumps(cuerpo)
+            inicio = time.perf_counter()
+            try:
+                conexion.request(metodo, ruta, body=cuerpo, headers=cabeceras)
+                respuesta = conexion.getresponse()
+                respuesta.read()
+                error = respuesta.status >= 400
+                if respuesta.will_close:
+                    conexion.close()
+            except (OSError, http.client.HTTPException):
+                conexion.close()
+                error = True
+            latencias, errores = resultados[nombre]
+            latencias.append(time.perf_counter() - inicio)
+            errores[0] += error
+        conexion.close()
+
+    clientes = [threading.Thread(target=cliente, args=(n,)) for n in range(hilos)]
+    for hilo in clientes:
+        hilo.start()
+    for hilo in clientes:
+        hilo.join()
+    return {nombre: (latencias, errores[0]) for nombre, (latencias, errores) in resultados.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='app ya levantada (con los datos de benchmarks/datos.py)')
+    parser.add_argument('--procesos', type=int, default=4)
+    parser.add_argument('--hilos', type=int, default=8, help='clientes por proceso')
+    parser.add_argument('--duracion', type=float, default=30)
+    parser.add_argument('--alumnos', type=int, default=2000)
+    parser.add_argument('--dias', type=int, default=60)
+    parser.add_argument('--observaciones', type=int, default=5000)
+    parser.add_argument('--salida', help='archivo JSON de resultados')
+    parser.add_argument('--comparar', help='JSON de una ejecución previa')
+    parser.add_argument('--tolerancia', type=float, default=0.2)
+    args = parser.parse_args()
+
+    tmp_dir = servidor = None
+    try:
+        if args.url:
+            url = args.url.rstrip('/')
+            # Los ids de las rutas salen de la base que usa el servidor remoto
+            ruta_db = os.environ.get('DATABASE_PATH')
+            if not ruta_db:
+                parser.error('con --url indica la base sembrada en DATABASE_PATH')
+            import sqlite3
+            conn = sqlite3.connect(ruta_db)
+            escala = generador.resumen(conn)
+            conn.close()
+        else:
+            tmp_dir = tempfile.mkdtemp(prefix='bench_carga_')
+            cola = multiprocessing.Queue()
+            servidor = multiprocessing.Process(
+                target=servir, args=(tmp_dir, args.alumnos, args.dias, args.observaciones,
+                                     args.procesos * args.hilos, cola), daemon=True)
+            servidor.start()
+            puerto, escala = cola.get(timeout=600)
+            url = f'http://127.0.0.1:{puerto}'
+
+        mezcla = [r for r in comun.rutas(escala) if PESOS.get(r[0], 1)]
+        print(f"Escala: {escala['alumnos']:,} alumnos, {escala['sesiones']:,} sesiones; "
+              f"{args.procesos} procesos x {args.hilos} clientes durante {args.duracion:g} s contra {url}")
+
+        with multiprocessing.Pool(args.procesos) as pool:
+            inicio = time.perf_counter()
+            parciales = pool.starmap(trabajador, [
+                (url, mezcla, args.duracion, args.hilos, semilla) for semilla in range(args.procesos)])
+            segundos = time.perf_counter() - inicio
+
+        resultados, total, total_errores = {}, [], 0
+        for nombre, *_ in mezcla:
+            latencias = [x for parcial in parciales for x in parcial[nombre][0]]
+            errores = sum(parcial[nombre][1] for parcial in parciales)
+            if latencias:
+                resultados[nombre] = {**comun.resumir(latencias, segundos), 'errores': errores}
+                total.extend(latencias)
+                total_errores += errores
+        global_ = {**comun.resumir(total, segundos), 'errores': total_errores}
+
+        print(f"{'ruta':24} {'n':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} errores")
+        for nombre, r in [*resultados.items(), ('TOTAL', global_)]:
+            print(f"{nombre:24} {r['n']:7} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['p99_ms']:9.2f} "
+                  f"{r['por_segundo']:9.1f} {r['errores']}")
+
+        salida = {
+            'herramienta': 'carga',
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'escala': escala,
+            'configuracion': {'procesos': args.procesos, 'hilos': args.hilos, 'duracion': args.duracion},
+            'total': global_,
+            'rutas': resultados,
+        }
+        if args.salida:
+            comun.guardar(salida, args.salida)
+        if args.comparar and comun.comparar(salida, args.comparar, metrica='p95_ms', tolerancia=args.tolerancia):
+            sys.exit(1)
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.join()
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
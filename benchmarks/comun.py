@@ -0,0 +1,84 @@
+"""Utilidades compartidas por bench_rutas.py y carga.py: rutas a medir,
+percentiles y comparación de resultados JSON entre ejecuciones."""
+import json
+import statistics
+
+USUARIO = 'ADMIN'
+PASSWORD = 'Admin123!'
+
+
+def rutas(datos):
+    """(nombre, método, ruta, cuerpo JSON) de cada endpoint a medir.
+
+    ``datos`` es el resumen que devuelve datos.generar.
+    """
+    grupo, carrera, alumno, fecha = datos['grupo_id'], datos['carrera_id'], datos['alumno_id'], datos['fecha']
+    return [
+        ('dashboard', 'GET', '/dashboard', None),
+        ('asistencia', 'GET', '/asistencia', None),
+        ('proyectos', 'GET', '/proyectos', None),
+        ('reportes', 'GET', '/reportes', None),
+        ('observaciones', 'GET', '/observaciones', None),
+        ('buscar_observaciones', 'GET', '/api/observaciones/buscar?q=plaga+hongo', None),
+        ('get_proyecto', 'GET', '/get-proyecto/1', None),
+        ('resumen_proyectos', 'GET', '/api/proyectos/resumen', None),
+        ('historial_proyecto', 'GET', '/api/proyectos/1/historial', None),
+        ('user_info', 'GET', '/api/user-info', None),
+        ('carreras', 'GET', '/api/carreras', None),
+        ('grupos', 'GET', f'/api/carreras/{carrera}/grupos', None),
+        ('alumnos', 'GET', f'/api/alumnos/{grupo}', None),
+        ('lista_asistencia', 'GET', f'/lista-asistencia?grupo_id={grupo}&fecha={fecha}', None),
+        ('historial_asistencia', 'GET', f'/api/historial-asistencia?grupo_id={grupo}', None),
+        ('historial_carrera', 'GET', f'/api/historial-asistencia?carrera={carrera}', None),
+        ('estadisticas_alumno', 'GET', f'/api/estadisticas/alumno/{alumno}', None),
+        ('estadisticas_grupo', 'GET', f'/api/estadisticas/grupo/{grupo}', None),
+        ('exportar_alumnos', 'GET', f'/api/export/alumnos?grupo={grupo}', None),
+        ('alertas_asistencia', 'GET', '/api/alertas-asistencia?limite=20', None),
+        ('resumen_campus', 'GET', '/api/campus/resumen', None),
+        ('guardar_asistencia', 'POST', '/api/guardar-asistencia',
+         {'grupo_id': grupo, 'fecha': fecha, 'alumnos': [{'id': alumno, 'presente': True}]}),
+        ('sync_asistencia', 'POST', '/api/sync-asistencia', {'token': None, 'grupo_id': grupo}),
+        ('metrics', 'GET', '/metrics', None),
+    ]
+
+
+def resumir(latencias, segundos=None):
+    """Resumen en milisegundos de una lista de latencias en segundos."""
+    ms = sorted(x * 1000 for x in latencias)
+    percentil = statistics.quantiles(ms, n=100, method='inclusive') if len(ms) > 1 else ms * 99
+    resumen = {
+        'n': len(ms),
+        'media_ms': round(statistics.fmean(ms), 3),
+        'p50_ms': round(percentil[49], 3),
+        'p95_ms': round(percentil[94], 3),
+        'p99_ms': round(percentil[98], 3),
+        'max_ms': round(ms[-1], 3),
+    }
+    if segundos:
+        resumen['por_segundo'] = round(len(ms) / segundos, 1)
+    return resumen
+
+
+def guardar(resultado, ruta):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+
+
+def comparar(actual, ruta_base, metrica='p50_ms', tolerancia=0.2):
+    """Imprime la variación de ``metrica`` por ruta frente a una ejecución previa.
+
+    Devuelve la lista de rutas que empeoraron más que ``tolerancia``.
+    """
+    with open(ruta_base, encoding='utf-8') as f:
+        base = json.load(f)['rutas']
+    regresiones = []
+    for nombre, valores in actual['rutas'].items():
+        if nombre not in base or not base[nombre].get(metrica):
+            continue
+        antes, ahora = base[nombre][metrica], valores[metrica]
+        cambio = (ahora - antes) / antes
+        marca = '  <-- regresión' if cambio > tolerancia else ''
+        print(f'{nombre:24} {antes:9.3f} -> {ahora:9.3f} ms ({cambio:+.0%}){marca}')
+        if cambio > tolerancia:
+            regresiones.append(nombre)
+    return regresiones
@@ -0,0 +1,140 @@
+"""Generador de datos sintéticos para los benchmarks.
+
+Siembra carreras, grupos, alumnos, pases de lista diarios (lunes a viernes)
+y observaciones a la escala indicada, de forma determinista según la semilla.
+Se usa como módulo desde los benchmarks o como script para preparar una base:
+
+Uso: python benchmarks/datos.py RUTA.db [--alumnos 10000] [--dias 365] [--observaciones 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PALABRAS = ('riego', 'plaga', 'hongo', 'tomate', 'chile', 'pepino', 'humedad', 'temperatura',
+            'fertilizante', 'poda', 'cosecha', 'invernadero', 'sustrato', 'germinación', 'hoja')
+APELLIDOS = ('García', 'Hernández', 'López', 'Martínez', 'González', 'Pérez', 'Rodríguez', 'Sánchez',
+             'Ramírez', 'Cruz', 'Flores', 'Gómez', 'Morales', 'Vázquez', 'Reyes', 'Jiménez')
+NOMBRES = ('Ana', 'Luis', 'María', 'José', 'Sofía', 'Diego', 'Valeria', 'Carlos', 'Fernanda',
+           'Jorge', 'Camila', 'Miguel', 'Daniela', 'Juan', 'Paola', 'Ricardo')
+LOTE = 5000
+
+
+def _dias_habiles(dias, hasta):
+    inicio = hasta - timedelta(days=dias - 1)
+    return [(inicio + timedelta(days=i)).isoformat() for i in range(dias)
+            if (inicio + timedelta(days=i)).weekday() < 5]
+
+
+def generar(conn, alumnos=10000, por_grupo=40, carreras=5, dias=365, observaciones=20000,
+            asistencia=0.85, semilla=1, hasta=None):
+    """Siembra los datos y devuelve un resumen con los ids útiles para las rutas.
+
+    Espera una base ya migrada. Los datos sintéticos usan el prefijo BENCH en
+    códigos y matrículas para no chocar con las semillas de la app.
+    """
+    rnd = random.Random(semilla)
+    hasta = hasta or date.today()
+    fechas = _dias_habiles(dias, hasta)
+    grupos = max(1, -(-alumnos // por_grupo))
+
+    with conn:
+        conn.executemany('INSERT INTO carreras (nombre, codigo) VALUES (?, ?)',
+                         [(f'Carrera Bench {c}', f'BENCH-C{c}') for c in range(carreras)])
+        carrera_ids = [fila[0] for fila in conn.execute(
+            "SELECT id FROM carreras WHERE codigo LIKE 'BENCH-C%' ORDER BY id")]
+        conn.executemany('INSERT INTO grupos (carrera_id, nombre, codigo) VALUES (?, ?, ?)',
+                         [(carrera_ids[g % carreras], f'Grupo Bench {g}', f'BENCH-G{g}') for g in range(grupos)])
+        grupo_ids = [fila[0] for fila in conn.execute(
+            "SELECT id FROM grupos WHERE codigo LIKE 'BENCH-G%' ORDER BY id")]
+        conn.executemany('INSERT INTO alumnos (grupo_id, matricula, apellidos, nombre) VALUES (?, ?, ?, ?)', [
+            (grupo_ids[a // por_grupo], f'BENCH{a:07d}',
+             f'{rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}', rnd.choice(NOMBRES))
+            for a in range(alumnos)
+        ])
+
+    inscritos = {}
+    for alumno_id, grupo_id in conn.execute(
+            "SELECT id, grupo_id FROM alumnos WHERE matricula LIKE 'BENCH%' ORDER BY id"):
+        inscritos.setdefault(grupo_id, []).append(alumno_id)
+
+    # Un pase de lista por grupo y día hábil; los detalles van en lotes
+    for fecha in fechas:
+        with conn:
+            conn.executemany('INSERT INTO asistencias (grupo_id, fecha) VALUES (?, ?)',
+                             [(grupo_id, fecha) for grupo_id in grupo_ids])
+            sesiones = dict(conn.execute(
+                'SELECT grupo_id, id FROM asistencias WHERE fecha = ?', (fecha,)).fetchall())
+            detalles = [(sesiones[grupo_id], alumno_id, 1 if rnd.random() < asistencia else 0)
+                        for grupo_id in grupo_ids for alumno_id in inscritos.get(grupo_id, ())]
+            for i in range(0, len(detalles), LOTE):
+                conn.executemany(
+                    'INSERT INTO detalle_asistencias (asistencia_id, alumno_id, presente) VALUES (?, ?, ?)',
+                    detalles[i:i + LOTE])
+
+    with conn:
+        inicio = f'{fechas[0]} 08:00:00' if fechas else f'{hasta.isoformat()} 08:00:00'
+        conn.executemany(
+            "INSERT INTO observaciones (texto, fecha) VALUES (?, datetime(?, ? || ' minutes'))",
+            [(' '.join(rnd.choice(PALABRAS) for _ in range(rnd.randint(6, 20))), inicio,
+              i * max(1, dias * 24 * 60 // max(observaciones, 1))) for i in range(observaciones)])
+
+    return {
+        'grupo_id': grupo_ids[0],
+        'carrera_id': carrera_ids[0],
+        'alumno_id': inscritos[grupo_ids[0]][0],
+        'fecha': fechas[-1] if fechas else hasta.isoformat(),
+        'alumnos': alumnos,
+        'grupos': grupos,
+        'sesiones': len(fechas) * grupos,
+        'observaciones': observaciones,
+    }
+
+
+def resumen(conn):
+    """El mismo resumen que devuelve generar(), leído de una base ya sembrada."""
+    grupo_id, carrera_id = conn.execute(
+        "SELECT id, carrera_id FROM grupos WHERE codigo LIKE 'BENCH-G%' ORDER BY id LIMIT 1").fetchone()
+    return {
+        'grupo_id': grupo_id,
+        'carrera_id': carrera_id,
+        'alumno_id': conn.execute('SELECT MIN(id) FROM alumnos WHERE grupo_id = ?', (grupo_id,)).fetchone()[0],
+        'fecha': conn.execute('SELECT MAX(fecha) FROM asistencias WHERE grupo_id = ?', (grupo_id,)).fetchone()[0],
+        'alumnos': conn.execute("SELECT COUNT(*) FROM alumnos WHERE matricula LIKE 'BENCH%'").fetchone()[0],
+        'grupos': conn.execute("SELECT COUNT(*) FROM grupos WHERE codigo LIKE 'BENCH-G%'").fetchone()[0],
+        'sesiones': conn.execute('SELECT COUNT(*) FROM asistencias').fetchone()[0],
+        'observaciones': conn.execute('SELECT COUNT(*) FROM observaciones').fetchone()[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('ruta', help='archivo SQLite a crear (no debe existir)')
+    parser.add_argument('--alumnos', type=int, default=10000)
+    parser.add_argument('--por-grupo', type=int, default=40)
+    parser.add_argument('--dias', type=int, default=365)
+    parser.add_argument('--observaciones', type=int, default=20000)
+    parser.add_argument('--semilla', type=int, default=1)
+    args = parser.parse_args()
+
+    if os.path.exists(args.ruta):
+        parser.error(f'{args.ruta} ya existe')
+    os.environ['DATABASE_PATH'] = os.path.abspath(args.ruta)
+    sys.path.insert(0, BASE_DIR)
+    from app import app, get_pool, preparar_db
+
+    inicio = time.perf_counter()
+    preparar_db(app)
+    with get_pool(app).connection() as conn:
+        resumen = generar(conn, alumnos=args.alumnos, por_grupo=args.por_grupo, dias=args.dias,
+                          observaciones=args.observaciones, semilla=args.semilla)
+    get_pool(app).close_all()
+    print(f'{resumen} en {time.perf_counter() - inicio:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
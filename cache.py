@@ -0,0 +1,81 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import Response, request
+
+
+# --- Caché en proceso para catálogos ---
+# LRU acotado con TTL. Guarda el JSON ya serializado y su ETag para que un
+# acierto no toque SQLite ni vuelva a serializar. La caché es por proceso: con
+# varios workers, la invalidación sólo aplica al proceso que hizo la escritura
+# y el TTL acota cuánto puede tardar el resto en ver el cambio.
+
+Entrada = namedtuple('Entrada', 'cuerpo etag expira')
+
+
+class CacheTTL:
+    def __init__(self, maximo=256, ttl=300):
+        self.maximo = maximo
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self._generacion = 0
+
+    def obtener(self, clave, producir):
+        """Devuelve la entrada de ``clave``; si no existe o expiró llama a ``producir()``."""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None and entrada.expira > ahora:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return entrada
+            self.fallos += 1
+            generacion = self._generacion
+
+        cuerpo = json.dumps(producir(), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        entrada = Entrada(cuerpo, hashlib.sha1(cuerpo).hexdigest(), ahora + self.ttl)
+        with self._lock:
+            # Si hubo una invalidación mientras se consultaba, el valor puede
+            # estar desactualizado: se responde pero no se guarda.
+            if generacion != self._generacion:
+                return entrada
+            self._datos[clave] = entrada
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+        return entrada
+
+    def invalidar(self, prefijo=''):
+        """Elimina las claves que empiezan con ``prefijo`` (todas si es vacío)."""
+        with self._lock:
+            for clave in [c for c in self._datos if c.startswith(prefijo)]:
+                del self._datos[clave]
+            self.invalidaciones += 1
+            self._generacion += 1
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'entradas': len(self._datos),
+                'maximo': self.maximo,
+                'ttl': self.ttl,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'invalidaciones': self.invalidaciones,
+            }
+
+
+def respuesta_cacheada(cache, clave, producir):
+    """Respuesta JSON desde la caché con ETag fuerte; responde 304 si el cliente ya la tiene."""
+    entrada = cache.obtener(clave, producir)
+    respuesta = Response(entrada.cuerpo, mimetype='application/json')
+    respuesta.set_etag(entrada.etag)
+    respuesta.headers['Cache-Control'] = 'private, no-cache'
+    return respuesta.make_conditional(request)
@@ -0,0 +1,166 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, g, jsonify, request, session
+
+from db import ConnectionPool, get_db, get_pool
+import migraciones
+from semillas import sembrar
+
+
+# --- Campus (bases de datos particionadas) ---
+# Cada campus guarda su catálogo (carreras, grupos, alumnos) y sus pases de
+# lista en su propio archivo SQLite, así las escrituras de un campus no
+# esperan el bloqueo de escritura de los demás. DB_CAMPUS mapea nombre ->
+# ruta; el campus 'principal' es siempre DATABASE, que además conserva lo
+# que no se particiona (administradores, proyectos, reportes, observaciones).
+# Sin DB_CAMPUS todo vive en un solo archivo, como antes.
+#
+# La petición elige campus con la cabecera X-Campus, ?campus= o el guardado
+# en la sesión; las páginas de asistencia mandan el suyo en cada petición.
+# Todos los archivos tienen el mismo esquema: las migraciones se aplican a
+# cada uno, pero los datos iniciales sólo al principal. Los ids son locales a
+# cada campus, por eso los reportes entre campus combinan agregados parciales
+# en vez de unir filas. Por lo mismo, la matrícula sólo es única dentro de
+# cada campus: el mismo alumno puede existir en dos campus.
+
+PRINCIPAL = 'principal'
+
+
+class CampusDesconocido(LookupError):
+    """El campus pedido no está configurado en DB_CAMPUS."""
+
+
+def rutas_configuradas(config):
+    return {PRINCIPAL: config['DATABASE'], **config.get('DB_CAMPUS', {})}
+
+
+class Enrutador:
+    def __init__(self, app):
+        self.app = app
+        self.rutas = rutas_configuradas(app.config)
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._ejecutor = None
+        self.repartos = 0
+
+    def nombres(self):
+        return list(self.rutas)
+
+    def pool(self, nombre):
+        # El principal comparte el pool de db.py para no duplicar conexiones
+        if nombre == PRINCIPAL:
+            return get_pool(self.app)
+        if nombre not in self.rutas:
+            raise CampusDesconocido(nombre)
+        pool = self._pools.get(nombre)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(nombre)
+                if pool is None:
+                    config = self.app.config
+                    pool = self._pools[nombre] = ConnectionPool(
+                        self.rutas[nombre],
+                        size=config['DB_POOL_SIZE'],
+                        timeout=config['DB_BUSY_TIMEOUT'],
+                        journal_mode=config['DB_JOURNAL_MODE'],
+                        factory=config['DB_CONNECTION_FACTORY'],
+                    )
+        return pool
+
+    def repartir(self, funcion, campus=None):
+        """Ejecuta ``funcion(conn)`` en cada campus en paralelo y devuelve {campus: resultado}.
+
+        SQLite suelta el GIL mientras ejecuta la consulta, así que los campus
+        se leen a la vez. Si un campus falla, la excepción se propaga.
+        """
+        nombres = list(campus or self.rutas)
+        for nombre in nombres:
+            if nombre not in self.rutas:
+                raise CampusDesconocido(nombre)
+
+        def en_campus(nombre):
+            with self.pool(nombre).connection() as conn:
+                return funcion(conn)
+
+        futuros = {nombre: self._ejecutor_repartos().submit(en_campus, nombre) for nombre in nombres}
+        self.repartos += 1
+        return {nombre: futuro.result() for nombre, futuro in futuros.items()}
+
+    def _ejecutor_repartos(self):
+        if self._ejecutor is None:
+            with self._lock:
+                if self._ejecutor is None:
+                    hilos = self.app.config['DB_CAMPUS_HILOS'] or len(self.rutas)
+                    self._ejecutor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='campus')
+        return self._ejecutor
+
+    def migrar(self, semillas=False):
+        """Aplica las migraciones pendientes en todos los campus.
+
+        Con ``semillas`` se cargan los datos iniciales, sólo en el principal:
+        administradores y proyectos no se particionan, y el catálogo de cada
+        campus se carga aparte (ver semillas.sembrar_catalogo).
+        """
+        aplicadas = {}
+        for nombre in self.rutas:
+            with self.pool(nombre).connection() as conn:
+                aplicadas[nombre] = migraciones.aplicar(conn)
+                if semillas and nombre == PRINCIPAL:
+                    sembrar(conn)
+        return aplicadas
+
+    def close_all(self):
+        for pool in self._pools.values():
+            pool.close_all()
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(wait=False)
+
+
+# --- Integración con Flask ---
+
+def enrutador(app=None):
+    return (app or current_app).extensions['campus']
+
+
+def campus_actual():
+    """Campus de la petición actual; CampusDesconocido si no está configurado."""
+    if 'campus' not in g:
+        nombre = (request.headers.get('X-Campus') or request.args.get('campus')
+                  or session.get('campus') or PRINCIPAL)
+        if nombre not in enrutador().rutas:
+            raise CampusDesconocido(nombre)
+        g.campus = nombre
+    return g.campus
+
+
+def get_campus_db():
+    """Conexión al campus de la petición; se devuelve al pool en el teardown."""
+    nombre = campus_actual()
+    if nombre == PRINCIPAL:
+        return get_db()
+    if 'db_campus' not in g:
+        g.db_campus = enrutador().pool(nombre).acquire()
+    return g.db_campus
+
+
+def close_campus_db(exc=None):
+    conn = g.pop('db_campus', None)
+    if conn is not None:
+        enrutador().pool(g.campus).release(conn)
+
+
+def campus_desconocido(error):
+    return jsonify({"error": f"Campus desconocido: {error.args[0]}"}), 404
+
+
+def init_app(app):
+    app.config.setdefault('DB_CAMPUS', {})
+    # Hilos para las consultas repartidas (por omisión uno por campus)
+    app.config.setdefault('DB_CAMPUS_HILOS', None)
+    campus = Enrutador(app)
+    app.extensions['campus'] = campus
+    app.teardown_appcontext(close_campus_db)
+    app.register_error_handler(CampusDesconocido, campus_desconocido)
+    app.jinja_env.globals['campus_actual'] = campus_actual
+    return campus
@@ -0,0 +1,146 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+
+from flask import current_app, g
+
+
+# --- Configuración de la base de datos ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATABASE = os.environ.get('DATABASE_PATH', os.path.join(BASE_DIR, 'database.db'))
+
+# PRAGMAs que se aplican a cada conexión nueva. journal_mode se aplica aparte
+# porque es persistente en el archivo y sólo hace falta fijarlo una vez.
+PRAGMAS = (
+    ('synchronous', 'NORMAL'),      # seguro con WAL y evita un fsync por commit
+    ('cache_size', -16000),         # ~16 MB de caché de páginas por conexión
+    ('mmap_size', 134217728),       # 128 MB de lectura por memoria mapeada
+    ('temp_store', 'MEMORY'),
+)
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """No hubo conexión libre en el pool dentro del tiempo de espera."""
+
+
+class ConnectionPool:
+    """Pool acotado de conexiones SQLite reutilizables entre peticiones.
+
+    Nunca hay más de ``size`` conexiones abiertas; si todas están en uso,
+    ``acquire`` espera hasta ``timeout`` segundos. Con ``size=0`` se desactiva
+    la reutilización y cada petición abre y cierra su propia conexión.
+    """
+
+    def __init__(self, path, size=8, timeout=5.0, journal_mode='WAL', factory=sqlite3.Connection):
+        self.path = os.path.abspath(path)
+        self.factory = factory
+        self.size = size
+        self.timeout = timeout
+        self.journal_mode = journal_mode
+        self._idle = LifoQueue()
+        self._slots = threading.BoundedSemaphore(size) if size > 0 else None
+        self._lock = threading.Lock()
+        self._all = set()
+        self._journal_set = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False,
+                               factory=self.factory)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA busy_timeout = {int(self.timeout * 1000)}')
+        if not self._journal_set:
+            with self._lock:
+                if not self._journal_set:
+                    conn.execute(f'PRAGMA journal_mode = {self.journal_mode}')
+                    self._journal_set = True
+        for nombre, valor in PRAGMAS:
+            conn.execute(f'PRAGMA {nombre} = {valor}')
+        return conn
+
+    def acquire(self):
+        if self._slots is None:
+            return self._connect()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout('No hay conexiones disponibles en el pool')
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+        try:
+            conn = self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._all.add(conn)
+        return conn
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        if self._slots is None:
+            conn.close()
+            return
+        self._idle.put(conn)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+        self._idle = LifoQueue()
+
+
+# --- Integración con Flask ---
+_pool_lock = threading.Lock()
+
+
+def init_app(app):
+    app.config.setdefault('DATABASE', DEFAULT_DATABASE)
+    app.config.setdefault('DB_POOL_SIZE', 8)
+    app.config.setdefault('DB_BUSY_TIMEOUT', 5.0)
+    app.config.setdefault('DB_JOURNAL_MODE', 'WAL')
+    app.config.setdefault('DB_CONNECTION_FACTORY', sqlite3.Connection)
+    app.teardown_appcontext(close_db)
+
+
+def get_pool(app=None):
+    app = app or current_app
+    pool = app.extensions.get('sqlite_pool')
+    if pool is None:
+        with _pool_lock:
+            pool = app.extensions.get('sqlite_pool')
+            if pool is None:
+                pool = ConnectionPool(
+                    app.config['DATABASE'],
+                    size=app.config['DB_POOL_SIZE'],
+                    timeout=app.config['DB_BUSY_TIMEOUT'],
+                    journal_mode=app.config['DB_JOURNAL_MODE'],
+                    factory=app.config['DB_CONNECTION_FACTORY'],
+                )
+                app.extensions['sqlite_pool'] = pool
+    return pool
+
+
+def get_db():
+    """Conexión de la petición actual; se devuelve al pool en el teardown."""
+    if 'db' not in g:
+        g.db = get_pool().acquire()
+    return g.db
+
+
+def close_db(exc=None):
+    conn = g.pop('db', None)
+    if conn is not None:
+        get_pool().release(conn)
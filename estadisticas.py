@@ -0,0 +1,186 @@
+# --- Estadísticas materializadas de asistencia ---
+# Las tablas de resumen se mantienen con triggers sobre detalle_asistencias y
+# asistencias, así cada escritura actualiza los totales dentro de la misma
+# transacción que guarda el pase de lista. La semana se agrupa con '%Y-%W'.
+# Las tablas y los triggers se crean en migraciones/0002_estadisticas.py.
+
+# Recalculo completo desde las tablas de origen; lo usan la reconstrucción
+# y el verificador de consistencia.
+RECALCULO_ALUMNO = '''
+    SELECT d.alumno_id, COUNT(*) AS sesiones, SUM(d.presente) AS presentes
+    FROM detalle_asistencias d
+    GROUP BY d.alumno_id
+'''
+
+RECALCULO_GRUPO_SEMANA = '''
+    SELECT a.grupo_id, strftime('%Y-%W', a.fecha) AS semana,
+           COUNT(DISTINCT a.id) AS sesiones,
+           COUNT(d.asistencia_id) AS registros,
+           COALESCE(SUM(d.presente), 0) AS presentes
+    FROM asistencias a
+    LEFT JOIN detalle_asistencias d ON d.asistencia_id = a.id
+    GROUP BY a.grupo_id, semana
+'''
+
+
+def _porcentaje(presentes, total):
+    return round(100 * presentes / total) if total else 0
+
+
+def reconstruir(conn):
+    """Recalcula desde cero las tablas de resumen (backfill)."""
+    with conn:
+        conn.execute('DELETE FROM estadisticas_alumno')
+        conn.execute('DELETE FROM estadisticas_grupo_semana')
+        conn.execute(f'INSERT INTO estadisticas_alumno (alumno_id, sesiones, presentes) {RECALCULO_ALUMNO}')
+        conn.execute(f'''
+            INSERT INTO estadisticas_grupo_semana (grupo_id, semana, sesiones, registros, presentes)
+            {RECALCULO_GRUPO_SEMANA}
+        ''')
+
+
+def verificar(conn):
+    """Compara lo materializado contra un recálculo completo.
+
+    Devuelve la lista de diferencias; vacía si todo es consistente. Las filas
+    materializadas en cero (p. ej. tras borrar un pase de lista) no cuentan
+    como diferencia.
+    """
+    diferencias = []
+    consultas = (
+        ('alumno', 'estadisticas_alumno', 'alumno_id', 'alumno_id, sesiones, presentes',
+         'sesiones', RECALCULO_ALUMNO),
+        ('grupo_semana', 'estadisticas_grupo_semana', 'grupo_id, semana',
+         'grupo_id, semana, sesiones, registros, presentes', 'sesiones + registros', RECALCULO_GRUPO_SEMANA),
+    )
+    for tipo, tabla, clave, columnas, no_vacio, recalculo in consultas:
+        filas = conn.execute(f'''
+            WITH esperado AS ({recalculo}),
+                 actual AS (SELECT {columnas} FROM {tabla} WHERE {no_vacio} > 0)
+            SELECT 'esperado' AS origen, * FROM (SELECT * FROM esperado EXCEPT SELECT * FROM actual)
+            UNION ALL
+            SELECT 'materializado' AS origen, * FROM (SELECT * FROM actual EXCEPT SELECT * FROM esperado)
+            ORDER BY {clave}
+        ''').fetchall()
+        diferencias.extend({'tipo': tipo, **dict(fila)} for fila in filas)
+    return diferencias
+
+
+def por_alumno(conn, alumno_id):
+    fila = conn.execute('''
+        SELECT a.id AS alumno_id, a.matricula, a.apellidos, a.nombre, a.grupo_id,
+               COALESCE(e.sesiones, 0) AS sesiones, COALESCE(e.presentes, 0) AS presentes
+        FROM alumnos a
+        LEFT JOIN estadisticas_alumno e ON e.alumno_id = a.id
+        WHERE a.id = ?
+    ''', (alumno_id,)).fetchone()
+    if fila is None:
+        return None
+    datos = dict(fila)
+    datos['ausencias'] = datos['sesiones'] - datos['presentes']
+    datos['porcentaje'] = _porcentaje(datos['presentes'], datos['sesiones'])
+    return datos
+
+
+def por_grupo(conn, grupo_id, semanas=None):
+    grupo = conn.execute('SELECT id, nombre FROM grupos WHERE id = ?', (grupo_id,)).fetchone()
+    if grupo is None:
+        return None
+    filas = conn.execute('''
+        SELECT semana, sesiones, registros, presentes
+        FROM estadisticas_grupo_semana
+        WHERE grupo_id = ? AND sesiones > 0
+        ORDER BY semana DESC
+        LIMIT ?
+    ''', (grupo_id, semanas or -1)).fetchall()
+    detalle = [
+        {**dict(fila), 'porcentaje': _porcentaje(fila['presentes'], fila['registros'])}
+        for fila in filas
+    ]
+    registros = sum(s['registros'] for s in detalle)
+    presentes = sum(s['presentes'] for s in detalle)
+    return {
+        'grupo_id': grupo['id'],
+        'grupo': grupo['nombre'],
+        'registros': registros,
+        'presentes': presentes,
+        'porcentaje': _porcentaje(presentes, registros),
+        'semanas': detalle,
+    }
+
+
+# --- Resumen entre campus ---
+# Cada campus calcula sus totales por carrera (parcial) y se combinan sumando
+# conteos; los porcentajes se recalculan sobre las sumas, nunca se promedian.
+# Las carreras se unen por código porque los ids son locales a cada campus.
+
+TOTALES = ('grupos', 'alumnos', 'sesiones', 'registros', 'presentes')
+
+
+# Totales por grupo: sin fechas alcanza con la tabla semanal materializada;
+# con fechas se cuentan los pases de lista del rango exacto (la semana
+# materializada redondearía el rango a semanas completas)
+GRUPOS_MATERIALIZADO = '''
+    SELECT grupo_id, SUM(sesiones) AS sesiones, SUM(registros) AS registros, SUM(presentes) AS presentes
+    FROM estadisticas_grupo_semana
+    GROUP BY grupo_id
+'''
+
+GRUPOS_RANGO = '''
+    SELECT a.grupo_id, COUNT(DISTINCT a.id) AS sesiones, COUNT(d.alumno_id) AS registros,
+           COALESCE(SUM(d.presente), 0) AS presentes
+    FROM asistencias a
+    LEFT JOIN detalle_asistencias d ON d.asistencia_id = a.id
+    WHERE a.fecha >= COALESCE(?, '') AND a.fecha <= COALESCE(?, '9999-12-31')
+    GROUP BY a.grupo_id
+'''
+
+
+def parcial_carreras(conn, desde=None, hasta=None):
+    """Totales por carrera de un campus; ``desde``/``hasta`` son fechas AAAA-MM-DD inclusivas."""
+    por_rango = desde is not None or hasta is not None
+    filas = conn.execute(f'''
+        SELECT c.codigo, c.nombre,
+               COUNT(DISTINCT g.id) AS grupos,
+               (SELECT COUNT(*) FROM alumnos a JOIN grupos ga ON ga.id = a.grupo_id
+                WHERE ga.carrera_id = c.id) AS alumnos,
+               COALESCE(SUM(t.sesiones), 0) AS sesiones,
+               COALESCE(SUM(t.registros), 0) AS registros,
+               COALESCE(SUM(t.presentes), 0) AS presentes
+        FROM carreras c
+        LEFT JOIN grupos g ON g.carrera_id = c.id
+        LEFT JOIN ({GRUPOS_RANGO if por_rango else GRUPOS_MATERIALIZADO}) t ON t.grupo_id = g.id
+        GROUP BY c.id
+        ORDER BY c.codigo
+    ''', (desde, hasta) if por_rango else ()).fetchall()
+    return [dict(fila) for fila in filas]
+
+
+def _sumar(destino, fila):
+    for campo in TOTALES:
+        destino[campo] = destino.get(campo, 0) + fila[campo]
+    return destino
+
+
+def _con_porcentaje(totales):
+    return {**totales, 'porcentaje': _porcentaje(totales['presentes'], totales['registros'])}
+
+
+def combinar_parciales(parciales):
+    """Une los parciales {campus: filas} en totales por campus, por carrera y generales."""
+    por_campus, por_carrera, total = [], {}, dict.fromkeys(TOTALES, 0)
+    for campus, filas in parciales.items():
+        totales_campus = dict.fromkeys(TOTALES, 0)
+        for fila in filas:
+            _sumar(totales_campus, fila)
+            carrera = por_carrera.setdefault(fila['codigo'], {
+                'codigo': fila['codigo'], 'nombre': fila['nombre'], 'campus': [], **dict.fromkeys(TOTALES, 0)})
+            carrera['campus'].append(campus)
+            _sumar(carrera, fila)
+        _sumar(total, totales_campus)
+        por_campus.append({'campus': campus, **_con_porcentaje(totales_campus)})
+    return {
+        'campus': por_campus,
+        'carreras': [_con_porcentaje(c) for c in sorted(por_carrera.values(), key=lambda c: c['codigo'])],
+        'total': _con_porcentaje(total),
+    }
@@ -0,0 +1,134 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import uuid
+
+from flask import abort, current_app, request, send_file, url_for
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # opcional: sin el paquete sólo se sirve gzip
+    brotli = None
+
+
+# --- Archivos estáticos ---
+# Las plantillas piden los recursos con estatico('css/x.css'), que agrega
+# ?v=<hash del contenido>. Una URL con la versión vigente no cambia nunca y se
+# sirve con caché de un año; sin versión (o con una vieja) se revalida con
+# ETag. Las hojas de estilo y scripts se comprimen una vez con gzip (y brotli
+# si está instalado) en una carpeta aparte y se sirve la variante que el
+# navegador acepte. La compresión no corre al crear la app: la hace
+# servidor.py antes de crear los workers o `flask estaticos comprimir`; sin
+# variantes se sirve el archivo original.
+
+COMPRIMIBLES = ('css', 'js')
+EXTENSIONES = ('.css', '.js', '.svg', '.json')
+CODIFICACIONES = (('br', '.br'), ('gzip', '.gz'))
+MAX_AGE_VERSIONADO = 31536000
+
+
+class Estaticos:
+    def __init__(self, carpeta, carpeta_comprimidos):
+        self.carpeta = os.path.abspath(carpeta)
+        self.comprimidos = os.path.abspath(carpeta_comprimidos)
+        self._versiones = {}
+
+    def version(self, ruta):
+        """Hash corto del contenido; se recalcula sólo si cambia el mtime del archivo."""
+        completa = safe_join(self.carpeta, ruta)
+        if completa is None or not os.path.isfile(completa):
+            return None
+        mtime = os.stat(completa).st_mtime_ns
+        guardada = self._versiones.get(ruta)
+        if guardada is None or guardada[0] != mtime:
+            with open(completa, 'rb') as f:
+                guardada = self._versiones[ruta] = (mtime, hashlib.sha1(f.read()).hexdigest()[:12])
+        return guardada[1]
+
+    def _comprimible(self, ruta):
+        return ruta.split('/', 1)[0] in COMPRIMIBLES and ruta.endswith(EXTENSIONES)
+
+    def comprimir(self):
+        """Genera las variantes .gz/.br que falten o estén desactualizadas. Devuelve cuántas escribió."""
+        escritas = 0
+        for subcarpeta in COMPRIMIBLES:
+            for carpeta, _, archivos in os.walk(os.path.join(self.carpeta, subcarpeta)):
+                for archivo in archivos:
+                    ruta = os.path.relpath(os.path.join(carpeta, archivo), self.carpeta).replace(os.sep, '/')
+                    if self._comprimible(ruta):
+                        escritas += self._comprimir(ruta)
+        return escritas
+
+    def _comprimir(self, ruta):
+        with open(os.path.join(self.carpeta, ruta), 'rb') as f:
+            contenido = f.read()
+        version = hashlib.sha1(contenido).hexdigest()[:12]
+        escritas = 0
+        for codificacion, extension in CODIFICACIONES:
+            if codificacion == 'br' and brotli is None:
+                continue
+            destino = self._variante(ruta, version, extension)
+            if os.path.exists(destino):
+                continue
+            if codificacion == 'br':
+                datos = brotli.compress(contenido, quality=11)
+            else:
+                datos = gzip.compress(contenido, compresslevel=9, mtime=0)
+            if len(datos) >= len(contenido):
+                continue
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            # Varios workers pueden comprimir a la vez: se escribe y renombra
+            temporal = f'{destino}.{uuid.uuid4().hex}'
+            with open(temporal, 'wb') as f:
+                f.write(datos)
+            os.replace(temporal, destino)
+            escritas += 1
+        return escritas
+
+    def _variante(self, ruta, version, extension):
+        return os.path.join(self.comprimidos, f'{ruta}.{version}{extension}')
+
+    def servir(self, filename):
+        completa = safe_join(self.carpeta, filename)
+        if completa is None or not os.path.isfile(completa):
+            abort(404)
+        version = self.version(filename)
+        versionada = request.args.get('v') == version
+
+        archivo, codificacion = completa, None
+        if self._comprimible(filename):
+            aceptadas = request.accept_encodings
+            for nombre, extension in CODIFICACIONES:
+                variante = self._variante(filename, version, extension)
+                if aceptadas[nombre] and os.path.exists(variante):
+                    archivo, codificacion = variante, nombre
+                    break
+
+        respuesta = send_file(archivo, mimetype=mimetypes.guess_type(filename)[0],
+                              etag=f'{version}-{codificacion}' if codificacion else version,
+                              download_name=os.path.basename(filename), conditional=True, max_age=None)
+        if codificacion:
+            respuesta.headers['Content-Encoding'] = codificacion
+        if self._comprimible(filename):
+            respuesta.vary.add('Accept-Encoding')
+        if versionada:
+            respuesta.headers['Cache-Control'] = f'public, max-age={MAX_AGE_VERSIONADO}, immutable'
+        else:
+            respuesta.headers['Cache-Control'] = 'public, no-cache'
+        return respuesta
+
+
+def estatico(ruta):
+    """URL versionada de un recurso estático, para las plantillas."""
+    version = current_app.extensions['estaticos'].version(ruta)
+    return url_for('static', filename=ruta, v=version) if version else url_for('static', filename=ruta)
+
+
+def init_app(app):
+    estaticos = Estaticos(app.config['ESTATICOS_FOLDER'], app.config['ESTATICOS_COMPRIMIDOS_FOLDER'])
+    app.extensions['estaticos'] = estaticos
+    app.add_url_rule('/static/<path:filename>', endpoint='static', view_func=estaticos.servir)
+    app.jinja_env.globals['estatico'] = estatico
+    return estaticos
@@ -0,0 +1,127 @@
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+
+# --- Eventos en vivo (Server-Sent Events) ---
+# Broker de publicación/suscripción dentro del proceso. Las rutas publican
+# al guardar asistencia, actualizar un proyecto o terminar un reporte y cada
+# navegador abierto recibe el evento por una sola conexión /api/eventos en
+# lugar de consultar periódicamente.
+#
+# Cada suscriptor tiene una cola acotada: si un cliente lento la llena, se
+# le cierra la conexión y al reconectar recupera lo perdido con
+# Last-Event-ID desde el historial reciente. Los ids llevan un prefijo por
+# proceso; un id de otro proceso (o demasiado viejo) recibe un evento
+# 'reinicio' para que el cliente recargue su estado completo. Con varios
+# workers cada proceso sólo reparte lo que publica él mismo.
+#
+# Cada conexión abierta retiene un hilo del servidor, así que ``max_clientes``
+# debe quedar por debajo de los hilos del proceso (servidor.py reserva
+# HILOS_LIBRES); pasado el máximo la ruta responde 503 con Retry-After.
+
+TAMANO_COLA = 100
+TAMANO_HISTORIAL = 1000
+
+
+class Suscripcion:
+    def __init__(self, tamano):
+        self.cola = queue.Queue(maxsize=tamano)
+        self.desbordada = False
+
+
+class Broker:
+    def __init__(self, tamano_cola=TAMANO_COLA, tamano_historial=TAMANO_HISTORIAL, max_clientes=None):
+        self.tamano_cola = tamano_cola
+        self.max_clientes = max_clientes
+        self.epoca = f'{os.getpid():x}{int(time.time()):x}'
+        self._ids = itertools.count(1)
+        self._historial = deque(maxlen=tamano_historial)
+        self._suscripciones = set()
+        self._lock = threading.Lock()
+        self.publicados = 0
+        self.desbordados = 0
+
+    def publicar(self, tipo, datos):
+        with self._lock:
+            evento = (f'{self.epoca}-{next(self._ids)}', tipo, json.dumps(datos, ensure_ascii=False, default=str))
+            self._historial.append(evento)
+            self.publicados += 1
+            for suscripcion in self._suscripciones:
+                if suscripcion.desbordada:
+                    continue
+                try:
+                    suscripcion.cola.put_nowait(evento)
+                except queue.Full:
+                    suscripcion.desbordada = True
+                    self.desbordados += 1
+
+    def suscribir(self, ultimo_id=None):
+        """Nueva suscripción; con ``ultimo_id`` encola primero lo publicado después de él.
+
+        Devuelve None si se alcanzó el máximo de clientes.
+        """
+        suscripcion = Suscripcion(self.tamano_cola)
+        with self._lock:
+            if self.max_clientes is not None and len(self._suscripciones) >= self.max_clientes:
+                return None
+            if ultimo_id:
+                pendientes = self._desde(ultimo_id)
+                if pendientes is None or len(pendientes) >= self.tamano_cola:
+                    # Lleva el id más reciente: tras recargar, el cliente sigue desde ahí
+                    actual = self._historial[-1][0] if self._historial else f'{self.epoca}-0'
+                    pendientes = [(actual, 'reinicio', '{}')]
+                for evento in pendientes:
+                    suscripcion.cola.put_nowait(evento)
+            self._suscripciones.add(suscripcion)
+        return suscripcion
+
+    def _desde(self, ultimo_id):
+        epoca, _, numero = ultimo_id.rpartition('-')
+        if epoca != self.epoca or not numero.isdigit():
+            return None
+        numero = int(numero)
+        if self._historial and int(self._historial[0][0].rpartition('-')[2]) > numero + 1:
+            return None  # ya salió del historial
+        return [e for e in self._historial if int(e[0].rpartition('-')[2]) > numero]
+
+    def cancelar(self, suscripcion):
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+
+    def clientes(self):
+        with self._lock:
+            return len(self._suscripciones)
+
+
+def formatear(evento):
+    id_evento, tipo, datos = evento
+    return f'id: {id_evento}\nevent: {tipo}\ndata: {datos}\n\n'
+
+
+def flujo(broker, suscripcion, latido=15, detener=None, reintento_ms=3000):
+    """Generador del cuerpo text/event-stream.
+
+    Envía un comentario cada ``latido`` segundos sin eventos para que proxies
+    y balanceadores no corten la conexión, y termina cuando la cola se
+    desborda o ``detener`` (el aviso de apagado del servidor) se activa.
+    """
+    try:
+        yield f'retry: {reintento_ms}\n\n'
+        ultimo_envio = time.monotonic()
+        while not suscripcion.desbordada and not (detener is not None and detener.is_set()):
+            try:
+                evento = suscripcion.cola.get(timeout=1)
+            except queue.Empty:
+                if time.monotonic() - ultimo_envio >= latido:
+                    yield ': latido\n\n'
+                    ultimo_envio = time.monotonic()
+                continue
+            yield formatear(evento)
+            ultimo_envio = time.monotonic()
+    finally:
+        broker.cancelar(suscripcion)
@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date
+
+
+# --- Exportación en streaming ---
+# Cada exportación recorre el cursor de SQLite fila por fila y emite bloques
+# de texto, así la memoria usada no depende del tamaño del resultado.
+
+FILAS_POR_BLOQUE = 500
+
+CONSULTAS = {
+    'alumnos': {
+        'sql': '''
+            SELECT al.id, al.matricula, al.apellidos, al.nombre,
+                   g.codigo AS grupo, c.codigo AS carrera
+            FROM alumnos al
+            JOIN grupos g ON g.id = al.grupo_id
+            JOIN carreras c ON c.id = g.carrera_id
+            {where}
+            ORDER BY al.id
+        ''',
+        'grupo': 'al.grupo_id',
+        'fecha': None,
+    },
+    'asistencias': {
+        'sql': '''
+            SELECT a.id, a.fecha, g.codigo AS grupo, c.codigo AS carrera,
+                   COALESCE(SUM(d.presente), 0) AS presentes,
+                   COUNT(d.asistencia_id) AS total
+            FROM asistencias a
+            JOIN grupos g ON g.id = a.grupo_id
+            JOIN carreras c ON c.id = g.carrera_id
+            LEFT JOIN detalle_asistencias d ON d.asistencia_id = a.id
+            {where}
+            GROUP BY a.id
+            ORDER BY a.id
+        ''',
+        'grupo': 'a.grupo_id',
+        'fecha': 'a.fecha',
+    },
+    'detalle-asistencias': {
+        'sql': '''
+            SELECT d.asistencia_id, a.fecha, g.codigo AS grupo, c.codigo AS carrera,
+                   al.matricula, al.apellidos, al.nombre, d.presente
+            FROM detalle_asistencias d
+            JOIN asistencias a ON a.id = d.asistencia_id
+            JOIN alumnos al ON al.id = d.alumno_id
+            JOIN grupos g ON g.id = a.grupo_id
+            JOIN carreras c ON c.id = g.carrera_id
+            {where}
+            ORDER BY d.asistencia_id, d.alumno_id
+        ''',
+        'grupo': 'a.grupo_id',
+        'fecha': 'a.fecha',
+    },
+}
+
+FORMATOS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def consulta(tipo, carrera=None, grupo=None, desde=None, hasta=None):
+    """Arma el SQL filtrado de una exportación. Lanza ValueError si los filtros no son válidos."""
+    definicion = CONSULTAS[tipo]
+    condiciones, params = [], []
+    if carrera:
+        condiciones.append('c.id = ?' if str(carrera).isdigit() else 'c.codigo = ?')
+        params.append(carrera)
+    if grupo:
+        condiciones.append(f"{definicion['grupo']} = ?")
+        params.append(int(grupo))
+    if definicion['fecha']:
+        if desde:
+            condiciones.append(f"{definicion['fecha']} >= ?")
+            params.append(date.fromisoformat(desde).isoformat())
+        if hasta:
+            condiciones.append(f"{definicion['fecha']} <= ?")
+            params.append(date.fromisoformat(hasta).isoformat())
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+    return definicion['sql'].format(where=where), params
+
+
+def _bloques_csv(cursor):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow([col[0] for col in cursor.description])
+    while True:
+        filas = cursor.fetchmany(FILAS_POR_BLOQUE)
+        if not filas:
+            break
+        escritor.writerows(filas)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _bloques_ndjson(cursor):
+    columnas = [col[0] for col in cursor.description]
+    while True:
+        filas = cursor.fetchmany(FILAS_POR_BLOQUE)
+        if not filas:
+            break
+        yield ''.join(json.dumps(dict(zip(columnas, fila)), ensure_ascii=False) + '\n' for fila in filas)
+
+
+def generar(conn, sql, params, formato='csv', comprimir=False):
+    """Generador de bytes con el resultado en CSV o NDJSON, opcionalmente en gzip."""
+    cursor = conn.execute(sql, params)
+    bloques = _bloques_csv(cursor) if formato == 'csv' else _bloques_ndjson(cursor)
+    if not comprimir:
+        for bloque in bloques:
+            yield bloque.encode('utf-8')
+        return
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: formato gzip
+    for bloque in bloques:
+        datos = compresor.compress(bloque.encode('utf-8'))
+        if datos:
+            yield datos
+    yield compresor.flush()
@@ -0,0 +1,165 @@
+import csv
+import io
+import re
+import unicodedata
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+
+# --- Importación masiva de alumnos ---
+# Los archivos se leen fila por fila (CSV con csv.reader, XLSX recorriendo el
+# XML de la hoja con iterparse) y se insertan en lotes, una transacción por lote.
+
+LOTE = 1000
+MAX_ERRORES = 500
+COLUMNAS = ('matricula', 'apellidos', 'nombre')
+
+NS_XLSX = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+
+def _normalizar_encabezado(texto):
+    texto = unicodedata.normalize('NFKD', str(texto or '')).encode('ascii', 'ignore').decode()
+    return re.sub(r'\W+', '_', texto.strip().lower()).strip('_')
+
+
+def _como_diccionarios(filas):
+    filas = iter(filas)
+    encabezados = [_normalizar_encabezado(h) for h in next(filas, [])]
+    for valores in filas:
+        # Las filas vacías se entregan como {} para conservar la numeración
+        yield dict(zip(encabezados, valores)) if any(v not in (None, '') for v in valores) else {}
+
+
+def leer_csv(stream, encoding='utf-8-sig'):
+    texto = io.TextIOWrapper(stream, encoding=encoding, newline='')
+    muestra = texto.readline()
+    delimitador = ';' if muestra.count(';') > muestra.count(',') else ','
+    lector = csv.reader(_encadenar(muestra, texto), delimiter=delimitador)
+    try:
+        yield from _como_diccionarios(lector)
+    except csv.Error as e:
+        # Comillas sin cerrar, campos gigantes, NUL en versiones de Python < 3.11
+        raise ValueError(f"fila {lector.line_num}: {e}") from e
+
+
+def _encadenar(primera, resto):
+    yield primera
+    yield from resto
+
+
+def _indice_columna(referencia):
+    indice = 0
+    for letra in referencia:
+        if not letra.isalpha():
+            break
+        indice = indice * 26 + ord(letra.upper()) - 64
+    return indice - 1
+
+
+def _filas_xlsx(archivo):
+    with zipfile.ZipFile(archivo) as libro:
+        compartidas = []
+        if 'xl/sharedStrings.xml' in libro.namelist():
+            with libro.open('xl/sharedStrings.xml') as f:
+                for _, elem in iterparse(f):
+                    if elem.tag == f'{NS_XLSX}si':
+                        compartidas.append(''.join(t.text or '' for t in elem.iter(f'{NS_XLSX}t')))
+                        elem.clear()
+
+        hojas = sorted(n for n in libro.namelist() if re.match(r'xl/worksheets/sheet\d+\.xml$', n))
+        if not hojas:
+            raise ValueError("El archivo XLSX no contiene hojas")
+        with libro.open(hojas[0]) as f:
+            for _, elem in iterparse(f):
+                if elem.tag != f'{NS_XLSX}row':
+                    continue
+                fila = []
+                for celda in elem.iter(f'{NS_XLSX}c'):
+                    posicion = _indice_columna(celda.get('r', '')) if celda.get('r') else len(fila)
+                    fila.extend([''] * (posicion - len(fila)))
+                    tipo = celda.get('t')
+                    if tipo == 'inlineStr':
+                        valor = ''.join(t.text or '' for t in celda.iter(f'{NS_XLSX}t'))
+                    else:
+                        v = celda.find(f'{NS_XLSX}v')
+                        valor = '' if v is None else v.text or ''
+                        if tipo == 's' and valor:
+                            valor = compartidas[int(valor)]
+                        elif valor.endswith('.0'):
+                            valor = valor[:-2]
+                    fila.append(valor)
+                elem.clear()
+                yield fila
+
+
+def leer_xlsx(archivo):
+    """Lector XLSX mínimo: primera hoja, primera fila como encabezados.
+
+    Las filas se recorren en streaming; sólo la tabla de cadenas compartidas
+    se mantiene en memoria.
+    """
+    yield from _como_diccionarios(_filas_xlsx(archivo))
+
+
+def importar(conn, filas, lote=LOTE):
+    """Valida e inserta alumnos en lotes. Devuelve el reporte por fila."""
+    grupos = {}
+    for grupo_id, codigo in conn.execute('SELECT id, codigo FROM grupos'):
+        grupos[str(grupo_id)] = grupo_id
+        grupos[codigo.upper()] = grupo_id
+
+    vistas = set()
+    resultado = {'insertados': 0, 'total_errores': 0, 'errores': []}
+
+    def error(numero, matricula, mensaje):
+        resultado['total_errores'] += 1
+        if len(resultado['errores']) < MAX_ERRORES:
+            resultado['errores'].append({'fila': numero, 'matricula': matricula, 'error': mensaje})
+
+    def guardar(pendientes):
+        # Una consulta por lote detecta matrículas que ya existen en la base.
+        # Consulta e INSERT van en la misma transacción de escritura (BEGIN
+        # IMMEDIATE): otra importación no puede insertar la misma matrícula en
+        # medio, así que toda repetida queda en el reporte de errores.
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            existentes = {row[0] for row in conn.execute(
+                f"SELECT matricula FROM alumnos WHERE matricula IN ({','.join('?' * len(pendientes))})",
+                [p[2] for p in pendientes])}
+            nuevos = []
+            for numero, grupo_id, matricula, apellidos, nombre in pendientes:
+                if matricula in existentes:
+                    error(numero, matricula, "Matrícula ya existe")
+                else:
+                    nuevos.append((grupo_id, matricula, apellidos, nombre))
+            if nuevos:
+                cursor = conn.executemany('''
+                    INSERT INTO alumnos (grupo_id, matricula, apellidos, nombre)
+                    VALUES (?, ?, ?, ?)
+                ''', nuevos)
+                resultado['insertados'] += cursor.rowcount
+
+    pendientes = []
+    for numero, fila in enumerate(filas, start=2):
+        if not fila:
+            continue
+        matricula = str(fila.get('matricula') or '').strip()
+        faltantes = [c for c in COLUMNAS if not str(fila.get(c) or '').strip()]
+        grupo = str(fila.get('grupo_id') or fila.get('grupo') or '').strip().upper()
+        if faltantes:
+            error(numero, matricula, f"Faltan columnas: {', '.join(faltantes)}")
+        elif grupo not in grupos:
+            error(numero, matricula, f"Grupo no encontrado: {grupo or '-'}")
+        elif matricula in vistas:
+            error(numero, matricula, "Matrícula repetida en el archivo")
+        else:
+            vistas.add(matricula)
+            pendientes.append((numero, grupos[grupo], matricula,
+                               str(fila['apellidos']).strip(), str(fila['nombre']).strip()))
+        if len(pendientes) >= lote:
+            guardar(pendientes)
+            pendientes = []
+    if pendientes:
+        guardar(pendientes)
+    resultado['errores'].sort(key=lambda e: e['fila'])
+    return resultado
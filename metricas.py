@@ -0,0 +1,196 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from flask import g, has_request_context, request, template_rendered, before_render_template
+
+
+# --- Instrumentación de peticiones ---
+# Latencia por endpoint (histograma), consultas SQL y su tiempo, tiempo de
+# render de plantillas y tamaño de respuestas, publicados en /metrics con el
+# formato de texto de Prometheus. Se activa/desactiva en caliente con
+# app.config['METRICAS_ACTIVAS'].
+#
+# Los contadores y la configuración viven en memoria de cada proceso: con
+# varios workers (servidor.py, gunicorn) /metrics muestra sólo el worker que
+# atendió la petición y /metrics/estado cambia sólo ese worker. Prometheus
+# debe raspar cada worker por separado o sumar las series.
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_SQL_POR_PETICION = 50
+
+logger = logging.getLogger('sgp.metricas')
+
+
+class CursorMedido(sqlite3.Cursor):
+    def execute(self, sql, parametros=()):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            _registrar_sql(sql, time.perf_counter() - inicio)
+
+    def executemany(self, sql, parametros):
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, parametros)
+        finally:
+            _registrar_sql(sql, time.perf_counter() - inicio)
+
+
+class ConexionMedida(sqlite3.Connection):
+    """Conexión que mide cada sentencia ejecutada durante una petición."""
+
+    def cursor(self, factory=CursorMedido):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        return self.cursor().executemany(sql, parametros)
+
+
+def _registrar_sql(sql, duracion):
+    if not has_request_context() or 'metricas_inicio' not in g:
+        return
+    g.sql_consultas += 1
+    g.sql_tiempo += duracion
+    if len(g.sql_detalle) < MAX_SQL_POR_PETICION:
+        g.sql_detalle.append((duracion, ' '.join(sql.split())))
+
+
+class Histograma:
+    def __init__(self):
+        self.cuentas = [0] * len(BUCKETS)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        for i, limite in enumerate(BUCKETS):
+            if valor <= limite:
+                self.cuentas[i] += 1
+                break
+        self.suma += valor
+        self.total += 1
+
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencia = defaultdict(Histograma)
+        self.peticiones = defaultdict(int)
+        self.sql_consultas = defaultdict(int)
+        self.sql_tiempo = defaultdict(float)
+        self.plantillas = defaultdict(lambda: [0, 0.0])
+        self.bytes_respuesta = defaultdict(int)
+        self.colectores = []
+
+    def registrar(self, endpoint, metodo, estado, duracion, consultas, tiempo_sql, tamano):
+        with self._lock:
+            self.latencia[endpoint].observar(duracion)
+            self.peticiones[(endpoint, metodo, estado)] += 1
+            self.sql_consultas[endpoint] += consultas
+            self.sql_tiempo[endpoint] += tiempo_sql
+            if tamano is not None:
+                self.bytes_respuesta[endpoint] += tamano
+
+    def registrar_plantilla(self, nombre, duracion):
+        with self._lock:
+            datos = self.plantillas[nombre]
+            datos[0] += 1
+            datos[1] += duracion
+
+    def texto(self):
+        lineas = []
+
+        def metrica(nombre, tipo, ayuda):
+            lineas.append(f'# HELP {nombre} {ayuda}')
+            lineas.append(f'# TYPE {nombre} {tipo}')
+
+        with self._lock:
+            metrica('sgp_http_request_duration_seconds', 'histogram', 'Latencia de peticiones por endpoint')
+            for endpoint, h in sorted(self.latencia.items()):
+                acumulado = 0
+                for limite, cuenta in zip(BUCKETS, h.cuentas):
+                    acumulado += cuenta
+                    lineas.append(f'sgp_http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{limite}"}} {acumulado}')
+                lineas.append(f'sgp_http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {h.total}')
+                lineas.append(f'sgp_http_request_duration_seconds_sum{{endpoint="{endpoint}"}} {h.suma:.6f}')
+                lineas.append(f'sgp_http_request_duration_seconds_count{{endpoint="{endpoint}"}} {h.total}')
+
+            metrica('sgp_http_requests_total', 'counter', 'Peticiones por endpoint, método y estado')
+            for (endpoint, metodo, estado), total in sorted(self.peticiones.items()):
+                lineas.append(f'sgp_http_requests_total{{endpoint="{endpoint}",method="{metodo}",status="{estado}"}} {total}')
+
+            metrica('sgp_sql_queries_total', 'counter', 'Consultas SQL ejecutadas por endpoint')
+            for endpoint, total in sorted(self.sql_consultas.items()):
+                lineas.append(f'sgp_sql_queries_total{{endpoint="{endpoint}"}} {total}')
+
+            metrica('sgp_sql_duration_seconds_total', 'counter', 'Tiempo acumulado en SQL por endpoint')
+            for endpoint, total in sorted(self.sql_tiempo.items()):
+                lineas.append(f'sgp_sql_duration_seconds_total{{endpoint="{endpoint}"}} {total:.6f}')
+
+            metrica('sgp_template_render_seconds', 'summary', 'Tiempo de render por plantilla')
+            for nombre, (total, tiempo) in sorted(self.plantillas.items()):
+                lineas.append(f'sgp_template_render_seconds_sum{{template="{nombre}"}} {tiempo:.6f}')
+                lineas.append(f'sgp_template_render_seconds_count{{template="{nombre}"}} {total}')
+
+            metrica('sgp_http_response_bytes_total', 'counter', 'Bytes de respuesta por endpoint')
+            for endpoint, total in sorted(self.bytes_respuesta.items()):
+                lineas.append(f'sgp_http_response_bytes_total{{endpoint="{endpoint}"}} {total}')
+
+        for colector in self.colectores:
+            lineas.extend(colector())
+        return '\n'.join(lineas) + '\n'
+
+
+def init_app(app):
+    app.config.setdefault('METRICAS_ACTIVAS', True)
+    # Peticiones más lentas que esto (ms) se registran con su SQL; None lo desactiva
+    app.config.setdefault('METRICAS_LENTO_MS', 500)
+    app.config['DB_CONNECTION_FACTORY'] = ConexionMedida
+    metricas = Metricas()
+    app.extensions['metricas'] = metricas
+
+    @app.before_request
+    def _iniciar():
+        if app.config['METRICAS_ACTIVAS']:
+            g.metricas_inicio = time.perf_counter()
+            g.sql_consultas = 0
+            g.sql_tiempo = 0.0
+            g.sql_detalle = []
+
+    @app.after_request
+    def _registrar(respuesta):
+        inicio = g.pop('metricas_inicio', None)
+        if inicio is None:
+            return respuesta
+        duracion = time.perf_counter() - inicio
+        endpoint = request.endpoint or 'desconocido'
+        tamano = None if respuesta.is_streamed else respuesta.content_length
+        metricas.registrar(endpoint, request.method, respuesta.status_code, duracion,
+                           g.sql_consultas, g.sql_tiempo, tamano)
+
+        limite = app.config['METRICAS_LENTO_MS']
+        if limite is not None and duracion * 1000 >= limite:
+            peores = sorted(g.sql_detalle, reverse=True)[:5]
+            logger.warning(
+                'Petición lenta %s %s: %.1f ms, %d consultas (%.1f ms en SQL)%s',
+                request.method, request.path, duracion * 1000, g.sql_consultas, g.sql_tiempo * 1000,
+                ''.join(f'\n  {t * 1000:.1f} ms  {sql[:300]}' for t, sql in peores))
+        return respuesta
+
+    def _antes_de_plantilla(sender, template, context, **extra):
+        if app.config['METRICAS_ACTIVAS'] and has_request_context():
+            g.plantilla_inicio = time.perf_counter()
+
+    def _plantilla_renderizada(sender, template, context, **extra):
+        if has_request_context() and 'plantilla_inicio' in g:
+            metricas.registrar_plantilla(template.name, time.perf_counter() - g.pop('plantilla_inicio'))
+
+    before_render_template.connect(_antes_de_plantilla, app, weak=False)
+    template_rendered.connect(_plantilla_renderizada, app, weak=False)
+    return metricas
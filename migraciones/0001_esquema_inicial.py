@@ -0,0 +1,111 @@
+# Esquema original de la aplicación más los índices del historial de asistencia.
+
+TABLAS = (
+    # Tabla de administradores
+    '''
+    CREATE TABLE IF NOT EXISTS admin (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL
+    )
+    ''',
+    # Tabla de observaciones
+    '''
+    CREATE TABLE IF NOT EXISTS observaciones (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        texto TEXT NOT NULL,
+        fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Tabla de proyectos
+    '''
+    CREATE TABLE IF NOT EXISTS proyectos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre TEXT NOT NULL,
+        descripcion TEXT,
+        estado TEXT DEFAULT 'Sin iniciar',
+        responsable TEXT,
+        fecha_inicio TEXT,
+        avance TEXT DEFAULT '0%',
+        inversion TEXT,
+        recursos TEXT,
+        ultima_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Tabla de reportes
+    '''
+    CREATE TABLE IF NOT EXISTS reportes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        proyecto_id INTEGER NOT NULL,
+        nombre_archivo TEXT NOT NULL,
+        ruta_archivo TEXT NOT NULL,
+        fecha_generacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        tipo TEXT NOT NULL,
+        FOREIGN KEY (proyecto_id) REFERENCES proyectos (id)
+    )
+    ''',
+    # Tabla de carreras
+    '''
+    CREATE TABLE IF NOT EXISTS carreras (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre TEXT NOT NULL UNIQUE,
+        codigo TEXT NOT NULL UNIQUE
+    )
+    ''',
+    # Tabla de grupos
+    '''
+    CREATE TABLE IF NOT EXISTS grupos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        carrera_id INTEGER NOT NULL,
+        nombre TEXT NOT NULL,
+        codigo TEXT NOT NULL UNIQUE,
+        FOREIGN KEY (carrera_id) REFERENCES carreras (id)
+    )
+    ''',
+    # Tabla de alumnos
+    '''
+    CREATE TABLE IF NOT EXISTS alumnos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        grupo_id INTEGER NOT NULL,
+        matricula TEXT NOT NULL UNIQUE,
+        apellidos TEXT NOT NULL,
+        nombre TEXT NOT NULL,
+        FOREIGN KEY (grupo_id) REFERENCES grupos (id)
+    )
+    ''',
+    # Tabla de asistencias
+    '''
+    CREATE TABLE IF NOT EXISTS asistencias (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        grupo_id INTEGER NOT NULL,
+        fecha DATE NOT NULL,
+        FOREIGN KEY (grupo_id) REFERENCES grupos (id),
+        UNIQUE(grupo_id, fecha)
+    )
+    ''',
+    # Tabla de detalle_asistencias
+    '''
+    CREATE TABLE IF NOT EXISTS detalle_asistencias (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        asistencia_id INTEGER NOT NULL,
+        alumno_id INTEGER NOT NULL,
+        presente BOOLEAN NOT NULL DEFAULT 0,
+        FOREIGN KEY (asistencia_id) REFERENCES asistencias (id),
+        FOREIGN KEY (alumno_id) REFERENCES alumnos (id),
+        UNIQUE(asistencia_id, alumno_id)
+    )
+    ''',
+    # Índices para el historial: la página se recorre por fecha y el
+    # agregado de presentes se resuelve sólo con el índice de detalle.
+    # La búsqueda por (grupo_id, fecha) ya la cubre UNIQUE(grupo_id, fecha).
+    'CREATE INDEX IF NOT EXISTS idx_asistencias_fecha ON asistencias (fecha)',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_detalle_asistencia_presente
+    ON detalle_asistencias (asistencia_id, presente)
+    ''',
+)
+
+
+def upgrade(conn):
+    for sql in TABLAS:
+        conn.execute(sql)
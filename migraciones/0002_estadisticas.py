@@ -0,0 +1,103 @@
+# Estadísticas materializadas de asistencia: tablas de resumen, triggers y
+# carga inicial desde los datos existentes (ver estadisticas.py).
+
+SENTENCIAS = (
+    '''
+    CREATE TABLE IF NOT EXISTS estadisticas_alumno (
+        alumno_id INTEGER PRIMARY KEY,
+        sesiones INTEGER NOT NULL DEFAULT 0,
+        presentes INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY (alumno_id) REFERENCES alumnos (id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS estadisticas_grupo_semana (
+        grupo_id INTEGER NOT NULL,
+        semana TEXT NOT NULL,
+        sesiones INTEGER NOT NULL DEFAULT 0,
+        registros INTEGER NOT NULL DEFAULT 0,
+        presentes INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (grupo_id, semana),
+        FOREIGN KEY (grupo_id) REFERENCES grupos (id)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_asistencias_ai AFTER INSERT ON asistencias
+    BEGIN
+        INSERT INTO estadisticas_grupo_semana (grupo_id, semana, sesiones)
+        VALUES (NEW.grupo_id, strftime('%Y-%W', NEW.fecha), 1)
+        ON CONFLICT(grupo_id, semana) DO UPDATE SET sesiones = sesiones + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_asistencias_ad AFTER DELETE ON asistencias
+    BEGIN
+        UPDATE estadisticas_grupo_semana SET sesiones = sesiones - 1
+        WHERE grupo_id = OLD.grupo_id AND semana = strftime('%Y-%W', OLD.fecha);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_detalle_ai AFTER INSERT ON detalle_asistencias
+    BEGIN
+        INSERT INTO estadisticas_alumno (alumno_id, sesiones, presentes)
+        VALUES (NEW.alumno_id, 1, NEW.presente)
+        ON CONFLICT(alumno_id) DO UPDATE SET
+            sesiones = sesiones + 1,
+            presentes = presentes + excluded.presentes;
+        INSERT INTO estadisticas_grupo_semana (grupo_id, semana, registros, presentes)
+        SELECT grupo_id, strftime('%Y-%W', fecha), 1, NEW.presente
+        FROM asistencias WHERE id = NEW.asistencia_id
+        ON CONFLICT(grupo_id, semana) DO UPDATE SET
+            registros = registros + 1,
+            presentes = presentes + excluded.presentes;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_detalle_au AFTER UPDATE OF presente ON detalle_asistencias
+    WHEN OLD.presente IS NOT NEW.presente
+    BEGIN
+        UPDATE estadisticas_alumno SET presentes = presentes + NEW.presente - OLD.presente
+        WHERE alumno_id = NEW.alumno_id;
+        UPDATE estadisticas_grupo_semana SET presentes = presentes + NEW.presente - OLD.presente
+        WHERE (grupo_id, semana) = (
+            SELECT grupo_id, strftime('%Y-%W', fecha) FROM asistencias WHERE id = NEW.asistencia_id
+        );
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_detalle_ad AFTER DELETE ON detalle_asistencias
+    BEGIN
+        UPDATE estadisticas_alumno SET
+            sesiones = sesiones - 1,
+            presentes = presentes - OLD.presente
+        WHERE alumno_id = OLD.alumno_id;
+        UPDATE estadisticas_grupo_semana SET
+            registros = registros - 1,
+            presentes = presentes - OLD.presente
+        WHERE (grupo_id, semana) = (
+            SELECT grupo_id, strftime('%Y-%W', fecha) FROM asistencias WHERE id = OLD.asistencia_id
+        );
+    END
+    ''',
+)
+
+
+def upgrade(conn):
+    for sql in SENTENCIAS:
+        conn.execute(sql)
+    conn.execute('DELETE FROM estadisticas_alumno')
+    conn.execute('DELETE FROM estadisticas_grupo_semana')
+    conn.execute('''
+        INSERT INTO estadisticas_alumno (alumno_id, sesiones, presentes)
+        SELECT d.alumno_id, COUNT(*), SUM(d.presente)
+        FROM detalle_asistencias d
+        GROUP BY d.alumno_id
+    ''')
+    conn.execute('''
+        INSERT INTO estadisticas_grupo_semana (grupo_id, semana, sesiones, registros, presentes)
+        SELECT a.grupo_id, strftime('%Y-%W', a.fecha) AS semana,
+               COUNT(DISTINCT a.id), COUNT(d.asistencia_id), COALESCE(SUM(d.presente), 0)
+        FROM asistencias a
+        LEFT JOIN detalle_asistencias d ON d.asistencia_id = a.id
+        GROUP BY a.grupo_id, semana
+    ''')
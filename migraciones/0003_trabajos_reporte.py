@@ -0,0 +1,18 @@
+# Cola de trabajos de reportes (ver trabajos_reporte.py).
+
+
+def upgrade(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS trabajos_reporte (
+            id TEXT PRIMARY KEY,
+            proyecto_id INTEGER,
+            estado TEXT NOT NULL DEFAULT 'pendiente',
+            reportes TEXT,
+            error TEXT,
+            creado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            terminado TIMESTAMP,
+            FOREIGN KEY (proyecto_id) REFERENCES proyectos (id)
+        )
+    ''')
+    # No es UNIQUE porque bases anteriores ya tienen nombres repetidos
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_reportes_nombre_archivo ON reportes (nombre_archivo)')
@@ -0,0 +1,40 @@
+# Paginación por (fecha, id) y búsqueda de texto completo en observaciones.
+# observaciones_fts es una tabla FTS5 de contenido externo sincronizada con
+# triggers; 'rebuild' la llena con las observaciones existentes.
+
+SENTENCIAS = (
+    'CREATE INDEX IF NOT EXISTS idx_observaciones_fecha_id ON observaciones (fecha, id)',
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS observaciones_fts USING fts5(
+        texto,
+        content='observaciones',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_observaciones_ai AFTER INSERT ON observaciones
+    BEGIN
+        INSERT INTO observaciones_fts (rowid, texto) VALUES (NEW.id, NEW.texto);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_observaciones_ad AFTER DELETE ON observaciones
+    BEGIN
+        INSERT INTO observaciones_fts (observaciones_fts, rowid, texto) VALUES ('delete', OLD.id, OLD.texto);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_observaciones_au AFTER UPDATE OF texto ON observaciones
+    BEGIN
+        INSERT INTO observaciones_fts (observaciones_fts, rowid, texto) VALUES ('delete', OLD.id, OLD.texto);
+        INSERT INTO observaciones_fts (rowid, texto) VALUES (NEW.id, NEW.texto);
+    END
+    ''',
+    "INSERT INTO observaciones_fts (observaciones_fts) VALUES ('rebuild')",
+)
+
+
+def upgrade(conn):
+    for sql in SENTENCIAS:
+        conn.execute(sql)
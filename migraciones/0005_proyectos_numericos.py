@@ -0,0 +1,129 @@
+# avance e inversion pasan de TEXT ('45%', '$12,500') a REAL y se agrega el
+# historial de cambios de proyectos. SQLite no cambia el tipo de una columna,
+# así que la tabla se reconstruye copiando los valores ya convertidos.
+import re
+
+HISTORIAL = (
+    '''
+    CREATE TABLE IF NOT EXISTS proyecto_historial (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        proyecto_id INTEGER NOT NULL,
+        fecha TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        estado TEXT,
+        avance REAL,
+        inversion REAL,
+        FOREIGN KEY (proyecto_id) REFERENCES proyectos (id)
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_proyecto_historial_proyecto_fecha ON proyecto_historial (proyecto_id, fecha)',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_proyectos_historial_ai AFTER INSERT ON proyectos
+    BEGIN
+        INSERT INTO proyecto_historial (proyecto_id, estado, avance, inversion)
+        VALUES (NEW.id, NEW.estado, NEW.avance, NEW.inversion);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_proyectos_historial_au AFTER UPDATE ON proyectos
+    WHEN OLD.estado IS NOT NEW.estado OR OLD.avance IS NOT NEW.avance OR OLD.inversion IS NOT NEW.inversion
+    BEGIN
+        INSERT INTO proyecto_historial (proyecto_id, estado, avance, inversion)
+        VALUES (NEW.id, NEW.estado, NEW.avance, NEW.inversion);
+    END
+    ''',
+    # El historial sólo admite inserciones
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_proyecto_historial_bu BEFORE UPDATE ON proyecto_historial
+    BEGIN
+        SELECT RAISE(ABORT, 'proyecto_historial es de sólo inserción');
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_proyecto_historial_bd BEFORE DELETE ON proyecto_historial
+    BEGIN
+        SELECT RAISE(ABORT, 'proyecto_historial es de sólo inserción');
+    END
+    ''',
+)
+
+NUEVA_TABLA = '''
+    CREATE TABLE proyectos_nueva (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre TEXT NOT NULL,
+        descripcion TEXT,
+        estado TEXT DEFAULT 'Sin iniciar',
+        responsable TEXT,
+        fecha_inicio TEXT,
+        avance REAL NOT NULL DEFAULT 0 CHECK (avance BETWEEN 0 AND 100),
+        inversion REAL CHECK (inversion IS NULL OR inversion >= 0),
+        recursos TEXT,
+        ultima_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+# Copia de proyectos.a_numero al escribir esta migración
+MILES = {sep: re.compile(rf'^-?[1-9]\d{{0,2}}(\{sep}\d{{3}})+$') for sep in ',.'}
+
+
+def _a_numero(valor):
+    if valor is None or isinstance(valor, bool):
+        return None
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    texto = re.sub(r'[^\d.,-]', '', str(valor))
+    if not texto:
+        return None
+    # Con los dos separadores, el que aparece al final es el decimal; con uno
+    # solo, es de miles si agrupa el entero de a tres dígitos
+    if ',' in texto and '.' in texto:
+        if texto.rfind(',') > texto.rfind('.'):
+            texto = texto.replace('.', '').replace(',', '.')
+        else:
+            texto = texto.replace(',', '')
+    else:
+        for separador in ',.':
+            if separador in texto:
+                if MILES[separador].match(texto):
+                    texto = texto.replace(separador, '')
+                else:
+                    texto = texto.replace(separador, '.')
+    return float(texto)
+
+
+def _convertir(valor, minimo=0.0, maximo=None):
+    # Los valores que no se pueden interpretar o quedan fuera de rango se
+    # descartan en lugar de detener la migración.
+    try:
+        numero = _a_numero(valor)
+    except ValueError:
+        return None
+    if numero is None or numero < minimo or (maximo is not None and numero > maximo):
+        return None
+    return numero
+
+
+def upgrade(conn):
+    filas = conn.execute('''
+        SELECT id, nombre, descripcion, estado, responsable, fecha_inicio,
+               avance, inversion, recursos, ultima_actualizacion
+        FROM proyectos
+    ''').fetchall()
+    conn.execute(NUEVA_TABLA)
+    conn.executemany('''
+        INSERT INTO proyectos_nueva (id, nombre, descripcion, estado, responsable, fecha_inicio,
+                                     avance, inversion, recursos, ultima_actualizacion)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [(f[0], f[1], f[2], f[3], f[4], f[5],
+           _convertir(f[6], maximo=100) or 0.0, _convertir(f[7]), f[8], f[9]) for f in filas])
+    conn.execute('DROP TABLE proyectos')
+    conn.execute('ALTER TABLE proyectos_nueva RENAME TO proyectos')
+
+    for sql in HISTORIAL:
+        conn.execute(sql)
+    # Punto de partida del historial: el estado actual de cada proyecto
+    conn.execute('''
+        INSERT INTO proyecto_historial (proyecto_id, fecha, estado, avance, inversion)
+        SELECT id, COALESCE(ultima_actualizacion, CURRENT_TIMESTAMP), estado, avance, inversion
+        FROM proyectos
+    ''')
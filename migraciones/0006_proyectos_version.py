@@ -0,0 +1,6 @@
+# Número de versión de cada proyecto para el bloqueo optimista: cada UPDATE
+# lo incrementa y sólo se aplica si el cliente envía la versión que leyó.
+
+
+def upgrade(conn):
+    conn.execute('ALTER TABLE proyectos ADD COLUMN version INTEGER NOT NULL DEFAULT 1')
@@ -0,0 +1,6 @@
+# La hoja de pase de lista ordena a los alumnos del grupo por apellidos y
+# nombre; con este índice SQLite los lee ya ordenados sin un paso de sort.
+
+
+def upgrade(conn):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_alumnos_grupo_apellidos ON alumnos (grupo_id, apellidos, nombre)')
@@ -0,0 +1,42 @@
+# Secuencia de cambios y hora de marca en detalle_asistencias para la
+# sincronización incremental de los clientes sin conexión (ver sincronizacion.py).
+
+SENTENCIAS = (
+    'ALTER TABLE detalle_asistencias ADD COLUMN marcado_en TEXT',
+    'ALTER TABLE detalle_asistencias ADD COLUMN secuencia INTEGER',
+    '''
+    CREATE TABLE IF NOT EXISTS secuencia_asistencias (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        valor INTEGER NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_detalle_asistencias_secuencia ON detalle_asistencias (secuencia)',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_detalle_secuencia_ai AFTER INSERT ON detalle_asistencias
+    BEGIN
+        UPDATE secuencia_asistencias SET valor = valor + 1 WHERE id = 1;
+        UPDATE detalle_asistencias SET secuencia = (SELECT valor FROM secuencia_asistencias WHERE id = 1)
+        WHERE id = NEW.id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_detalle_secuencia_au AFTER UPDATE OF presente ON detalle_asistencias
+    WHEN OLD.presente IS NOT NEW.presente
+    BEGIN
+        UPDATE secuencia_asistencias SET valor = valor + 1 WHERE id = 1;
+        UPDATE detalle_asistencias SET secuencia = (SELECT valor FROM secuencia_asistencias WHERE id = 1)
+        WHERE id = NEW.id;
+    END
+    ''',
+)
+
+
+def upgrade(conn):
+    for sql in SENTENCIAS:
+        conn.execute(sql)
+    # Las filas existentes toman su id como secuencia inicial
+    conn.execute('UPDATE detalle_asistencias SET secuencia = id')
+    conn.execute('''
+        INSERT OR REPLACE INTO secuencia_asistencias (id, valor)
+        SELECT 1, COALESCE(MAX(id), 0) FROM detalle_asistencias
+    ''')
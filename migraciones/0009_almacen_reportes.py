@@ -0,0 +1,50 @@
+# Almacén de reportes por contenido: hash en reportes y conteo de
+# referencias por objeto (ver almacen.py). Los archivos existentes los migra
+# el reconciliador.
+
+SENTENCIAS = (
+    'ALTER TABLE reportes ADD COLUMN hash TEXT',
+    'CREATE INDEX IF NOT EXISTS idx_reportes_hash ON reportes (hash)',
+    '''
+    CREATE TABLE IF NOT EXISTS objetos_reporte (
+        hash TEXT PRIMARY KEY,
+        tamano INTEGER NOT NULL,
+        referencias INTEGER NOT NULL DEFAULT 0,
+        sin_referencias_desde TIMESTAMP
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_objetos_reporte_referencias ON objetos_reporte (referencias)',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_reportes_objeto_ai AFTER INSERT ON reportes
+    WHEN NEW.hash IS NOT NULL
+    BEGIN
+        UPDATE objetos_reporte SET referencias = referencias + 1, sin_referencias_desde = NULL
+        WHERE hash = NEW.hash;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_reportes_objeto_ad AFTER DELETE ON reportes
+    WHEN OLD.hash IS NOT NULL
+    BEGIN
+        UPDATE objetos_reporte SET referencias = referencias - 1,
+            sin_referencias_desde = CASE WHEN referencias = 1 THEN CURRENT_TIMESTAMP END
+        WHERE hash = OLD.hash;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_reportes_objeto_au AFTER UPDATE OF hash ON reportes
+    WHEN OLD.hash IS NOT NEW.hash
+    BEGIN
+        UPDATE objetos_reporte SET referencias = referencias - 1,
+            sin_referencias_desde = CASE WHEN referencias = 1 THEN CURRENT_TIMESTAMP END
+        WHERE hash = OLD.hash;
+        UPDATE objetos_reporte SET referencias = referencias + 1, sin_referencias_desde = NULL
+        WHERE hash = NEW.hash;
+    END
+    ''',
+)
+
+
+def upgrade(conn):
+    for sql in SENTENCIAS:
+        conn.execute(sql)
@@ -0,0 +1,17 @@
+# Intentos de inicio de sesión fallidos, para el limitador compartido entre
+# procesos (LOGIN_LIMITADOR = 'sqlite', ver autenticacion.py).
+
+SENTENCIAS = (
+    '''
+    CREATE TABLE IF NOT EXISTS intentos_login (
+        clave TEXT NOT NULL,
+        momento REAL NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_intentos_login_clave ON intentos_login (clave, momento)',
+)
+
+
+def upgrade(conn):
+    for sql in SENTENCIAS:
+        conn.execute(sql)
@@ -0,0 +1,13 @@
+# La carga inicial de la analítica de asistencia (analitica.CARGA) lee el
+# alumno y la marca de cada detalle de la sesión. Con alumno_id dentro del
+# índice de detalle la subconsulta se resuelve sólo con el índice, sin ir a la
+# tabla por cada marca. El índice anterior es un prefijo del nuevo, así que el
+# agregado de presentes del historial sigue cubierto.
+
+
+def upgrade(conn):
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_detalle_asistencia_presente_alumno
+        ON detalle_asistencias (asistencia_id, presente, alumno_id)
+    ''')
+    conn.execute('DROP INDEX IF EXISTS idx_detalle_asistencia_presente')
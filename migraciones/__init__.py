@@ -0,0 +1,72 @@
+import importlib.util
+import os
+import re
+
+
+# --- Migraciones de esquema ---
+# Cada archivo NNNN_nombre.py de esta carpeta define upgrade(conn) y se aplica
+# una sola vez, en orden, dentro de su propia transacción. La versión aplicada
+# queda registrada en la tabla schema_version.
+#
+# Una migración no importa los módulos de la app: su SQL y sus conversiones
+# se copian en el archivo, para que aplicarla en una base vieja siga dando el
+# mismo esquema aunque el módulo cambie después. Un cambio de esquema nuevo
+# es siempre un archivo nuevo.
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+PATRON = re.compile(r'^(\d{4})_(\w+)\.py$')
+
+
+def descubrir():
+    migraciones = []
+    for archivo in sorted(os.listdir(CARPETA)):
+        coincidencia = PATRON.match(archivo)
+        if not coincidencia:
+            continue
+        spec = importlib.util.spec_from_file_location(
+            f'migraciones.m{coincidencia.group(1)}', os.path.join(CARPETA, archivo))
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+        migraciones.append((int(coincidencia.group(1)), coincidencia.group(2), modulo))
+    return migraciones
+
+
+def _crear_tabla_version(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            nombre TEXT NOT NULL,
+            aplicada TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def version_actual(conn):
+    _crear_tabla_version(conn)
+    return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0]
+
+
+def pendientes(conn):
+    actual = version_actual(conn)
+    return [(v, n) for v, n, _ in descubrir() if v > actual]
+
+
+def aplicar(conn):
+    """Aplica las migraciones pendientes y devuelve la lista (version, nombre) aplicada."""
+    aplicadas = []
+    for version, nombre, modulo in descubrir():
+        # BEGIN IMMEDIATE serializa a varios procesos que migren a la vez; la
+        # versión se vuelve a leer ya con el bloqueo tomado.
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if version <= version_actual(conn):
+                conn.rollback()
+                continue
+            modulo.upgrade(conn)
+            conn.execute('INSERT INTO schema_version (version, nombre) VALUES (?, ?)', (version, nombre))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        aplicadas.append((version, nombre))
+    return aplicadas
@@ -0,0 +1,113 @@
+import re
+from html import escape
+
+
+# --- Observaciones: paginación y búsqueda ---
+# Las páginas se recorren con un cursor (fecha, id) sobre el índice
+# idx_observaciones_fecha_id, de modo que cargar cualquier página cuesta lo
+# mismo sin importar cuántas observaciones haya. La búsqueda usa FTS5.
+
+POR_PAGINA = 20
+MAX_POR_PAGINA = 100
+
+# Marcadores privados para el snippet: se reemplazan por <mark> después de
+# escapar el HTML del texto capturado por el usuario.
+_INICIO, _FIN = '\ue000', '\ue001'
+
+
+class CursorInvalido(ValueError):
+    """El cursor de paginación no es válido."""
+
+
+def _cursor(fila):
+    return f"{fila['fecha']}_{fila['id']}"
+
+
+def _condicion_cursor(cursor, condiciones, params):
+    if not cursor:
+        return
+    try:
+        fecha, observacion_id = cursor.rsplit('_', 1)
+        params.extend([fecha, int(observacion_id)])
+    except ValueError:
+        raise CursorInvalido("Cursor de paginación inválido")
+    condiciones.append('(o.fecha, o.id) < (?, ?)')
+
+
+def _limite(limite):
+    return max(1, min(int(limite or POR_PAGINA), MAX_POR_PAGINA))
+
+
+def _paginar(filas, limite):
+    siguiente = _cursor(filas[limite - 1]) if len(filas) > limite else None
+    return filas[:limite], siguiente
+
+
+def pagina(conn, cursor=None, limite=POR_PAGINA):
+    """Devuelve (observaciones, siguiente_cursor), de la más reciente a la más antigua."""
+    condiciones, params = [], []
+    _condicion_cursor(cursor, condiciones, params)
+    limite = _limite(limite)
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+    filas = conn.execute(f'''
+        SELECT o.id, o.texto, o.fecha FROM observaciones o
+        {where}
+        ORDER BY o.fecha DESC, o.id DESC
+        LIMIT ?
+    ''', params + [limite + 1]).fetchall()
+    return _paginar(filas, limite)
+
+
+def consulta_fts(texto):
+    """Convierte lo que escribe el usuario en una consulta FTS5 segura.
+
+    Cada palabra se busca como término literal (entre comillas) y la última
+    como prefijo, para que la búsqueda funcione mientras se escribe.
+    """
+    palabras = re.findall(r'\w+', texto or '')
+    if not palabras:
+        return None
+    terminos = [f'"{p}"' for p in palabras]
+    terminos[-1] += '*'
+    return ' '.join(terminos)
+
+
+def buscar(conn, texto, cursor=None, limite=POR_PAGINA):
+    """Busca en el texto de las observaciones. Devuelve (resultados, siguiente_cursor).
+
+    Los resultados van del más reciente al más antiguo por id (el orden de
+    captura); el cursor es el último id devuelto. Así FTS5 recorre su índice
+    en orden de rowid y se detiene al llenar la página, en lugar de ordenar
+    todas las coincidencias.
+    """
+    consulta = consulta_fts(texto)
+    if consulta is None:
+        return [], None
+    condiciones, params = ['observaciones_fts MATCH ?'], [consulta]
+    if cursor:
+        try:
+            params.append(int(cursor))
+        except ValueError:
+            raise CursorInvalido("Cursor de búsqueda inválido")
+        condiciones.append('observaciones_fts.rowid < ?')
+    limite = _limite(limite)
+    filas = conn.execute(f'''
+        SELECT o.id, o.fecha, f.fragmento
+        FROM (
+            SELECT rowid,
+                   snippet(observaciones_fts, 0, '{_INICIO}', '{_FIN}', '…', 16) AS fragmento
+            FROM observaciones_fts
+            WHERE {' AND '.join(condiciones)}
+            ORDER BY rowid DESC
+            LIMIT ?
+        ) f
+        JOIN observaciones o ON o.id = f.rowid
+        ORDER BY o.id DESC
+    ''', params + [limite + 1]).fetchall()
+    siguiente = str(filas[limite - 1]['id']) if len(filas) > limite else None
+    resultados = [{
+        'id': fila['id'],
+        'fecha': fila['fecha'],
+        'fragmento': escape(fila['fragmento']).replace(_INICIO, '<mark>').replace(_FIN, '</mark>'),
+    } for fila in filas[:limite]]
+    return resultados, siguiente
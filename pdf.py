@@ -0,0 +1,79 @@
+import zlib
+
+
+# --- Escritor de PDF mínimo en Python puro ---
+# Sólo lo necesario para reportes tabulares: texto con Helvetica (normal y
+# negrita, codificación WinAnsi para acentos), líneas, rectángulos y varias
+# páginas. Las coordenadas están en puntos con origen abajo a la izquierda.
+
+A4 = (595, 842)
+
+
+def _escapar(texto):
+    datos = str(texto).encode('cp1252', errors='replace')
+    return datos.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def _color(rgb):
+    return ' '.join(f'{c:.3f}' for c in rgb).encode()
+
+
+class DocumentoPDF:
+    def __init__(self, tamano=A4):
+        self.ancho, self.alto = tamano
+        self._paginas = []
+
+    def nueva_pagina(self):
+        self._paginas.append([])
+
+    def _emitir(self, operaciones):
+        if not self._paginas:
+            self.nueva_pagina()
+        self._paginas[-1].append(operaciones)
+
+    def texto(self, x, y, texto, tamano=10, negrita=False, color=(0, 0, 0)):
+        fuente = b'/F2' if negrita else b'/F1'
+        self._emitir(b'%s rg BT %s %d Tf %.2f %.2f Td (%s) Tj ET' % (
+            _color(color), fuente, tamano, x, y, _escapar(texto)))
+
+    def linea(self, x1, y1, x2, y2, grosor=0.5, color=(0.6, 0.6, 0.6)):
+        self._emitir(b'%s RG %.2f w %.2f %.2f m %.2f %.2f l S' % (
+            _color(color), grosor, x1, y1, x2, y2))
+
+    def rectangulo(self, x, y, ancho, alto, relleno=(0.95, 0.95, 0.95)):
+        self._emitir(b'%s rg %.2f %.2f %.2f %.2f re f' % (_color(relleno), x, y, ancho, alto))
+
+    def bytes(self):
+        if not self._paginas:
+            self.nueva_pagina()
+        objetos = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            None,  # árbol de páginas, se completa al final
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+        ]
+        paginas = []
+        for operaciones in self._paginas:
+            contenido = zlib.compress(b'\n'.join(operaciones))
+            objetos.append(b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (
+                len(contenido), contenido))
+            objetos.append(
+                b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+                b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>' % (
+                    self.ancho, self.alto, len(objetos)))
+            paginas.append(len(objetos))
+        objetos[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % n for n in paginas), len(paginas))
+
+        salida = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        posiciones = []
+        for numero, objeto in enumerate(objetos, start=1):
+            posiciones.append(len(salida))
+            salida += b'%d 0 obj\n%s\nendobj\n' % (numero, objeto)
+        inicio_xref = len(salida)
+        salida += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objetos) + 1)
+        for posicion in posiciones:
+            salida += b'%010d 00000 n \n' % posicion
+        salida += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+            len(objetos) + 1, inicio_xref)
+        return bytes(salida)
@@ -0,0 +1,148 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pdf import DocumentoPDF
+
+
+# --- PDF de pase de lista ---
+# Cambiar VERSION_FORMATO invalida todos los PDF en caché cuando cambia el diseño.
+VERSION_FORMATO = 1
+
+VERDE = (0.1, 0.5, 0.1)
+ROJO = (0.75, 0.1, 0.1)
+COLUMNAS = ((50, '#'), (80, 'Matrícula'), (170, 'Nombre'), (460, 'Asistencia'))
+ALTO_FILA = 18
+
+
+def datos_asistencia(conn, asistencia_id):
+    cabecera = conn.execute('''
+        SELECT a.id, a.fecha, g.nombre AS grupo, c.nombre AS carrera
+        FROM asistencias a
+        JOIN grupos g ON g.id = a.grupo_id
+        JOIN carreras c ON c.id = g.carrera_id
+        WHERE a.id = ?
+    ''', (asistencia_id,)).fetchone()
+    if cabecera is None:
+        return None
+    alumnos = conn.execute('''
+        SELECT al.matricula, al.apellidos || ' ' || al.nombre AS nombre, d.presente
+        FROM detalle_asistencias d
+        JOIN alumnos al ON al.id = d.alumno_id
+        WHERE d.asistencia_id = ?
+        ORDER BY al.apellidos, al.nombre
+    ''', (asistencia_id,)).fetchall()
+    presentes = sum(1 for a in alumnos if a['presente'])
+    return {
+        **dict(cabecera),
+        'alumnos': [dict(a) for a in alumnos],
+        'presentes': presentes,
+        'total': len(alumnos),
+        'porcentaje': round(100 * presentes / len(alumnos)) if alumnos else 0,
+    }
+
+
+def huella(datos):
+    contenido = json.dumps([VERSION_FORMATO, datos], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:32]
+
+
+def dibujar(datos):
+    doc = DocumentoPDF()
+    ancho, alto = doc.ancho, doc.alto
+
+    def encabezado_tabla(y):
+        doc.rectangulo(45, y - 5, ancho - 90, ALTO_FILA)
+        for x, titulo in COLUMNAS:
+            doc.texto(x, y, titulo, 10, negrita=True)
+        return y - ALTO_FILA
+
+    doc.nueva_pagina()
+    doc.texto(ancho / 2 - 95, alto - 60, 'Reporte de Asistencia', 18, negrita=True, color=(0.17, 0.24, 0.31))
+    y = alto - 100
+    for etiqueta in ('carrera', 'grupo', 'fecha'):
+        doc.texto(50, y, f'{etiqueta.capitalize()}:', 11, negrita=True)
+        doc.texto(110, y, datos[etiqueta], 11)
+        y -= 16
+    y = encabezado_tabla(y - 14)
+
+    for numero, alumno in enumerate(datos['alumnos'], start=1):
+        if y < 70:
+            doc.nueva_pagina()
+            y = encabezado_tabla(alto - 60)
+        presente = bool(alumno['presente'])
+        doc.texto(50, y, numero)
+        doc.texto(80, y, alumno['matricula'])
+        doc.texto(170, y, alumno['nombre'][:50])
+        doc.texto(460, y, 'Presente' if presente else 'Ausente', color=VERDE if presente else ROJO)
+        doc.linea(45, y - 5, ancho - 45, y - 5)
+        y -= ALTO_FILA
+
+    if y < 70:
+        doc.nueva_pagina()
+        y = alto - 60
+    doc.texto(50, y - 14, f"Resumen: {datos['presentes']} presentes de {datos['total']} "
+                          f"({datos['porcentaje']}%)", 11, negrita=True)
+    return doc.bytes()
+
+
+class GeneradorPDF:
+    """Genera los PDF en un pool de hilos y los guarda en caché en disco.
+
+    Cada archivo se nombra ``asistencia_<id>_<huella>.pdf``: si los datos del
+    pase de lista cambian, la huella cambia y el PDF anterior se descarta.
+    Los ids se repiten entre campus, así que cada campus distinto del
+    principal usa su propia subcarpeta. Las peticiones simultáneas por el
+    mismo PDF comparten un único trabajo.
+    """
+
+    def __init__(self, carpeta, trabajadores=2):
+        self.carpeta = carpeta
+        os.makedirs(carpeta, exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=trabajadores, thread_name_prefix='pdf')
+        self._lock = threading.Lock()
+        self._en_curso = {}
+
+    def ruta(self, asistencia_id, clave, campus=None):
+        carpeta = os.path.join(self.carpeta, 'campus', campus) if campus else self.carpeta
+        return os.path.join(carpeta, f'asistencia_{asistencia_id}_{clave}.pdf')
+
+    def solicitar(self, asistencia_id, datos, clave, campus=None):
+        """Devuelve un Future con la ruta del PDF (ya resuelto si está en caché)."""
+        ruta = self.ruta(asistencia_id, clave, campus)
+        with self._lock:
+            futuro = self._en_curso.get(ruta)
+            nuevo = futuro is None
+            if nuevo:
+                futuro = self._pool.submit(self._generar, asistencia_id, datos, ruta, campus)
+                self._en_curso[ruta] = futuro
+        # Fuera del lock: si el futuro ya terminó, el callback corre aquí mismo
+        # y _terminar vuelve a tomar el lock
+        if nuevo:
+            futuro.add_done_callback(lambda terminado: self._terminar(ruta, terminado))
+        return futuro
+
+    def _terminar(self, ruta, futuro):
+        with self._lock:
+            if self._en_curso.get(ruta) is futuro:
+                del self._en_curso[ruta]
+
+    def _generar(self, asistencia_id, datos, ruta, campus=None):
+        if os.path.exists(ruta):
+            return ruta
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        # pid e hilo: varios workers pueden generar el mismo PDF a la vez
+        temporal = f'{ruta}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporal, 'wb') as f:
+            f.write(dibujar(datos))
+        os.replace(temporal, ruta)
+        for anterior in glob.glob(self.ruta(asistencia_id, '*', campus)):
+            if anterior != ruta:
+                try:
+                    os.remove(anterior)
+                except OSError:
+                    pass
+        return ruta
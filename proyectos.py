@@ -0,0 +1,268 @@
+import re
+from datetime import date
+from functools import lru_cache
+
+
+# --- Proyectos del invernadero ---
+# avance (0-100) e inversion (pesos) son columnas REAL para poder agregarlas
+# en SQL. Cada cambio queda en proyecto_historial mediante un trigger, así
+# que cualquier escritura sobre proyectos (no sólo la de esta API) se registra
+# (ver migraciones/0005_proyectos_numericos.py).
+
+ESTADOS = ('Sin iniciar', 'En progreso', 'Completado')
+
+RESUMEN = '''
+    SELECT COUNT(*) AS total,
+           ROUND(COALESCE(AVG(avance), 0), 2) AS avance_promedio,
+           COALESCE(SUM(inversion), 0) AS inversion_total,
+           SUM(estado = 'Completado') AS completados,
+           SUM(estado = 'En progreso') AS en_progreso,
+           SUM(estado IS NULL OR estado NOT IN ('Completado', 'En progreso')) AS sin_iniciar,
+           MAX(ultima_actualizacion) AS ultima_actualizacion
+    FROM proyectos
+'''
+
+
+class ProyectoInvalido(ValueError):
+    """Los datos de actualización del proyecto no son válidos."""
+
+
+class ConflictoVersion(Exception):
+    """Otro usuario modificó los proyectos desde que se leyeron.
+
+    ``conflictos`` es una lista de {id, version_actual}.
+    """
+
+    def __init__(self, conflictos):
+        super().__init__("Los proyectos fueron modificados por otro usuario")
+        self.conflictos = conflictos
+
+
+class ProyectoNoEncontrado(LookupError):
+    """Algún proyecto del cambio no existe; ``ids`` son los que faltan."""
+
+    def __init__(self, ids):
+        super().__init__("Proyecto no encontrado")
+        self.ids = ids
+
+
+# Entero agrupado de a tres con un mismo separador: 1.200, 12,500, 1.200.000
+MILES = {sep: re.compile(rf'^-?[1-9]\d{{0,2}}(\{sep}\d{{3}})+$') for sep in ',.'}
+
+
+def a_numero(valor):
+    """Convierte '45%', '$12,500.00', '1.200' o '1.200,50' a float. '' y None dan None."""
+    if valor is None or isinstance(valor, bool):
+        return None
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    texto = re.sub(r'[^\d.,-]', '', str(valor))
+    if not texto:
+        return None
+    # Con los dos separadores, el que aparece al final es el decimal. Con uno
+    # solo (coma o punto, igual para ambos) se toma como separador de miles
+    # si agrupa el entero de a tres dígitos; si no, es el decimal.
+    if ',' in texto and '.' in texto:
+        if texto.rfind(',') > texto.rfind('.'):
+            texto = texto.replace('.', '').replace(',', '.')
+        else:
+            texto = texto.replace(',', '')
+    else:
+        for separador in ',.':
+            if separador in texto:
+                if MILES[separador].match(texto):
+                    texto = texto.replace(separador, '')
+                else:
+                    texto = texto.replace(separador, '.')
+    return float(texto)
+
+
+def _texto(valor):
+    valor = None if valor is None else str(valor).strip()
+    return valor or None
+
+
+def _avance(valor):
+    # La columna es NOT NULL: un avance vacío es un error, no un 0 silencioso
+    avance = a_numero(valor)
+    if avance is None:
+        raise ValueError("debe ser un número entre 0 y 100")
+    if not 0 <= avance <= 100:
+        raise ValueError("debe estar entre 0 y 100")
+    return avance
+
+
+def _inversion(valor):
+    inversion = a_numero(valor)
+    if inversion is not None and inversion < 0:
+        raise ValueError("no puede ser negativa")
+    return inversion
+
+
+def _estado(valor):
+    if valor not in ESTADOS:
+        raise ValueError(f"debe ser uno de: {', '.join(ESTADOS)}")
+    return valor
+
+
+def _nombre(valor):
+    nombre = _texto(valor)
+    if not nombre:
+        raise ValueError("no puede estar vacío")
+    return nombre
+
+
+def _fecha(valor):
+    valor = _texto(valor)
+    return date.fromisoformat(valor).isoformat() if valor else None
+
+
+# Columnas que la API puede modificar y cómo se valida cada una
+CAMPOS = {
+    'nombre': _nombre,
+    'descripcion': _texto,
+    'estado': _estado,
+    'responsable': _texto,
+    'fecha_inicio': _fecha,
+    'avance': _avance,
+    'inversion': _inversion,
+    'recursos': _texto,
+}
+
+
+def normalizar_cambios(datos):
+    """Valida el JSON recibido y devuelve {columna: valor} sólo con columnas permitidas."""
+    if not isinstance(datos, dict) or not datos:
+        raise ProyectoInvalido("Datos no proporcionados")
+    desconocidos = sorted(set(datos) - set(CAMPOS))
+    if desconocidos:
+        raise ProyectoInvalido(f"Campos no permitidos: {', '.join(desconocidos)}")
+    cambios = {}
+    for campo, valor in datos.items():
+        try:
+            cambios[campo] = CAMPOS[campo](valor)
+        except (TypeError, ValueError) as e:
+            raise ProyectoInvalido(f"{campo}: {e}")
+    return cambios
+
+
+def normalizar_version(valor):
+    if valor is None:
+        return None
+    if isinstance(valor, bool) or not isinstance(valor, (int, str)):
+        raise ProyectoInvalido("version debe ser un entero")
+    try:
+        return int(valor)
+    except ValueError:
+        raise ProyectoInvalido("version debe ser un entero")
+
+
+def normalizar_lote(datos, max_proyectos=100):
+    """Valida un lote {"proyectos": [{"id", "version", ...campos}]}.
+
+    Devuelve [(proyecto_id, version, cambios)]. En los lotes la versión es
+    obligatoria: sin ella no hay forma de detectar ediciones concurrentes.
+    """
+    items = datos.get('proyectos') if isinstance(datos, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ProyectoInvalido("La lista de proyectos está vacía")
+    if len(items) > max_proyectos:
+        raise ProyectoInvalido(f"Máximo {max_proyectos} proyectos por lote")
+    lote, vistos = [], set()
+    for posicion, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ProyectoInvalido(f"proyectos[{posicion}] debe ser un objeto")
+        item = dict(item)
+        try:
+            proyecto_id = int(item.pop('id'))
+        except (KeyError, TypeError, ValueError):
+            raise ProyectoInvalido(f"proyectos[{posicion}] requiere un id numérico")
+        if proyecto_id in vistos:
+            raise ProyectoInvalido(f"El proyecto {proyecto_id} aparece más de una vez")
+        vistos.add(proyecto_id)
+        version = normalizar_version(item.pop('version', None))
+        if version is None:
+            raise ProyectoInvalido(f"proyectos[{posicion}] requiere version")
+        try:
+            cambios = normalizar_cambios(item)
+        except ProyectoInvalido as e:
+            raise ProyectoInvalido(f"proyecto {proyecto_id}: {e}")
+        lote.append((proyecto_id, version, cambios))
+    return lote
+
+
+@lru_cache(maxsize=64)
+def sentencia_update(columnas, con_version):
+    """SQL del UPDATE para un conjunto de columnas ya validadas contra CAMPOS.
+
+    Se construye una sola vez por combinación de columnas; como el texto es
+    idéntico, sqlite3 reutiliza además la sentencia preparada de su caché.
+    Parámetros: los valores en el orden de ``columnas``, el id y la versión.
+    La versión y la fecha sólo avanzan si algún valor cambia de verdad: las
+    expresiones del SET ven la fila anterior, así que se comparan con ?N.
+    """
+    asignaciones = ', '.join(f'{columna} = ?{i}' for i, columna in enumerate(columnas, 1))
+    cambia = ' OR '.join(f'{columna} IS NOT ?{i}' for i, columna in enumerate(columnas, 1))
+    sql = (f'UPDATE proyectos SET {asignaciones}, version = version + ({cambia}), '
+           f'ultima_actualizacion = CASE WHEN {cambia} THEN CURRENT_TIMESTAMP ELSE ultima_actualizacion END '
+           f'WHERE id = ?{len(columnas) + 1}')
+    return sql + f' AND version = ?{len(columnas) + 2}' if con_version else sql
+
+
+def actualizar_lote(conn, lote):
+    """Aplica [(proyecto_id, version, cambios)] en una sola transacción.
+
+    Con version=None el cambio es incondicional. Si algún proyecto no existe
+    (ProyectoNoEncontrado) o cambió de versión (ConflictoVersion) no se
+    aplica nada. Devuelve {proyecto_id: nueva_version}; un cambio que deja
+    los mismos valores no avanza la versión.
+    """
+    grupos = {}
+    for proyecto_id, version, cambios in lote:
+        columnas = tuple(sorted(cambios))
+        fila = [cambios[columna] for columna in columnas] + [proyecto_id]
+        if version is not None:
+            fila.append(version)
+        grupos.setdefault((columnas, version is not None), []).append(fila)
+
+    ids = [proyecto_id for proyecto_id, _, _ in lote]
+    marcadores = ', '.join('?' * len(ids))
+    try:
+        with conn:
+            aplicados = sum(conn.executemany(sentencia_update(*clave), filas).rowcount
+                            for clave, filas in grupos.items())
+            if aplicados != len(lote):
+                raise ConflictoVersion([])
+            return dict(conn.execute(
+                f'SELECT id, version FROM proyectos WHERE id IN ({marcadores})', ids).fetchall())
+    except ConflictoVersion:
+        # Tras el rollback las versiones actuales indican qué proyectos fallaron
+        actuales = dict(conn.execute(
+            f'SELECT id, version FROM proyectos WHERE id IN ({marcadores})', ids).fetchall())
+        faltantes = [proyecto_id for proyecto_id in ids if proyecto_id not in actuales]
+        if faltantes:
+            raise ProyectoNoEncontrado(faltantes) from None
+        raise ConflictoVersion([
+            {'id': proyecto_id, 'version_actual': actuales[proyecto_id]}
+            for proyecto_id, version, _ in lote
+            if version is not None and actuales[proyecto_id] != version
+        ])
+
+
+def actualizar(conn, proyecto_id, cambios, version=None):
+    """Aplica cambios ya normalizados a un proyecto y devuelve su nueva versión."""
+    return actualizar_lote(conn, [(proyecto_id, version, cambios)])[proyecto_id]
+
+
+def resumen(conn):
+    return dict(conn.execute(RESUMEN).fetchone())
+
+
+def historial(conn, proyecto_id, desde=None):
+    """Serie de (fecha, estado, avance, inversion) del proyecto, de la más antigua a la más reciente."""
+    sql = 'SELECT fecha, estado, avance, inversion FROM proyecto_historial WHERE proyecto_id = ?'
+    params = [proyecto_id]
+    if desde:
+        sql += ' AND fecha >= ?'
+        params.append(desde)
+    return [dict(fila) for fila in conn.execute(sql + ' ORDER BY fecha, id', params)]
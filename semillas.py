@@ -0,0 +1,75 @@
+from werkzeug.security import generate_password_hash
+
+
+# --- Datos iniciales ---
+CARRERAS = [
+    ('Ingeniería en Software', 'IS'),
+    ('Ingeniería en Manufactura', 'ITM'),
+    ('Ingeniería Mecánica A', 'IMA')
+]
+
+GRUPOS = [
+    ('IS', '1925° IS - INGENIERÍA DE SOFTWARE', 'IS-1925'),
+    ('IS', '2925° IS - INGENIERÍA DE SOFTWARE', 'IS-2925'),
+    ('IS', '3925° IS - INGENIERÍA DE SOFTWARE', 'IS-3925'),
+    ('ITM', '1625° ITM - Ingeniería en Manufactura', 'ITM-1625'),
+    ('ITM', '1325° ITM - Ingeniería en Manufactura', 'ITM-1325'),
+    ('ITM', '2326° ITM - Ingeniería en Manufactura', 'ITM-2326'),
+    ('IMA', '1925° IMA - Ingeniería Mecánica A', 'IMA-1925'),
+    ('IMA', '2325° IMA - Ingeniería Mecánica A', 'IMA-2325'),
+    ('IMA', '3325° IMA - Ingeniería Mecánica A', 'IMA-3325')
+]
+
+ALUMNOS_EJEMPLO = [
+    ('IS-1925', 'A12345', 'Pérez', 'Juan'),
+    ('IS-1925', 'A54321', 'García', 'María')
+]
+
+PROYECTOS_BASE = [
+    (1, 'Bomba/Sistema de Riego', 'Sistema de riego automatizado para el invernadero'),
+    (2, 'Hidroponía', 'Cultivo de plantas usando soluciones minerales en lugar de suelo agrícola'),
+    (3, 'Composta', 'Producción de abono orgánico'),
+    (4, 'Germinación', 'Proceso de desarrollo de plantas a partir de semillas'),
+    (5, 'Iluminación', 'Sistema de iluminación para el invernadero'),
+    (6, 'Hotel de Insectos', 'Estructura para albergar insectos beneficiosos'),
+    (7, 'Producto Pomada', 'Elaboración de pomadas con plantas medicinales'),
+    (8, 'Eólico', 'Sistema de energía eólica para el invernadero'),
+    (9, 'Mantenimiento', 'Mantenimiento general del invernadero')
+]
+
+ADMIN_USUARIO = 'ADMIN'
+ADMIN_PASSWORD = 'Admin123!'
+
+
+def sembrar_catalogo(conn, ejemplos=True):
+    """Carreras y grupos base (y los alumnos de ejemplo). Es idempotente.
+
+    ``sembrar`` lo aplica a la base principal; un campus sólo lo recibe si se
+    pide con ``flask db seed --campus``.
+    """
+    with conn:
+        conn.executemany('INSERT OR IGNORE INTO carreras (nombre, codigo) VALUES (?, ?)', CARRERAS)
+        conn.executemany('''
+            INSERT OR IGNORE INTO grupos (carrera_id, nombre, codigo)
+            SELECT id, ?, ? FROM carreras WHERE codigo = ?
+        ''', [(nombre, codigo, carrera) for carrera, nombre, codigo in GRUPOS])
+        if ejemplos:
+            conn.executemany('''
+                INSERT OR IGNORE INTO alumnos (grupo_id, matricula, apellidos, nombre)
+                SELECT id, ?, ?, ? FROM grupos WHERE codigo = ?
+            ''', [(matricula, apellidos, nombre, grupo) for grupo, matricula, apellidos, nombre in ALUMNOS_EJEMPLO])
+
+
+def sembrar(conn):
+    """Inserta los datos iniciales que falten en la base principal. Es idempotente."""
+    sembrar_catalogo(conn)
+    with conn:
+        # El hash de la contraseña es deliberadamente lento: sólo se calcula
+        # si el administrador por defecto todavía no existe.
+        if not conn.execute('SELECT 1 FROM admin WHERE username = ?', (ADMIN_USUARIO,)).fetchone():
+            conn.execute('INSERT INTO admin (username, password) VALUES (?, ?)',
+                         (ADMIN_USUARIO, generate_password_hash(ADMIN_PASSWORD)))
+
+        if conn.execute('SELECT COUNT(*) FROM proyectos').fetchone()[0] == 0:
+            conn.executemany('INSERT INTO proyectos (id, nombre, descripcion) VALUES (?, ?, ?)',
+                             PROYECTOS_BASE)
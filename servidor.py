@@ -0,0 +1,304 @@
+"""Servidor de producción.
+
+Migra la base una sola vez y arranca N procesos worker (pre-fork) que
+comparten el socket de escucha, cada uno con M hilos. Con gunicorn instalado
+se usa gunicorn (worker gthread); si no, un pre-fork propio sobre el servidor
+WSGI de werkzeug.
+
+Antes de crear los workers se migra la base y se comprimen los estáticos, una
+sola vez.
+
+SIGTERM o Ctrl+C inician un apagado ordenado: /ready pasa a 503, los workers
+dejan de aceptar conexiones, terminan las peticiones en curso y salen; los que
+sigan vivos después de --gracia segundos se matan. Con gunicorn los hooks de
+apagado de cada worker marcan la app igual que el pre-fork propio.
+
+Uso: python servidor.py [--bind 0.0.0.0:8000] [--workers 4] [--hilos 8] [--gracia 30]
+                        [--motor auto|gunicorn|werkzeug] [--proxies 1]
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from campus import PRINCIPAL
+from db import DEFAULT_DATABASE, ConnectionPool, get_pool
+from estaticos import Estaticos
+import migraciones
+from semillas import sembrar
+from trabajos_reporte import cerrar_interrumpidos
+
+logger = logging.getLogger('sgp.servidor')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Hilos de fondo que también toman conexiones del pool principal: la cola de
+# reportes (2 trabajadores, ver create_app), el reconciliador y la carga
+# anticipada de la analítica de asistencia
+HILOS_FONDO = 4
+
+# Hilos de cada worker que /api/eventos nunca ocupa: cada conexión SSE retiene
+# un hilo mientras está abierta y sin esta reserva unos pocos paneles abiertos
+# bastan para que el worker deje de atender peticiones normales
+HILOS_LIBRES = 2
+
+
+def rutas_entorno():
+    # Las mismas variables que lee create_app(), sin crear la app en el padre
+    return {
+        PRINCIPAL: os.environ.get('FLASK_DATABASE', DEFAULT_DATABASE),
+        **json.loads(os.environ.get('FLASK_DB_CAMPUS') or '{}'),
+    }
+
+
+def preparar_base(rutas=None):
+    """Migraciones y semillas de cada campus, en el proceso principal antes de crear los workers."""
+    for campus, ruta in (rutas or rutas_entorno()).items():
+        pool = ConnectionPool(ruta, size=1)
+        try:
+            with pool.connection() as conn:
+                aplicadas = migraciones.aplicar(conn)
+                # Administradores y proyectos sólo viven en el principal
+                if campus == PRINCIPAL:
+                    sembrar(conn)
+                    interrumpidos = cerrar_interrumpidos(conn)
+                    if interrumpidos:
+                        logger.warning("%d trabajos de reporte interrumpidos marcados como error",
+                                       interrumpidos)
+        finally:
+            pool.close_all()
+        for version, nombre in aplicadas:
+            logger.info("Migración aplicada en %s: %04d_%s", campus, version, nombre)
+
+
+def comprimir_estaticos():
+    """Variantes gzip/brotli de static/css y static/js, una vez antes de crear los workers."""
+    estaticos = Estaticos(
+        os.environ.get('FLASK_ESTATICOS_FOLDER', os.path.join(BASE_DIR, 'static')),
+        os.environ.get('FLASK_ESTATICOS_COMPRIMIDOS_FOLDER', os.path.join(BASE_DIR, 'cache', 'estaticos')),
+    )
+    escritas = estaticos.comprimir()
+    if escritas:
+        logger.info("Estáticos comprimidos: %d archivos", escritas)
+
+
+def configurar_worker(indice, hilos):
+    # Una conexión por hilo de peticiones más las de los hilos de fondo; el
+    # reconciliador de reportes sólo corre en el primer worker
+    os.environ['FLASK_DB_POOL_SIZE'] = str(hilos + HILOS_FONDO)
+    # Con --hilos 2 o menos no quedan hilos para SSE: /api/eventos responde 503
+    # y los navegadores siguen con la recarga manual
+    os.environ['FLASK_EVENTOS_MAX_CLIENTES'] = str(max(hilos - HILOS_LIBRES, 0))
+    if indice > 0:
+        os.environ['FLASK_RECONCILIAR_INTERVALO'] = '0'
+
+
+# --- Pre-fork con werkzeug ---
+
+def _worker(escucha, indice, hilos):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    configurar_worker(indice, hilos)
+    from werkzeug.serving import make_server
+
+    from app import app, precalentar_analisis
+
+    # La matriz de alertas se carga ya dentro del worker, no en la primera petición
+    precalentar_analisis(app)
+    host, puerto = escucha.getsockname()[:2]
+    servidor = make_server(host, puerto, app, threaded=True, fd=escucha.fileno())
+    # Hilos no daemon: server_close() espera a las peticiones en curso
+    servidor.daemon_threads = False
+    servidor.block_on_close = True
+
+    def terminar(signum, frame):
+        app.extensions['apagado'].set()
+        # shutdown() bloquea hasta que serve_forever termina: va en otro hilo
+        threading.Thread(target=servidor.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, terminar)
+    logger.info("Worker %d (pid %d) atendiendo con %d hilos", indice, os.getpid(), hilos)
+    servidor.serve_forever()
+    servidor.server_close()
+    app.extensions['reconciliador_reportes'].detener()
+    app.extensions['campus'].close_all()
+    get_pool(app).close_all()
+    logger.info("Worker %d (pid %d) terminado", indice, os.getpid())
+
+
+def _iniciar_worker(escucha, indice, hilos):
+    pid = os.fork()
+    if pid == 0:
+        codigo = 0
+        try:
+            _worker(escucha, indice, hilos)
+        except BaseException:
+            logger.exception("Worker %d falló", indice)
+            codigo = 1
+        finally:
+            logging.shutdown()
+            os._exit(codigo)
+    return pid
+
+
+def servir_werkzeug(host, puerto, workers, hilos, gracia):
+    escucha = socket.create_server((host, puerto), backlog=2048)
+    escucha.set_inheritable(True)
+    logger.info("Escuchando en http://%s:%d con %d workers", host, escucha.getsockname()[1], workers)
+
+    apagando = threading.Event()
+
+    def detener(signum, frame):
+        apagando.set()
+
+    signal.signal(signal.SIGTERM, detener)
+    signal.signal(signal.SIGINT, detener)
+
+    activos = {_iniciar_worker(escucha, i, hilos): i for i in range(workers)}
+    while not apagando.is_set():
+        try:
+            pid, estado = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            indice = activos.pop(pid)
+            # Un worker que muere fuera del apagado se reemplaza
+            if not apagando.is_set():
+                logger.warning("Worker %d (pid %d) terminó con estado %d; se reinicia", indice, pid, estado)
+                time.sleep(1)
+                activos[_iniciar_worker(escucha, indice, hilos)] = indice
+            continue
+        apagando.wait(0.5)
+
+    logger.info("Apagando: esperando a %d workers hasta %d s", len(activos), gracia)
+    for pid in activos:
+        _senal(pid, signal.SIGTERM)
+    escucha.close()
+    limite = time.monotonic() + gracia
+    while activos and time.monotonic() < limite:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            activos.pop(pid, None)
+        else:
+            time.sleep(0.1)
+    for pid in activos:
+        logger.warning("Worker pid %d no terminó a tiempo; se mata", pid)
+        _senal(pid, signal.SIGKILL)
+
+
+def _senal(pid, numero):
+    try:
+        os.kill(pid, numero)
+    except ProcessLookupError:
+        pass
+
+
+# --- gunicorn ---
+
+def servir_gunicorn(host, puerto, workers, hilos, gracia, registro_accesos=False):
+    from gunicorn.app.base import BaseApplication
+
+    from app import precalentar_analisis
+
+    def post_fork(server, worker):
+        # age cuenta los workers creados: el reconciliador queda en el primero
+        # (si ese worker se reinicia, `flask reportes reconciliar` sigue disponible)
+        configurar_worker(0 if worker.age == 1 else worker.age, hilos)
+
+    def post_worker_init(worker):
+        # gunicorn instala sus señales antes de este hook: SIGTERM (apagado
+        # ordenado) marca la app antes de que el worker deje de aceptar, así
+        # /ready responde 503 y los flujos de /api/eventos terminan
+        app = worker.wsgi
+        manejador = signal.getsignal(signal.SIGTERM)
+
+        def terminar(signum, frame):
+            app.extensions['apagado'].set()
+            manejador(signum, frame)
+
+        signal.signal(signal.SIGTERM, terminar)
+        # La matriz de alertas se carga ya dentro del worker, no en la primera petición
+        precalentar_analisis(app)
+
+    def worker_int(worker):
+        # SIGINT/SIGQUIT: apagado rápido
+        if worker.wsgi is not None:
+            worker.wsgi.extensions['apagado'].set()
+
+    def worker_exit(server, worker):
+        app = worker.wsgi
+        if app is None:  # el worker falló al cargar la app
+            return
+        app.extensions['apagado'].set()
+        app.extensions['reconciliador_reportes'].detener()
+        app.extensions['campus'].close_all()
+        get_pool(app).close_all()
+
+    class Aplicacion(BaseApplication):
+        def load_config(self):
+            for clave, valor in {
+                'bind': f'{host}:{puerto}',
+                'workers': workers,
+                'threads': hilos,
+                'worker_class': 'gthread',
+                'graceful_timeout': gracia,
+                'post_fork': post_fork,
+                'post_worker_init': post_worker_init,
+                'worker_int': worker_int,
+                'worker_exit': worker_exit,
+                'accesslog': '-' if registro_accesos else None,
+            }.items():
+                self.cfg.set(clave, valor)
+
+        def load(self):
+            from app import app
+            return app
+
+    Aplicacion().run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bind', default=os.environ.get('SGP_BIND', '0.0.0.0:8000'))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SGP_WORKERS', os.cpu_count() or 2)))
+    parser.add_argument('--hilos', type=int, default=int(os.environ.get('SGP_HILOS', 8)))
+    parser.add_argument('--gracia', type=int, default=30, help='segundos para drenar antes de matar a los workers')
+    parser.add_argument('--motor', choices=('auto', 'gunicorn', 'werkzeug'), default='auto')
+    parser.add_argument('--registro-accesos', action='store_true', help='una línea de log por petición')
+    parser.add_argument('--proxies', type=int, default=os.environ.get('SGP_PROXIES'),
+                        help='proxies inversos de confianza delante del servidor (X-Forwarded-For)')
+    args = parser.parse_args()
+    if args.proxies is not None:
+        # Los workers lo leen como PROXIES_CONFIABLES (ver create_app)
+        os.environ['FLASK_PROXIES_CONFIABLES'] = str(args.proxies)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(process)d %(name)s %(levelname)s %(message)s')
+    if not args.registro_accesos:
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    host, _, puerto = args.bind.rpartition(':')
+    preparar_base()
+    comprimir_estaticos()
+
+    motor = args.motor
+    if motor == 'auto':
+        try:
+            import gunicorn  # noqa: F401
+            motor = 'gunicorn'
+        except ImportError:
+            motor = 'werkzeug'
+    if motor == 'gunicorn':
+        servir_gunicorn(host, int(puerto), args.workers, args.hilos, args.gracia, args.registro_accesos)
+    else:
+        servir_werkzeug(host, int(puerto), args.workers, args.hilos, args.gracia)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
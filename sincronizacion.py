@@ -0,0 +1,176 @@
+from datetime import date, datetime, timezone
+
+
+# --- Sincronización incremental de asistencias ---
+# Cada cambio de detalle_asistencias (alta o cambio de presente, venga de
+# donde venga) recibe un número de secuencia global mediante triggers. El
+# token de sincronización de un cliente es la última secuencia que vio, así
+# que pedir los cambios desde ese token es un recorrido por índice.
+#
+# Cada página de pase de lista recibe su token al renderizarse y lo guarda en
+# memoria: dos pestañas no comparten token, así ninguna se salta los cambios
+# que otra recibió. Sin token (el service worker, que sólo envía la cola) no
+# se devuelven cambios.
+#
+# Las marcas capturadas sin conexión llevan la hora del cliente (marcado_en);
+# si dos dispositivos marcan al mismo alumno gana la marca más reciente, y
+# reenviar una marca ya aplicada no cambia nada.
+#
+# Las columnas, la secuencia y los triggers los crea
+# migraciones/0008_sincronizacion_asistencias.py.
+
+MAX_CAMBIOS = 500
+MAX_DELTA = 1000
+
+# La marca sólo se aplica si es más reciente que la guardada
+UPSERT_MARCA = '''
+    INSERT INTO detalle_asistencias (asistencia_id, alumno_id, presente, marcado_en)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(asistencia_id, alumno_id) DO UPDATE
+    SET presente = excluded.presente, marcado_en = excluded.marcado_en
+    WHERE detalle_asistencias.marcado_en IS NULL OR excluded.marcado_en > detalle_asistencias.marcado_en
+'''
+
+
+class SincronizacionInvalida(ValueError):
+    """El lote de sincronización no es válido."""
+
+
+def _marca(valor, ahora):
+    # Un reloj del cliente adelantado no debe ganarle a marcas posteriores
+    # hechas en el servidor: las horas futuras se recortan a la actual.
+    momento = datetime.fromisoformat(str(valor).replace('Z', '+00:00'))
+    if momento.tzinfo is None:
+        momento = momento.replace(tzinfo=timezone.utc)
+    # Mismo formato que strftime('%Y-%m-%dT%H:%M:%fZ', 'now') de SQLite (milisegundos)
+    momento = min(momento.astimezone(timezone.utc), ahora)
+    return momento.strftime('%Y-%m-%dT%H:%M:%S.') + f'{momento.microsecond // 1000:03d}Z'
+
+
+def normalizar_lote(datos):
+    """Valida el JSON recibido y devuelve (token, grupo_id, [(grupo_id, fecha, alumno_id, presente, marcado_en)]).
+
+    token es None cuando el cliente sólo envía marcas (el service worker).
+    """
+    if not isinstance(datos, dict):
+        raise SincronizacionInvalida("Datos no proporcionados")
+    try:
+        token = int(datos['token']) if datos.get('token') is not None else None
+        grupo_id = int(datos['grupo_id']) if datos.get('grupo_id') is not None else None
+    except (TypeError, ValueError):
+        raise SincronizacionInvalida("token y grupo_id deben ser numéricos")
+
+    cambios = datos.get('cambios') or []
+    if not isinstance(cambios, list):
+        raise SincronizacionInvalida("cambios debe ser una lista")
+    if len(cambios) > MAX_CAMBIOS:
+        raise SincronizacionInvalida(f"Máximo {MAX_CAMBIOS} cambios por lote")
+
+    ahora = datetime.now(timezone.utc)
+    marcas = {}
+    try:
+        for cambio in cambios:
+            clave = (int(cambio['grupo_id']), date.fromisoformat(str(cambio['fecha'])).isoformat(),
+                     int(cambio['alumno_id']))
+            marcado_en = _marca(cambio['marcado_en'], ahora)
+            # Si el lote trae varias marcas del mismo alumno se queda la última
+            if clave not in marcas or marcado_en >= marcas[clave][1]:
+                marcas[clave] = (1 if cambio.get('presente') else 0, marcado_en)
+    except (KeyError, TypeError, ValueError, AttributeError):
+        raise SincronizacionInvalida(
+            "Cada cambio requiere grupo_id, fecha (AAAA-MM-DD), alumno_id y marcado_en (ISO 8601)")
+    return token, grupo_id, [clave + valor for clave, valor in marcas.items()]
+
+
+def aplicar(conn, cambios):
+    """Aplica las marcas en una transacción. Devuelve (aplicadas, rechazadas, cambiadas).
+
+    Se rechazan las marcas de alumnos que no pertenecen al grupo indicado.
+    cambiadas cuenta las marcas que de verdad cambiaron algo (alta o cambio
+    de presente): las que pierden contra una más reciente o repiten lo
+    guardado no cuentan. Cada una avanza la secuencia en uno, así que basta
+    la diferencia de secuencia dentro de la transacción de escritura.
+    """
+    grupos = {grupo_id for grupo_id, _, _, _, _ in cambios}
+    if not grupos:
+        return [], [], 0
+    marcadores = ', '.join('?' * len(grupos))
+    inscritos = {(fila[0], fila[1]) for fila in conn.execute(
+        f'SELECT grupo_id, id FROM alumnos WHERE grupo_id IN ({marcadores})', list(grupos))}
+    aplicadas = [c for c in cambios if (c[0], c[2]) in inscritos]
+    rechazadas = [c for c in cambios if (c[0], c[2]) not in inscritos]
+
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        antes = token_actual(conn)
+        sesiones = {}
+        for grupo_id, fecha, alumno_id, presente, marcado_en in aplicadas:
+            if (grupo_id, fecha) not in sesiones:
+                conn.execute('''
+                    INSERT INTO asistencias (grupo_id, fecha) VALUES (?, ?)
+                    ON CONFLICT(grupo_id, fecha) DO NOTHING
+                ''', (grupo_id, fecha))
+                sesiones[(grupo_id, fecha)] = conn.execute(
+                    'SELECT id FROM asistencias WHERE grupo_id = ? AND fecha = ?', (grupo_id, fecha)
+                ).fetchone()[0]
+        conn.executemany(UPSERT_MARCA, [
+            (sesiones[(grupo_id, fecha)], alumno_id, presente, marcado_en)
+            for grupo_id, fecha, alumno_id, presente, marcado_en in aplicadas
+        ])
+        cambiadas = token_actual(conn) - antes
+    return aplicadas, rechazadas, cambiadas
+
+
+def token_actual(conn):
+    """Última secuencia confirmada: el token de quien acaba de leer el estado completo."""
+    return conn.execute('SELECT valor FROM secuencia_asistencias WHERE id = 1').fetchone()[0]
+
+
+def cambios_desde(conn, token, grupo_id=None, limite=MAX_DELTA):
+    """Marcas cambiadas después del token. Devuelve (cambios, nuevo_token, hay_mas).
+
+    Sin token no hay cambios que enviar: el cliente no tiene un estado que
+    actualizar (las páginas reciben su token con la hoja, ver token_actual).
+    """
+    # El tope se lee antes que las filas: lo que se confirme después tendrá
+    # una secuencia mayor y llegará en la siguiente sincronización.
+    tope = token_actual(conn)
+    if token is None:
+        return [], tope, False
+    sql = '''
+        SELECT d.secuencia, a.grupo_id, a.fecha, d.alumno_id, d.presente, d.marcado_en
+        FROM detalle_asistencias d
+        JOIN asistencias a ON a.id = d.asistencia_id
+        WHERE d.secuencia > ? AND d.secuencia <= ?
+    '''
+    params = [token, tope]
+    if grupo_id is not None:
+        sql += ' AND a.grupo_id = ?'
+        params.append(grupo_id)
+    filas = conn.execute(sql + ' ORDER BY d.secuencia LIMIT ?', params + [limite + 1]).fetchall()
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+    nuevo_token = filas[-1]['secuencia'] if hay_mas else max(token, tope)
+    return [dict(fila) for fila in filas], nuevo_token, hay_mas
+
+
+def sincronizar(conn, token, grupo_id, cambios):
+    """Aplica las marcas del cliente y devuelve lo que cambió desde su token.
+
+    Las marcas que el propio cliente acaba de enviar no se le devuelven.
+    aceptados cuenta sólo las marcas que cambiaron algo (ver aplicar).
+    """
+    aplicadas, rechazadas, cambiadas = aplicar(conn, cambios)
+    delta, nuevo_token, hay_mas = cambios_desde(conn, token, grupo_id)
+    enviadas = {(g, f, a, p, m) for g, f, a, p, m in aplicadas}
+    return {
+        'token': nuevo_token,
+        'mas': hay_mas,
+        'aceptados': cambiadas,
+        'rechazados': [{'grupo_id': g, 'fecha': f, 'alumno_id': a} for g, f, a, _, _ in rechazadas],
+        'cambios': [
+            {k: c[k] for k in ('grupo_id', 'fecha', 'alumno_id', 'presente', 'marcado_en')}
+            for c in delta
+            if (c['grupo_id'], c['fecha'], c['alumno_id'], c['presente'], c['marcado_en']) not in enviadas
+        ],
+    }
@@ -1,10 +1,18 @@
+// Campus de la página (cabecera X-Campus en las consultas y ?campus= en los enlaces)
+const campus = document.querySelector('meta[name="campus"]').content;
+const cabecerasCampus = { 'X-Campus': campus };
+
+function urlLista(grupoId, fecha) {
+  return `/lista-asistencia?${new URLSearchParams({ grupo_id: grupoId, fecha, campus })}`;
+}
+
 document.addEventListener('DOMContentLoaded', async () => {
   try {
     // Configurar fecha actual
     document.getElementById('fecha').valueAsDate = new Date();
     
     // Cargar carreras desde la API
-    const response = await fetch('/api/carreras');
+    const response = await fetch('/api/carreras', { headers: cabecerasCampus });
     
     if (!response.ok) {
       throw new Error('Error al cargar carreras');
@@ -52,7 +60,7 @@ function renderizarCarreras(carreras) {
 
 async function cargarGrupos(carreraId, contenedor) {
   try {
-    const response = await fetch(`/api/carreras/${carreraId}/grupos`);
+    const response = await fetch(`/api/carreras/${carreraId}/grupos`, { headers: cabecerasCampus });
     
     if (!response.ok) {
       throw new Error('Error al cargar grupos');
@@ -71,7 +79,7 @@ async function cargarGrupos(carreraId, contenedor) {
       grupoElement.innerHTML = `
         <span class="grupo-nombre">${grupo.nombre}</span>
         <button class="grupo-action" 
-                onclick="window.location.href='/lista-asistencia?grupo_id=${grupo.id}&fecha=${document.getElementById('fecha').value}'">
+                onclick="window.location.href=urlLista(${grupo.id}, document.getElementById('fecha').value)">
           Tomar lista
         </button>
       `;
@@ -118,5 +126,5 @@ function tomarAsistencia(grupo_id) {  // Ahora recibe solo grupo_id
     alert("Por favor selecciona una fecha");
     return;
   }
-  window.location.href = `/lista-asistencia?grupo_id=${grupo_id}&fecha=${fecha}`;
+  window.location.href = urlLista(grupo_id, fecha);
 }
\ No newline at end of file
@@ -0,0 +1,106 @@
+// Cola local de marcas de asistencia en IndexedDB.
+// La usan la página de pase de lista y el service worker (sw.js), así que no
+// toca el DOM. Cada marca se guarda por campus, grupo, fecha y alumno: marcar
+// varias veces al mismo alumno sin conexión deja una sola marca pendiente.
+// Los ids de grupo y alumno son locales a cada campus, así que la marca lleva
+// su campus y se envía con la cabecera X-Campus aunque la sesión cambie de
+// campus antes de sincronizar (las marcas anteriores sin campus son del principal).
+// El token de sincronización no se guarda aquí: cada página lo recibe del
+// servidor con la hoja y lo lleva en memoria, así dos pestañas del mismo
+// grupo no se pisan el token (el almacén 'tokens' queda sin uso).
+const CAMPUS_PRINCIPAL = 'principal';
+const COLA_DB = 'sgp-asistencia';
+const COLA_LOTE = 500;
+
+function abrirCola() {
+  return new Promise((resolve, reject) => {
+    const solicitud = indexedDB.open(COLA_DB, 1);
+    solicitud.onupgradeneeded = () => {
+      solicitud.result.createObjectStore('marcas', { keyPath: 'clave' });
+      solicitud.result.createObjectStore('tokens');
+    };
+    solicitud.onsuccess = () => resolve(solicitud.result);
+    solicitud.onerror = () => reject(solicitud.error);
+  });
+}
+
+async function operacionCola(almacen, modo, operacion) {
+  const db = await abrirCola();
+  return new Promise((resolve, reject) => {
+    const transaccion = db.transaction(almacen, modo);
+    const resultado = operacion(transaccion.objectStore(almacen));
+    transaccion.oncomplete = () => resolve(resultado && resultado.result);
+    transaccion.onerror = () => reject(transaccion.error);
+  });
+}
+
+function encolarMarcas(marcas) {
+  return operacionCola('marcas', 'readwrite', almacen => {
+    marcas.forEach(marca => almacen.put({
+      ...marca,
+      clave: `${marca.campus}|${marca.grupo_id}|${marca.fecha}|${marca.alumno_id}`
+    }));
+  });
+}
+
+function marcasPendientes() {
+  return operacionCola('marcas', 'readonly', almacen => almacen.getAll());
+}
+
+function confirmarMarcas(enviadas) {
+  // Sólo se borran las marcas que no cambiaron mientras se enviaban
+  return operacionCola('marcas', 'readwrite', almacen => {
+    enviadas.forEach(marca => {
+      const lectura = almacen.get(marca.clave);
+      lectura.onsuccess = () => {
+        if (lectura.result && lectura.result.marcado_en === marca.marcado_en) {
+          almacen.delete(marca.clave);
+        }
+      };
+    });
+  });
+}
+
+// Envía las marcas pendientes por grupo. Con grupoId y token devuelve
+// {cambios, token}: los cambios de otros dispositivos en ese grupo desde el
+// token y el token nuevo. Los demás grupos sólo envían sus marcas (sin token
+// el servidor no devuelve cambios). Lanza un error si no hay red.
+async function sincronizarCola(grupoId = null, campus = CAMPUS_PRINCIPAL, token = null) {
+  const pendientes = await marcasPendientes();
+  const porGrupo = new Map();
+  const propio = `${campus}|${grupoId}`;
+  if (grupoId !== null) porGrupo.set(propio, []);
+  pendientes.forEach(marca => {
+    const clave = `${marca.campus || CAMPUS_PRINCIPAL}|${marca.grupo_id}`;
+    if (!porGrupo.has(clave)) porGrupo.set(clave, []);
+    porGrupo.get(clave).push(marca);
+  });
+
+  const recibidos = [];
+  for (const [clave, marcas] of porGrupo) {
+    const [campusGrupo, grupo] = clave.split('|');
+    let restantes = marcas;
+    let hayMas = true;
+    while (restantes.length > 0 || hayMas) {
+      const lote = restantes.slice(0, COLA_LOTE);
+      restantes = restantes.slice(COLA_LOTE);
+      const respuesta = await fetch('/api/sync-asistencia', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'X-Campus': campusGrupo },
+        credentials: 'same-origin',
+        body: JSON.stringify({
+          token: clave === propio ? token : null,
+          grupo_id: Number(grupo),
+          cambios: lote.map(({ clave, campus, ...marca }) => marca)
+        })
+      });
+      if (!respuesta.ok) throw new Error(`Error de sincronización (${respuesta.status})`);
+      const datos = await respuesta.json();
+      await confirmarMarcas(lote);
+      if (clave === propio) token = datos.token;
+      recibidos.push(...datos.cambios.map(cambio => ({ ...cambio, campus: campusGrupo })));
+      hayMas = datos.mas;
+    }
+  }
+  return { cambios: recibidos, token };
+}
@@ -0,0 +1,20 @@
+// Eventos en vivo del servidor (Server-Sent Events). EventSource reconecta
+// solo y envía Last-Event-ID para recibir lo que se perdió; el evento
+// 'reinicio' avisa que eso ya no es posible y hay que recargar los datos.
+// Ante una respuesta que no es 200 (503 con el proceso lleno de conexiones)
+// EventSource se rinde, así que se vuelve a abrir pasado un rato.
+const EVENTOS_REINTENTO_MS = 30000;
+
+function escucharEventos(manejadores) {
+  if (!window.EventSource) return null;
+  const fuente = new EventSource('/api/eventos');
+  Object.entries(manejadores).forEach(([tipo, manejador]) => {
+    fuente.addEventListener(tipo, evento => manejador(JSON.parse(evento.data || '{}')));
+  });
+  fuente.addEventListener('error', () => {
+    if (fuente.readyState === EventSource.CLOSED) {
+      setTimeout(() => escucharEventos(manejadores), EVENTOS_REINTENTO_MS);
+    }
+  });
+  return fuente;
+}
@@ -1,23 +1,35 @@
 // Variables globales
 let alumnos = [];
 let historial = [];
-const params = new URLSearchParams(window.location.search);
-const carreraId = params.get('carrera');
-const grupoNombre = params.get('grupo');
-const fechaAsistencia = params.get('fecha');
+let historialSiguiente = null;
+let historialFiltros = {};
+// Datos de la hoja embebidos por el servidor (grupo, fecha y alumnos)
+const hoja = JSON.parse(document.getElementById('datos-hoja').textContent);
+const grupoId = hoja.grupo.id;
+const grupoNombre = hoja.grupo.nombre;
+const carreraId = hoja.grupo.carrera;
+const fechaAsistencia = hoja.fecha;
+// Campus de la hoja: viaja en cada petición para no depender de la sesión
+const campus = hoja.campus;
+const cabecerasCampus = { 'X-Campus': campus };
+// Token de sincronización de esta página (el servidor lo manda con la hoja)
+let tokenSincronizacion = hoja.token;
 
 // Cuando el DOM esté cargado
 document.addEventListener('DOMContentLoaded', () => {
-  // Configurar información del grupo
-  document.getElementById('carrera-nombre').textContent = obtenerNombreCarrera(carreraId);
-  document.getElementById('grupo-nombre').textContent = decodeURIComponent(grupoNombre);
-  document.getElementById('fecha-asistencia').textContent = fechaAsistencia;
-  document.getElementById('titulo-asistencia').textContent = `Asistencia - ${decodeURIComponent(grupoNombre)}`;
-
-  // Cargar datos iniciales
+  // La tabla ya viene renderizada: sólo se carga el estado y se enlazan eventos
   cargarAlumnos();
+  enlazarFilas();
   cargarHistorial();
 
+  // Captura sin conexión: las marcas se guardan en la cola local y se
+  // sincronizan al cargar, al volver la red y poco después de cada cambio
+  if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.register('/sw.js').catch(error => console.error('Service worker:', error));
+  }
+  window.addEventListener('online', () => sincronizar());
+  sincronizar();
+
   // Configurar eventos
   configurarEventos();
 });
@@ -38,6 +50,9 @@ function configurarEventos() {
   // Botón filtrar historial
   document.getElementById('btn-filtrar-historial').addEventListener('click', filtrarHistorial);
   
+  // Botón cargar más historial
+  document.getElementById('btn-mas-historial').addEventListener('click', cargarMasHistorial);
+  
   // Cerrar modales
   document.querySelectorAll('.cerrar-modal').forEach(btn => {
     btn.addEventListener('click', () => {
@@ -55,28 +70,11 @@ function configurarEventos() {
   });
 }
 
-function obtenerNombreCarrera(id) {
-  const carreras = {
-    'software': 'Ingeniería en Software',
-    'manufactura': 'Ingeniería en Manufactura',
-    'mecanica': 'Ingeniería Mecánica'
-  };
-  return carreras[id] || id;
-}
-
-async function cargarAlumnos() {
-  try {
-
-    alumnos = [
-      { id: 1, matricula: 'A12345', nombre: 'Juan Pérez', asistencia: false },
-      { id: 2, matricula: 'A67890', nombre: 'María García', asistencia: true }
-    ];
-    
-    renderizarAlumnos();
-  } catch (error) {
-    console.error('Error al cargar alumnos:', error);
-    alert('Error al cargar la lista de alumnos');
-  }
+function cargarAlumnos() {
+  alumnos = hoja.alumnos.map(fila => {
+    const alumno = Object.fromEntries(hoja.campos.map((campo, i) => [campo, fila[i]]));
+    return { id: alumno.id, matricula: alumno.matricula, nombre: alumno.nombre, asistencia: !!alumno.presente };
+  });
 }
 
 function renderizarAlumnos() {
@@ -116,6 +114,10 @@ function renderizarAlumnos() {
     tbody.appendChild(tr);
   });
 
+  enlazarFilas();
+}
+
+function enlazarFilas() {
   // Agregar eventos a los checkboxes
   document.querySelectorAll('#tabla-asistencia input[type="checkbox"]').forEach(checkbox => {
     checkbox.addEventListener('change', (e) => {
@@ -123,6 +125,7 @@ function renderizarAlumnos() {
       const alumno = alumnos.find(a => a.id === id);
       if (alumno) {
         alumno.asistencia = e.target.checked;
+        encolarMarcas([marca(alumno)]).then(programarSincronizacion);
       }
     });
   });
@@ -177,67 +180,90 @@ function eliminarAlumno(id) {
   }
 }
 
-async function guardarAsistencia() {
+function marca(alumno) {
+  return {
+    campus,
+    grupo_id: grupoId,
+    fecha: fechaAsistencia,
+    alumno_id: alumno.id,
+    presente: alumno.asistencia,
+    marcado_en: new Date().toISOString()
+  };
+}
+
+let temporizadorSincronizacion = null;
+
+function programarSincronizacion() {
+  clearTimeout(temporizadorSincronizacion);
+  temporizadorSincronizacion = setTimeout(() => sincronizar(), 2000);
+}
+
+// Envía la cola y aplica las marcas hechas en otros dispositivos.
+// Devuelve false si no hubo conexión (las marcas siguen en la cola).
+async function sincronizar() {
+  clearTimeout(temporizadorSincronizacion);
   try {
-    // Calcular resumen
-    const presentes = alumnos.filter(a => a.asistencia).length;
-    const total = alumnos.length;
-    const porcentaje = total > 0 ? Math.round((presentes / total) * 100) : 0;
-    
-    // En una app real, aquí enviarías los datos al servidor
-    console.log('Guardando asistencia:', {
-      carreraId,
-      grupoNombre,
-      fechaAsistencia,
-      alumnos,
-      resumen: { presentes, total, porcentaje }
+    const { cambios, token } = await sincronizarCola(grupoId, campus, tokenSincronizacion);
+    tokenSincronizacion = token;
+    aplicarCambiosRemotos(cambios);
+    return true;
+  } catch (error) {
+    console.warn('Sincronización pendiente:', error);
+    // Si el navegador lo permite, el service worker reintenta al volver la red
+    navigator.serviceWorker?.ready
+      .then(registro => registro.sync && registro.sync.register('sync-asistencia'))
+      .catch(() => {});
+    return false;
+  }
+}
+
+function aplicarCambiosRemotos(cambios) {
+  cambios
+    .filter(c => c.campus === campus && c.grupo_id === grupoId && c.fecha === fechaAsistencia)
+    .forEach(c => {
+      const alumno = alumnos.find(a => a.id === c.alumno_id);
+      if (!alumno) return;
+      alumno.asistencia = !!c.presente;
+      const checkbox = document.querySelector(`#tabla-asistencia input[data-id="${c.alumno_id}"]`);
+      if (checkbox) checkbox.checked = alumno.asistencia;
     });
-    
-    // Actualizar historial local
-    const nuevaAsistencia = {
-      id: Date.now(),
-      fecha: fechaAsistencia,
-      carrera: carreraId,
-      grupo: grupoNombre,
-      presentes,
-      total,
-      porcentaje
-    };
-    
-    historial.unshift(nuevaAsistencia);
-    
-    alert(`Asistencia guardada correctamente\nPresentes: ${presentes}/${total} (${porcentaje}%)`);
-    
+}
+
+async function guardarAsistencia() {
+  // Calcular resumen
+  const presentes = alumnos.filter(a => a.asistencia).length;
+  const total = alumnos.length;
+  const porcentaje = total > 0 ? Math.round((presentes / total) * 100) : 0;
+
+  try {
+    // Se encola la lista completa para que también queden registrados los ausentes
+    await encolarMarcas(alumnos.map(marca));
   } catch (error) {
     console.error('Error al guardar asistencia:', error);
     alert('Error al guardar la asistencia');
+    return;
+  }
+
+  if (await sincronizar()) {
+    await cargarHistorial(historialFiltros);
+    alert(`Asistencia guardada correctamente\nPresentes: ${presentes}/${total} (${porcentaje}%)`);
+  } else {
+    alert(`Sin conexión: la asistencia quedó guardada en este dispositivo y se enviará al recuperar la red\nPresentes: ${presentes}/${total} (${porcentaje}%)`);
   }
 }
 
-async function cargarHistorial() {
+async function cargarHistorial(filtros = {}, cursor = null) {
   try {
-    // En una app real, esto vendría de una API
-    historial = [
-      {
-        id: 1,
-        fecha: '2024-05-01',
-        carrera: carreraId,
-        grupo: grupoNombre,
-        presentes: 15,
-        total: 20,
-        porcentaje: 75
-      },
-      {
-        id: 2,
-        fecha: '2024-04-28',
-        carrera: carreraId,
-        grupo: grupoNombre,
-        presentes: 18,
-        total: 20,
-        porcentaje: 90
-      }
-    ];
-    
+    const query = new URLSearchParams({ grupo_id: grupoId, ...filtros });
+    if (cursor) query.set('cursor', cursor);
+
+    const response = await fetch(`/api/historial-asistencia?${query}`, { headers: cabecerasCampus });
+    if (!response.ok) throw new Error('Error al cargar historial');
+    const pagina = await response.json();
+
+    historialFiltros = filtros;
+    historial = cursor ? historial.concat(pagina.items) : pagina.items;
+    historialSiguiente = pagina.siguiente;
   } catch (error) {
     console.error('Error al cargar historial:', error);
   }
@@ -261,6 +287,7 @@ function renderizarHistorial() {
   tbody.innerHTML = '';
 
   if (historial.length === 0) {
+    document.getElementById('btn-mas-historial').style.display = 'none';
     tbody.innerHTML = `
       <tr>
         <td colspan="5" class="no-historial">
@@ -271,6 +298,8 @@ function renderizarHistorial() {
     return;
   }
 
+  document.getElementById('btn-mas-historial').style.display = historialSiguiente ? 'inline-block' : 'none';
+
   historial.forEach(item => {
     const tr = document.createElement('tr');
     tr.innerHTML = `
@@ -306,7 +335,7 @@ function renderizarHistorial() {
   });
 }
 
-function filtrarHistorial() {
+async function filtrarHistorial() {
   const fechaInicio = document.getElementById('fecha-inicio').value;
   const fechaFin = document.getElementById('fecha-fin').value;
   
@@ -315,13 +344,14 @@ function filtrarHistorial() {
     return;
   }
   
-  const filtrado = historial.filter(item => {
-    return item.fecha >= fechaInicio && item.fecha <= fechaFin;
-  });
-  
-  // Simula filtrado
-  alert(`Mostrando asistencias entre ${fechaInicio} y ${fechaFin}`);
-  
+  await cargarHistorial({ desde: fechaInicio, hasta: fechaFin });
+  renderizarHistorial();
+}
+
+async function cargarMasHistorial() {
+  if (!historialSiguiente) return;
+  await cargarHistorial(historialFiltros, historialSiguiente);
+  renderizarHistorial();
 }
 
 function verDetalleAsistencia(id) {
@@ -331,11 +361,28 @@ function verDetalleAsistencia(id) {
   }
 }
 
-function generarPDF(id) {
-  const item = historial.find(h => h.id === id);
-  if (item) {
-    
-    alert(`Generando PDF para la asistencia del ${item.fecha}`);
-    
+async function generarPDF(id) {
+  try {
+    let response = await fetch(`/generar-pdf-asistencia/${id}`, { headers: cabecerasCampus });
+    // 202: el PDF se está generando en segundo plano, reintentar
+    for (let intentos = 0; response.status === 202 && intentos < 30; intentos++) {
+      const espera = parseInt(response.headers.get('Retry-After') || '1', 10);
+      await new Promise(resolve => setTimeout(resolve, espera * 1000));
+      response = await fetch(`/generar-pdf-asistencia/${id}`, { headers: cabecerasCampus });
+    }
+    if (!response.ok) throw new Error('No se pudo generar el PDF');
+
+    const blob = await response.blob();
+    const url = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = `asistencia_${id}.pdf`;
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
+    window.URL.revokeObjectURL(url);
+  } catch (error) {
+    console.error('Error al generar PDF:', error);
+    alert('Error al generar el PDF');
   }
-}
\ No newline at end of file
+}
@@ -0,0 +1,60 @@
+// Búsqueda de observaciones mientras se escribe (texto completo en el servidor)
+const campoBusqueda = document.getElementById('buscar-observacion');
+const listaObservaciones = document.getElementById('lista-observaciones');
+const resultadosBusqueda = document.getElementById('resultados-busqueda');
+let temporizadorBusqueda = null;
+let siguienteBusqueda = null;
+
+async function buscarObservaciones(q, cursor) {
+    const params = new URLSearchParams({ q });
+    if (cursor) params.set('cursor', cursor);
+    const respuesta = await fetch(`/api/observaciones/buscar?${params}`);
+    if (!respuesta.ok) return;
+    const datos = await respuesta.json();
+
+    if (!cursor) resultadosBusqueda.innerHTML = '';
+    resultadosBusqueda.querySelector('.ver-mas')?.remove();
+
+    if (!cursor && datos.items.length === 0) {
+        resultadosBusqueda.innerHTML = '<p class="vacio">Sin resultados.</p>';
+    }
+    datos.items.forEach(item => {
+        const div = document.createElement('div');
+        div.className = 'observacion-item';
+        const fecha = document.createElement('strong');
+        fecha.textContent = item.fecha;
+        div.appendChild(fecha);
+        div.appendChild(document.createElement('br'));
+        // El fragmento llega con el HTML escapado y sólo las marcas <mark>
+        div.insertAdjacentHTML('beforeend', item.fragmento);
+        resultadosBusqueda.appendChild(div);
+    });
+
+    siguienteBusqueda = datos.siguiente;
+    if (siguienteBusqueda) {
+        const mas = document.createElement('a');
+        mas.className = 'ver-mas';
+        mas.href = '#';
+        mas.textContent = 'Ver más resultados';
+        mas.addEventListener('click', e => {
+            e.preventDefault();
+            buscarObservaciones(q, siguienteBusqueda);
+        });
+        resultadosBusqueda.appendChild(mas);
+    }
+}
+
+campoBusqueda.addEventListener('input', () => {
+    clearTimeout(temporizadorBusqueda);
+    const q = campoBusqueda.value.trim();
+    if (!q) {
+        resultadosBusqueda.hidden = true;
+        listaObservaciones.hidden = false;
+        return;
+    }
+    temporizadorBusqueda = setTimeout(() => {
+        resultadosBusqueda.hidden = false;
+        listaObservaciones.hidden = true;
+        buscarObservaciones(q);
+    }, 250);
+});
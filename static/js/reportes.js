@@ -0,0 +1,27 @@
+// Encola un trabajo de reporte y consulta su estado hasta que termine.
+// Devuelve el trabajo terminado (con la lista de reportes y sus URLs).
+async function solicitarReporte(proyectoId = null) {
+  const url = proyectoId ? `/generar-reporte/${proyectoId}` : '/generar-reporte';
+  const response = await fetch(url, { method: 'POST' });
+  const datos = await response.json();
+  if (!response.ok || !datos.success) {
+    throw new Error(datos.error || 'Error al encolar el reporte');
+  }
+
+  for (let intentos = 0; intentos < 120; intentos++) {
+    await new Promise(resolve => setTimeout(resolve, 500));
+    const estado = await fetch(datos.estado_url).then(r => r.json());
+    if (estado.estado === 'terminado') return estado;
+    if (estado.estado === 'error') throw new Error(estado.error || 'Error al generar reporte');
+  }
+  throw new Error('El reporte tardó demasiado en generarse');
+}
+
+function descargarArchivo(url) {
+  const a = document.createElement('a');
+  a.href = url;
+  a.download = '';
+  document.body.appendChild(a);
+  a.click();
+  document.body.removeChild(a);
+}
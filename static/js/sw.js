@@ -0,0 +1,78 @@
+// Service worker: guarda los recursos del pase de lista para abrirlo sin
+// conexión y envía la cola de marcas cuando vuelve la red (Background Sync).
+// /sw.js antepone a este archivo `const RECURSOS = {ruta: URL versionada}`
+// (ver service_worker en app.py): las plantillas piden los estáticos con
+// ?v=<hash>, así que se guardan esas mismas URL. Si cambia un recurso cambia
+// el script, el navegador instala el nuevo y éste borra las versiones viejas.
+importScripts(RECURSOS['js/cola_asistencia.js']);
+
+const CACHE_ESTATICOS = 'sgp-estaticos-v2';
+const CACHE_PAGINAS = 'sgp-paginas-v1';
+const ESTATICOS = Object.values(RECURSOS).map(url => new URL(url, self.location).href);
+
+// Guarda una versión de un estático y borra las demás versiones del mismo archivo
+function guardarEstatico(peticion, respuesta) {
+  return caches.open(CACHE_ESTATICOS).then(cache =>
+    cache.keys(peticion, { ignoreSearch: true })
+      .then(viejas => Promise.all(viejas.filter(v => v.url !== peticion.url).map(v => cache.delete(v))))
+      .then(() => cache.put(peticion, respuesta)));
+}
+
+self.addEventListener('install', event => {
+  event.waitUntil(
+    caches.open(CACHE_ESTATICOS).then(cache => cache.addAll(ESTATICOS)).then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener('activate', event => {
+  const vigentes = [CACHE_ESTATICOS, CACHE_PAGINAS];
+  const rutas = new Set(ESTATICOS.map(url => new URL(url).pathname));
+  event.waitUntil(
+    caches.keys()
+      .then(nombres => Promise.all(nombres.filter(n => !vigentes.includes(n)).map(n => caches.delete(n))))
+      // Versiones anteriores de los recursos precargados
+      .then(() => caches.open(CACHE_ESTATICOS))
+      .then(cache => cache.keys().then(claves => Promise.all(claves
+        .filter(c => rutas.has(new URL(c.url).pathname) && !ESTATICOS.includes(c.url))
+        .map(c => cache.delete(c)))))
+      .then(() => self.clients.claim())
+  );
+});
+
+self.addEventListener('fetch', event => {
+  const url = new URL(event.request.url);
+  if (event.request.method !== 'GET' || url.origin !== self.location.origin) return;
+
+  if (url.pathname.startsWith('/static/') && url.searchParams.has('v')) {
+    // URL versionada: su contenido no cambia, primero la caché
+    event.respondWith(
+      caches.match(event.request).then(guardada => guardada || fetch(event.request).then(respuesta => {
+        if (respuesta.ok) guardarEstatico(event.request, respuesta.clone());
+        return respuesta;
+      }).catch(() => caches.match(event.request, { ignoreSearch: true })))
+    );
+  } else if (url.pathname.startsWith('/static/')) {
+    // Sin versión puede cambiar: primero la red y, sin conexión, cualquier
+    // versión guardada del archivo
+    event.respondWith(
+      fetch(event.request).catch(() => caches.match(event.request, { ignoreSearch: true }))
+    );
+  } else if (url.pathname === '/lista-asistencia') {
+    // Hojas de pase de lista: primero la red y, sin conexión, la última copia
+    event.respondWith(
+      fetch(event.request).then(respuesta => {
+        if (respuesta.status === 200) {
+          const copia = respuesta.clone();
+          caches.open(CACHE_PAGINAS).then(cache => cache.put(event.request, copia));
+        }
+        return respuesta;
+      }).catch(() => caches.match(event.request))
+    );
+  }
+});
+
+self.addEventListener('sync', event => {
+  if (event.tag === 'sync-asistencia') {
+    event.waitUntil(sincronizarCola());
+  }
+});
@@ -0,0 +1,53 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+# Antes de importar la app: nunca tocar database.db del repositorio
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(prefix='sgp_tests_'), 'database.db'))
+
+from app import create_app, preparar_db  # noqa: E402
+from db import get_pool  # noqa: E402
+
+
+def configuracion(tmp_path, **extra):
+    return {
+        'TESTING': True,
+        'DATABASE': str(tmp_path / 'principal.db'),
+        'DB_CAMPUS': {'norte': str(tmp_path / 'norte.db')},
+        'REPORTES_FOLDER': str(tmp_path / 'reportes'),
+        'PDF_CACHE_FOLDER': str(tmp_path / 'pdf'),
+        'ESTATICOS_COMPRIMIDOS_FOLDER': str(tmp_path / 'estaticos'),
+        'RECONCILIAR_INTERVALO': 0,
+        'METRICAS_LENTO_MS': None,
+        # Hash rápido: las pruebas no miden el costo de scrypt
+        'PASSWORD_METODO': 'pbkdf2:sha256:1',
+        **extra,
+    }
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app(configuracion(tmp_path))
+    preparar_db(app)
+    yield app
+    app.extensions['campus'].close_all()
+    get_pool(app).close_all()
+
+
+@pytest.fixture
+def cliente(app):
+    cliente = app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion['admin_id'] = 1
+        sesion['admin_usuario'] = 'ADMIN'
+    return cliente
+
+
+@pytest.fixture
+def anonimo(app):
+    return app.test_client()
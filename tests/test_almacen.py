@@ -0,0 +1,89 @@
+import os
+
+from almacen import AlmacenContenido
+from db import get_pool
+
+
+def _proyecto(conn):
+    with conn:
+        return conn.execute(
+            "INSERT INTO proyectos (nombre, estado, avance) VALUES ('Riego', 'activo', 40)").lastrowid
+
+
+def test_reporte_reescribe_objeto_borrado_por_el_reconciliador(app, monkeypatch):
+    almacen = app.extensions['almacen_reportes']
+    original = AlmacenContenido.guardar
+
+    def guardar_y_perder(self, contenido):
+        # El reconciliador borra el archivo justo después de que guardar() lo vio
+        digest, tamano = original(self, contenido)
+        monkeypatch.setattr(AlmacenContenido, 'guardar', original)
+        self.eliminar(digest)
+        return digest, tamano
+
+    monkeypatch.setattr(AlmacenContenido, 'guardar', guardar_y_perder)
+    with get_pool(app).connection() as conn:
+        proyecto_id = _proyecto(conn)
+        [reporte_id] = app.extensions['cola_reportes']._generar(conn, proyecto_id)
+        digest = conn.execute('SELECT hash FROM reportes WHERE id = ?', (reporte_id,)).fetchone()[0]
+    assert almacen.existe(digest)
+
+
+def test_objeto_sin_referencias_se_borra_con_su_registro(app):
+    almacen = app.extensions['almacen_reportes']
+    reconciliador = app.extensions['reconciliador_reportes']
+    digest, _ = almacen.guardar(b'viejo')
+    with get_pool(app).connection() as conn, conn:
+        conn.execute("""INSERT INTO objetos_reporte (hash, tamano, sin_referencias_desde)
+                        VALUES (?, 5, datetime('now', '-2 days'))""", (digest,))
+    resumen = reconciliador.ejecutar()
+    assert resumen['objetos_eliminados'] == 1
+    assert not almacen.existe(digest)
+
+
+def test_filas_anteriores_que_comparten_archivo(app, tmp_path):
+    almacen = app.extensions['almacen_reportes']
+    reconciliador = app.extensions['reconciliador_reportes']
+    anterior = tmp_path / 'reporte_compartido.txt'
+    anterior.write_bytes(b'contenido anterior')
+    with get_pool(app).connection() as conn:
+        proyecto_id = _proyecto(conn)
+        with conn:
+            for _ in range(3):
+                conn.execute("""INSERT INTO reportes (proyecto_id, nombre_archivo, ruta_archivo, tipo)
+                                VALUES (?, 'reporte_compartido.txt', ?, 'texto')""",
+                             (proyecto_id, str(anterior)))
+
+        resumen = reconciliador.ejecutar()
+
+        hashes = {fila[0] for fila in conn.execute('SELECT hash FROM reportes')}
+        referencias = conn.execute('SELECT referencias FROM objetos_reporte').fetchone()[0]
+    assert resumen['migrados'] == 3 and resumen['filas_eliminadas'] == 0
+    assert len(hashes) == 1 and None not in hashes
+    assert referencias == 3
+    assert almacen.existe(hashes.pop())
+    assert not os.path.exists(anterior)
+
+
+def test_rutas_anteriores_relativas_no_dependen_del_directorio_actual(app, tmp_path, monkeypatch):
+    almacen = app.extensions['almacen_reportes']
+    carpeta = app.config['REPORTES_FOLDER']
+    with open(os.path.join(carpeta, 'reporte_relativo.txt'), 'wb') as f:
+        f.write(b'reporte con ruta relativa')
+    otro = tmp_path / 'otro'
+    otro.mkdir()
+    monkeypatch.chdir(otro)
+    with get_pool(app).connection() as conn:
+        proyecto_id = _proyecto(conn)
+        with conn:
+            for ruta in ('reportes/reporte_relativo.txt', 'reportes/reporte_perdido.txt'):
+                conn.execute("""INSERT INTO reportes (proyecto_id, nombre_archivo, ruta_archivo, tipo)
+                                VALUES (?, ?, ?, 'texto')""", (proyecto_id, os.path.basename(ruta), ruta))
+
+        resumen = app.extensions['reconciliador_reportes'].ejecutar()
+
+        filas = dict(conn.execute('SELECT nombre_archivo, hash FROM reportes'))
+    assert resumen['migrados'] == 1 and resumen['filas_eliminadas'] == 0
+    assert almacen.existe(filas['reporte_relativo.txt'])
+    # Sin archivo en ninguna ubicación conocida: la fila se conserva
+    assert filas['reporte_perdido.txt'] is None
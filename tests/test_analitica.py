@@ -0,0 +1,105 @@
+from datetime import date, timedelta
+
+import analitica
+from analitica import AnalisisAsistencia
+from asistencias import guardar_lista
+from db import get_pool
+
+HOY = date(2025, 3, 31)
+
+
+def test_carga_inicial_de_la_matriz(app):
+    with get_pool(app).connection() as conn:
+        alumnos = [fila[0] for fila in conn.execute('SELECT id FROM alumnos WHERE grupo_id = 1 ORDER BY id')]
+        for dias_atras in range(5):
+            fecha = (HOY - timedelta(days=dias_atras)).isoformat()
+            # El primer alumno falta a todas; los demás asisten
+            guardar_lista(conn, 1, fecha, [(a, a != alumnos[0]) for a in alumnos])
+
+        ids, indicadores, _ = AnalisisAsistencia(dias=30).indicadores(conn, hoy=HOY)
+
+    assert list(ids) == alumnos
+    assert list(indicadores['sesiones']) == [5] * len(alumnos)
+    assert list(indicadores['faltas']) == [5] + [0] * (len(alumnos) - 1)
+    assert indicadores['racha_actual'][0] == 5
+
+
+def _alumnos(conn, grupo_id):
+    return [fila[0] for fila in conn.execute('SELECT id FROM alumnos WHERE grupo_id = ? ORDER BY id', (grupo_id,))]
+
+
+def test_cambios_posteriores_se_aplican_sin_recargar(app):
+    analisis = AnalisisAsistencia(dias=30)
+    with get_pool(app).connection() as conn:
+        alumnos = _alumnos(conn, 1)
+        guardar_lista(conn, 1, HOY.isoformat(), [(a, True) for a in alumnos])
+        analisis.indicadores(conn, hoy=HOY)
+        with conn:
+            conn.execute("INSERT INTO alumnos (grupo_id, matricula, apellidos, nombre) VALUES (1, 'N1', 'Nuevo', 'Alumno')")
+        nuevo = _alumnos(conn, 1)[-1]
+        # Corrige el pase de hoy (el primero faltó) y agrega a un alumno nuevo
+        guardar_lista(conn, 1, HOY.isoformat(), [(a, a != alumnos[0]) for a in alumnos] + [(nuevo, False)])
+
+        ids, indicadores, token = analisis.indicadores(conn, hoy=HOY)
+        tope = conn.execute('SELECT valor FROM secuencia_asistencias WHERE id = 1').fetchone()[0]
+
+    assert analisis.cargas == 1 and analisis.parches == 1
+    assert token == tope
+    faltas = dict(zip(ids.tolist(), indicadores['faltas'].tolist()))
+    assert faltas == {alumnos[0]: 1, **{a: 0 for a in alumnos[1:]}, nuevo: 1}
+
+
+def test_cambio_de_dia_desplaza_la_ventana(app):
+    analisis = AnalisisAsistencia(dias=7)
+    with get_pool(app).connection() as conn:
+        alumnos = _alumnos(conn, 1)
+        for dias_atras in range(3):
+            guardar_lista(conn, 1, (HOY - timedelta(days=dias_atras)).isoformat(), [(a, False) for a in alumnos])
+        _, indicadores, _ = analisis.indicadores(conn, hoy=HOY)
+        assert indicadores['sesiones'][0] == 3
+
+        # Seis días después sólo queda dentro de la ventana el pase de HOY
+        _, indicadores, _ = analisis.indicadores(conn, hoy=HOY + timedelta(days=6))
+        assert indicadores['sesiones'][0] == 1 and indicadores['racha_actual'][0] == 1
+        assert analisis.cargas == 1
+
+        # Un salto mayor que la ventana vuelve a cargar desde la base
+        ids, _, _ = analisis.indicadores(conn, hoy=HOY + timedelta(days=30))
+    assert analisis.cargas == 2
+    assert len(ids) == 0
+
+
+def test_alertas_filtradas_por_grupo_y_carrera(app):
+    analisis = AnalisisAsistencia()
+    umbrales = {'max_faltas': 0.5, 'min_sesiones': 1, 'racha': 3, 'quincena': 0.5}
+    hoy = date.today()
+    with get_pool(app).connection() as conn:
+        with conn:
+            conn.execute("INSERT INTO alumnos (grupo_id, matricula, apellidos, nombre) VALUES (4, 'C2', 'Otra', 'Carrera')")
+        grupos = {1: _alumnos(conn, 1), 4: _alumnos(conn, 4)}
+        for grupo_id, alumnos in grupos.items():
+            for dias_atras in range(3):
+                guardar_lista(conn, grupo_id, (hoy - timedelta(days=dias_atras)).isoformat(),
+                              [(a, False) for a in alumnos])
+
+        todos = analitica.alertas(conn, analisis, umbrales)
+        del_grupo = analitica.alertas(conn, analisis, umbrales, grupo_id=4)
+        de_carrera = analitica.alertas(conn, analisis, umbrales, carrera_id=1)
+        limitadas = analitica.alertas(conn, analisis, umbrales, limite=1)
+
+    assert {a['id'] for a in todos['alumnos']} == set(grupos[1] + grupos[4])
+    assert all(a['motivos'] == ['faltas', 'racha', 'quincena'] for a in todos['alumnos'])
+    assert [a['id'] for a in del_grupo['alumnos']] == grupos[4]
+    assert {a['id'] for a in de_carrera['alumnos']} == set(grupos[1])
+    assert limitadas['total'] == todos['total'] and len(limitadas['alumnos']) == 1
+
+
+def test_precalentar_carga_la_matriz_en_segundo_plano(app):
+    analisis = AnalisisAsistencia()
+    analisis.precalentar(get_pool(app))
+    analisis.precalentar(get_pool(app))
+    analisis._hilo.join(timeout=10)
+    assert analisis.cargas == 1
+    with get_pool(app).connection() as conn:
+        analisis.indicadores(conn)
+    assert analisis.cargas == 1
@@ -0,0 +1,59 @@
+import app as modulo_app
+from asistencias import guardar_lista
+from db import get_pool
+
+
+def _pase(alumnos, fecha='2025-04-07'):
+    return {'grupo_id': 1, 'fecha': fecha,
+            'alumnos': [{'alumno_id': a['id'], 'presente': i % 2 == 0} for i, a in enumerate(alumnos)]}
+
+
+def test_guardar_asistencia_requiere_sesion(anonimo, cliente):
+    alumnos = cliente.get('/api/alumnos/1').get_json()
+    assert anonimo.post('/api/guardar-asistencia', json=_pase(alumnos)).status_code == 401
+    assert cliente.get('/api/historial-asistencia?grupo_id=1').get_json()['items'] == []
+
+
+def test_guardar_asistencia_error_interno_sin_detalles(cliente, monkeypatch):
+    alumnos = cliente.get('/api/alumnos/1').get_json()
+
+    def fallar(*args):
+        raise RuntimeError('/ruta/secreta/database.db está bloqueada')
+
+    monkeypatch.setattr(modulo_app, 'guardar_lista', fallar)
+    respuesta = cliente.post('/api/guardar-asistencia', json=_pase(alumnos))
+    assert respuesta.status_code == 500
+    assert 'secreta' not in respuesta.get_data(as_text=True)
+
+
+def test_historial_requiere_sesion(anonimo):
+    assert anonimo.get('/api/historial-asistencia').status_code == 401
+
+
+def test_historial_paginado_sin_repetidos_ni_huecos(app, cliente):
+    with get_pool(app).connection() as conn:
+        grupos = [g for (g,) in conn.execute('SELECT id FROM grupos ORDER BY id LIMIT 3')]
+        inscritos = {g: [a for (a,) in conn.execute('SELECT id FROM alumnos WHERE grupo_id = ?', (g,))]
+                     for g in grupos}
+        # Varias sesiones por fecha: el desempate es por id
+        for dia in range(1, 8):
+            for g in grupos:
+                guardar_lista(conn, g, f'2025-05-{dia:02d}', [(a, a % 2 == 0) for a in inscritos[g]])
+        esperados = [fila[0] for fila in conn.execute(
+            'SELECT id FROM asistencias ORDER BY fecha DESC, id DESC')]
+
+    vistos, cursor = [], None
+    while True:
+        url = '/api/historial-asistencia?limite=4' + (f'&cursor={cursor}' if cursor else '')
+        pagina = cliente.get(url).get_json()
+        assert len(pagina['items']) <= 4
+        vistos.extend(item['id'] for item in pagina['items'])
+        cursor = pagina['siguiente']
+        if cursor is None:
+            break
+    assert vistos == esperados
+    assert len(esperados) == 7 * len(grupos)
+
+    # Los totales por sesión salen de los detalles
+    primera = cliente.get('/api/historial-asistencia?limite=1').get_json()['items'][0]
+    assert primera['total'] == len(inscritos[primera['grupo_id']])
@@ -0,0 +1,78 @@
+import json
+
+import cache as cache_mod
+from cache import CacheTTL
+
+
+def test_cache_catalogos_requiere_sesion(anonimo):
+    assert anonimo.get('/api/cache-catalogos').status_code == 401
+
+
+def test_alta_de_alumno_invalida_la_cache(cliente):
+    antes = cliente.get('/api/alumnos/1').get_json()
+    assert cliente.get('/api/alumnos/1').get_json() == antes
+    assert cliente.get('/api/cache-catalogos').get_json()['aciertos'] == 1
+
+    respuesta = cliente.post('/api/alumnos', json={
+        'grupo_id': 1, 'matricula': 'T-0001', 'apellidos': 'Prueba', 'nombre': 'Alumno'})
+    assert respuesta.status_code in (200, 201), respuesta.get_json()
+    despues = cliente.get('/api/alumnos/1').get_json()
+    assert len(despues) == len(antes) + 1
+    assert cliente.get('/api/cache-catalogos').get_json()['invalidaciones'] >= 1
+
+
+def _contador():
+    llamadas = []
+
+    def producir():
+        llamadas.append(1)
+        return {'n': len(llamadas)}
+    return producir, llamadas
+
+
+def test_entrada_expira_con_el_ttl(monkeypatch):
+    reloj = [1000.0]
+    monkeypatch.setattr(cache_mod.time, 'monotonic', lambda: reloj[0])
+    cache = CacheTTL(ttl=10)
+    producir, llamadas = _contador()
+    primera = cache.obtener('a', producir)
+    reloj[0] += 9
+    assert cache.obtener('a', producir) is primera
+    reloj[0] += 2
+    assert json.loads(cache.obtener('a', producir).cuerpo) == {'n': 2}
+    assert len(llamadas) == 2
+
+
+def test_lru_descarta_la_menos_usada():
+    cache = CacheTTL(maximo=2)
+    producir, llamadas = _contador()
+    cache.obtener('a', producir)
+    cache.obtener('b', producir)
+    cache.obtener('a', producir)      # 'a' pasa a ser la más reciente
+    cache.obtener('c', producir)      # sale 'b'
+    assert len(llamadas) == 3
+    cache.obtener('a', producir)
+    assert len(llamadas) == 3
+    cache.obtener('b', producir)
+    assert len(llamadas) == 4 and cache.estadisticas()['entradas'] == 2
+
+
+def test_invalidar_por_prefijo_y_durante_la_consulta():
+    cache = CacheTTL()
+    producir, llamadas = _contador()
+    for clave in ('principal:alumnos:1', 'principal:alumnos:2', 'principal:carreras'):
+        cache.obtener(clave, producir)
+    cache.invalidar('principal:alumnos:')
+    assert cache.estadisticas()['entradas'] == 1
+
+    # Una invalidación mientras se produce el valor: se responde pero no se guarda
+    def producir_e_invalidar():
+        cache.invalidar('principal:grupos:')
+        return {'viejo': True}
+    cache.obtener('principal:grupos:1', producir_e_invalidar)
+    assert cache.estadisticas()['entradas'] == 1
+
+
+def test_etag_responde_304(cliente):
+    respuesta = cliente.get('/api/carreras')
+    assert cliente.get('/api/carreras', headers={'If-None-Match': respuesta.headers['ETag']}).status_code == 304
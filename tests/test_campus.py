@@ -0,0 +1,83 @@
+import json
+import re
+
+from campus import PRINCIPAL
+from semillas import sembrar_catalogo
+
+
+def norte(app):
+    with app.extensions['campus'].pool('norte').connection() as conn:
+        sembrar_catalogo(conn, ejemplos=False)
+        grupo_id = conn.execute("SELECT id FROM grupos WHERE codigo = 'IS-1925'").fetchone()[0]
+        with conn:
+            conn.execute("INSERT INTO alumnos (grupo_id, matricula, apellidos, nombre) VALUES (?, 'N1', 'Norte', 'Uno')",
+                         (grupo_id,))
+    return grupo_id
+
+
+def contar(app, campus, sql):
+    with app.extensions['campus'].pool(campus).connection() as conn:
+        return conn.execute(sql).fetchone()[0]
+
+
+def test_datos_iniciales_solo_en_principal(app):
+    assert contar(app, PRINCIPAL, 'SELECT COUNT(*) FROM admin') == 1
+    assert contar(app, PRINCIPAL, 'SELECT COUNT(*) FROM carreras') > 0
+    for tabla in ('admin', 'proyectos', 'carreras', 'alumnos'):
+        assert contar(app, 'norte', f'SELECT COUNT(*) FROM {tabla}') == 0
+
+
+def test_campus_por_cabecera_argumento_y_sesion(app, cliente):
+    grupo_id = norte(app)
+    assert [a['matricula'] for a in cliente.get(f'/api/alumnos/{grupo_id}', headers={'X-Campus': 'norte'}).json] == ['N1']
+    assert [a['matricula'] for a in cliente.get(f'/api/alumnos/{grupo_id}?campus=norte').json] == ['N1']
+    assert 'N1' not in [a['matricula'] for a in cliente.get(f'/api/alumnos/{grupo_id}').json]
+
+    assert cliente.post('/api/campus', json={'campus': 'norte'}).json['actual'] == 'norte'
+    assert [a['matricula'] for a in cliente.get(f'/api/alumnos/{grupo_id}').json] == ['N1']
+    # La cabecera tiene prioridad sobre la sesión
+    assert 'N1' not in [a['matricula'] for a in
+                        cliente.get(f'/api/alumnos/{grupo_id}', headers={'X-Campus': PRINCIPAL}).json]
+
+
+def test_campus_desconocido(cliente):
+    assert cliente.get('/api/carreras', headers={'X-Campus': 'nadie'}).status_code == 404
+    assert cliente.post('/api/campus', json={'campus': 'nadie'}).status_code == 400
+
+
+def test_hoja_y_sincronizacion_van_al_campus_de_la_pagina(app, cliente):
+    grupo_id = norte(app)
+    respuesta = cliente.get(f'/lista-asistencia?grupo_id={grupo_id}&fecha=2025-01-15&campus=norte')
+    hoja = json.loads(re.search(rb'id="datos-hoja">(.*?)</script>', respuesta.data).group(1))
+    assert hoja['campus'] == 'norte'
+
+    alumno_id = hoja['alumnos'][0][0]
+    sincronizado = cliente.post('/api/sync-asistencia', headers={'X-Campus': hoja['campus']}, json={
+        'token': None, 'grupo_id': grupo_id,
+        'cambios': [{'grupo_id': grupo_id, 'fecha': '2025-01-15', 'alumno_id': alumno_id, 'presente': True,
+                     'marcado_en': '2025-01-15T08:00:00Z'}],
+    })
+    assert sincronizado.json['aceptados'] == 1
+    assert contar(app, 'norte', 'SELECT COUNT(*) FROM detalle_asistencias') == 1
+    assert contar(app, PRINCIPAL, 'SELECT COUNT(*) FROM detalle_asistencias') == 0
+
+
+def test_resumen_combina_campus_y_respeta_fechas(app, cliente):
+    grupo_id = norte(app)
+    cliente.post('/api/campus', json={'campus': 'norte'})
+    alumnos = cliente.get(f'/api/alumnos/{grupo_id}').json
+    # Lunes y miércoles de la misma semana
+    for fecha in ('2025-01-13', '2025-01-15'):
+        cliente.post('/api/guardar-asistencia', json={
+            'grupo_id': grupo_id, 'fecha': fecha, 'alumnos': [{'id': a['id'], 'presente': True} for a in alumnos]})
+
+    resumen = cliente.get('/api/campus/resumen').json
+    assert {c['campus']: c['sesiones'] for c in resumen['campus']} == {PRINCIPAL: 0, 'norte': 2}
+    assert resumen['total']['presentes'] == 2
+    software = next(c for c in resumen['carreras'] if c['codigo'] == 'IS')
+    assert software['campus'] == [PRINCIPAL, 'norte']
+
+    # A mitad de semana: sólo cuenta el miércoles
+    assert cliente.get('/api/campus/resumen?desde=2025-01-14').json['total']['sesiones'] == 1
+    assert cliente.get('/api/campus/resumen?hasta=2025-01-13').json['total']['sesiones'] == 1
+    assert cliente.get('/api/campus/resumen?desde=2025-13-01').status_code == 400
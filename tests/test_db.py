@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+from db import ConnectionPool, PoolTimeout
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), size=2, timeout=0.2)
+    yield pool
+    pool.close_all()
+
+
+def test_reutiliza_conexiones(pool):
+    with pool.connection() as primera:
+        pass
+    with pool.connection() as segunda:
+        assert segunda is primera
+        assert segunda.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert len(pool._all) == 1
+
+
+def test_espera_acotada_sin_conexiones_libres(pool):
+    a, b = pool.acquire(), pool.acquire()
+    inicio = time.monotonic()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert 0.2 <= time.monotonic() - inicio < 2
+    pool.release(a)
+    assert pool.acquire() is a
+    pool.release(a)
+    pool.release(b)
+
+
+def test_devolver_deshace_la_transaccion_abierta(pool):
+    with pool.connection() as conn:
+        conn.execute('CREATE TABLE t (x)')
+        conn.commit()
+        conn.execute('INSERT INTO t VALUES (1)')
+        assert conn.in_transaction
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+        assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+
+
+def test_sin_pool_cada_conexion_es_nueva(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'sin_pool.db'), size=0)
+    with pool.connection() as primera:
+        pass
+    with pool.connection() as segunda:
+        assert segunda is not primera
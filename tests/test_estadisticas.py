@@ -0,0 +1,59 @@
+import estadisticas
+from asistencias import guardar_lista
+from db import get_pool
+
+
+def _pase(cliente):
+    hoja = cliente.get('/api/alumnos/1').get_json()
+    respuesta = cliente.post('/api/guardar-asistencia', json={
+        'grupo_id': 1, 'fecha': '2024-03-04',
+        'alumnos': [{'alumno_id': a['id'], 'presente': i % 2 == 0} for i, a in enumerate(hoja)]})
+    assert respuesta.status_code == 200, respuesta.get_json()
+    return hoja[0]['id']
+
+
+def test_estadisticas_requieren_sesion(anonimo):
+    assert anonimo.get('/api/estadisticas/alumno/1').status_code == 401
+    assert anonimo.get('/api/estadisticas/grupo/1').status_code == 401
+
+
+def test_estadisticas_con_sesion(cliente):
+    alumno_id = _pase(cliente)
+    alumno = cliente.get(f'/api/estadisticas/alumno/{alumno_id}')
+    assert alumno.status_code == 200
+    grupo = cliente.get('/api/estadisticas/grupo/1')
+    assert grupo.status_code == 200
+    assert cliente.get('/api/estadisticas/alumno/999999').status_code == 404
+
+
+def _materializado(conn):
+    return (
+        sorted(tuple(f) for f in conn.execute('SELECT * FROM estadisticas_alumno WHERE sesiones > 0')),
+        sorted(tuple(f) for f in conn.execute(
+            'SELECT * FROM estadisticas_grupo_semana WHERE sesiones + registros > 0')),
+    )
+
+
+def test_triggers_coinciden_con_la_reconstruccion(app):
+    with get_pool(app).connection() as conn:
+        alumnos = [f[0] for f in conn.execute('SELECT id FROM alumnos WHERE grupo_id = 1')]
+        # Alta en dos semanas distintas
+        guardar_lista(conn, 1, '2024-03-04', [(a, True) for a in alumnos])
+        asistencia_id = guardar_lista(conn, 1, '2024-03-12', [(a, False) for a in alumnos])
+        # Cambio de presente
+        guardar_lista(conn, 1, '2024-03-04', [(alumnos[0], False)])
+        # Baja de un detalle y de un pase de lista completo
+        with conn:
+            conn.execute('DELETE FROM detalle_asistencias WHERE asistencia_id = ? AND alumno_id = ?',
+                         (asistencia_id, alumnos[0]))
+        guardar_lista(conn, 1, '2024-03-20', [(a, True) for a in alumnos])
+        with conn:
+            ultima = conn.execute("SELECT id FROM asistencias WHERE fecha = '2024-03-20'").fetchone()[0]
+            conn.execute('DELETE FROM detalle_asistencias WHERE asistencia_id = ?', (ultima,))
+            conn.execute('DELETE FROM asistencias WHERE id = ?', (ultima,))
+
+        assert estadisticas.verificar(conn) == []
+        por_triggers = _materializado(conn)
+        estadisticas.reconstruir(conn)
+        assert _materializado(conn) == por_triggers
+    assert por_triggers[0] == sorted([(alumnos[0], 1, 0)] + [(a, 2, 1) for a in alumnos[1:]])
@@ -0,0 +1,114 @@
+import http.client
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer
+
+import eventos
+from servidor import configurar_worker
+
+
+class ServidorAcotado(BaseWSGIServer):
+    """Servidor WSGI con un número fijo de hilos, como el worker gthread."""
+
+    def __init__(self, app, hilos):
+        super().__init__('127.0.0.1', 0, app)
+        self.hilos = ThreadPoolExecutor(hilos)
+
+    def process_request(self, request, client_address):
+        self.hilos.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def _abrir_flujo(puerto, cookie):
+    conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=5)
+    conexion.request('GET', '/api/eventos', headers={'Cookie': cookie})
+    respuesta = conexion.getresponse()
+    if respuesta.status == 200:
+        assert respuesta.readline().startswith(b'retry:')
+    return conexion, respuesta
+
+
+def test_peticiones_normales_con_el_maximo_de_flujos_abiertos(app, monkeypatch):
+    hilos = 4
+    for clave in ('FLASK_DB_POOL_SIZE', 'FLASK_RECONCILIAR_INTERVALO', 'FLASK_EVENTOS_MAX_CLIENTES'):
+        monkeypatch.delenv(clave, raising=False)
+    configurar_worker(0, hilos)
+    maximo = int(os.environ['FLASK_EVENTOS_MAX_CLIENTES'])
+    assert 0 < maximo < hilos
+    app.extensions['eventos'].max_clientes = maximo
+
+    sesion = app.session_interface.get_signing_serializer(app).dumps({'admin_id': 1})
+    cookie = f"{app.config['SESSION_COOKIE_NAME']}={sesion}"
+    servidor = ServidorAcotado(app, hilos)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    abiertas = []
+    try:
+        for _ in range(maximo):
+            abiertas.append(_abrir_flujo(servidor.server_port, cookie))
+        conexion, respuesta = _abrir_flujo(servidor.server_port, cookie)
+        assert respuesta.status == 503 and respuesta.getheader('Retry-After') == '30'
+        conexion.close()
+
+        conexion = http.client.HTTPConnection('127.0.0.1', servidor.server_port, timeout=5)
+        conexion.request('GET', '/health')
+        assert conexion.getresponse().status == 200
+        conexion.close()
+    finally:
+        app.extensions['apagado'].set()
+        for conexion, _ in abiertas:
+            conexion.close()
+        servidor.shutdown()
+        servidor.hilos.shutdown(wait=True)
+        servidor.server_close()
+
+
+def test_reanuda_desde_last_event_id(cliente, app):
+    broker = app.extensions['eventos']
+    for numero in range(3):
+        broker.publicar('asistencia', {'numero': numero})
+    primero = broker._historial[0][0]
+
+    respuesta = cliente.get('/api/eventos', headers={'Last-Event-ID': primero}, buffered=False)
+    cuerpo = (parte.decode() for parte in respuesta.response)
+    assert next(cuerpo).startswith('retry:')
+    recibidos = [next(cuerpo), next(cuerpo)]
+    respuesta.close()
+    assert [e.split('\n')[0] for e in recibidos] == [f'id: {e[0]}' for e in list(broker._historial)[1:]]
+    assert '"numero": 2' in recibidos[1]
+    assert broker.clientes() == 0
+
+
+def test_id_desconocido_pide_reinicio(app):
+    broker = app.extensions['eventos']
+    broker.publicar('proyecto', {})
+    suscripcion = broker.suscribir('otraepoca-5')
+    assert suscripcion.cola.get_nowait()[1] == 'reinicio'
+
+
+def test_cola_desbordada_cierra_el_flujo_y_se_recupera_al_reconectar():
+    broker = eventos.Broker(tamano_cola=2)
+    broker.publicar('asistencia', {'numero': 0})
+    visto = broker._historial[-1][0]
+    suscripcion = broker.suscribir()
+    for numero in range(1, 4):
+        broker.publicar('asistencia', {'numero': numero})
+    assert suscripcion.desbordada and broker.desbordados == 1
+
+    # El cliente lento sólo recibe el retry y la conexión se cierra
+    assert list(eventos.flujo(broker, suscripcion, latido=60)) == ['retry: 3000\n\n']
+    assert broker.clientes() == 0
+
+    # Tres pendientes no caben en una cola de dos: se pide recargar
+    assert broker.suscribir(visto).cola.get_nowait()[1] == 'reinicio'
+    reciente = broker._historial[-2][0]
+    reanudada = broker.suscribir(reciente)
+    assert reanudada.cola.get_nowait()[0] == broker._historial[-1][0]
@@ -0,0 +1,66 @@
+import csv
+import gzip
+import io
+import json
+
+import exportacion
+from asistencias import guardar_lista
+from db import get_pool
+
+
+def test_exportar_requiere_sesion(anonimo):
+    assert anonimo.get('/api/export/alumnos').status_code == 401
+
+
+def test_exportar_alumnos_csv(cliente):
+    respuesta = cliente.get('/api/export/alumnos')
+    assert respuesta.status_code == 200
+    filas = list(csv.DictReader(io.StringIO(respuesta.get_data(as_text=True))))
+    assert {'A12345', 'A54321'} <= {fila['matricula'] for fila in filas}
+
+
+def _pases(app):
+    with get_pool(app).connection() as conn:
+        alumnos = [f[0] for f in conn.execute('SELECT id FROM alumnos WHERE grupo_id = 1 ORDER BY id')]
+        with conn:
+            conn.execute('UPDATE alumnos SET apellidos = ? WHERE id = ?', ('Pérez, "Tito"', alumnos[0]))
+        for fecha in ('2025-02-03', '2025-02-10'):
+            guardar_lista(conn, 1, fecha, [(a, a == alumnos[0]) for a in alumnos])
+    return alumnos
+
+
+def test_detalle_en_ndjson_con_filtro_de_fechas(app, cliente):
+    alumnos = _pases(app)
+    respuesta = cliente.get('/api/export/detalle-asistencias?formato=ndjson&grupo_id=1&desde=2025-02-05')
+    assert respuesta.mimetype == 'application/x-ndjson'
+    filas = [json.loads(linea) for linea in respuesta.get_data(as_text=True).splitlines()]
+    assert len(filas) == len(alumnos)
+    assert {f['fecha'] for f in filas} == {'2025-02-10'}
+    assert [f['presente'] for f in filas] == [1] + [0] * (len(alumnos) - 1)
+    assert filas[0]['apellidos'] == 'Pérez, "Tito"'
+
+
+def test_csv_en_varios_bloques_y_gzip(app, cliente, monkeypatch):
+    _pases(app)
+    monkeypatch.setattr(exportacion, 'FILAS_POR_BLOQUE', 1)
+    plano = cliente.get('/api/export/alumnos?grupo_id=1').get_data(as_text=True)
+    filas = list(csv.reader(io.StringIO(plano)))
+    # Un solo encabezado aunque el cuerpo salga en varios bloques; el CSV escapa comas y comillas
+    assert filas[0] == ['id', 'matricula', 'apellidos', 'nombre', 'grupo', 'carrera']
+    assert 'Pérez, "Tito"' in [f[2] for f in filas[1:]]
+
+    comprimido = cliente.get('/api/export/alumnos?grupo_id=1&gzip=1')
+    assert comprimido.mimetype == 'application/gzip'
+    assert comprimido.headers['Content-Disposition'].endswith('.csv.gz')
+    assert gzip.decompress(comprimido.data).decode('utf-8') == plano
+
+
+def test_asistencias_agregadas_y_filtros_invalidos(app, cliente):
+    alumnos = _pases(app)
+    filas = list(csv.DictReader(io.StringIO(
+        cliente.get('/api/export/asistencias?carrera=1').get_data(as_text=True))))
+    assert [(f['fecha'], f['presentes'], f['total']) for f in filas] == [
+        ('2025-02-03', '1', str(len(alumnos))), ('2025-02-10', '1', str(len(alumnos)))]
+    assert cliente.get('/api/export/asistencias?desde=03-02-2025').status_code == 400
+    assert cliente.get('/api/export/alumnos?formato=xml').status_code == 400
+    assert cliente.get('/api/export/nada').status_code == 404
@@ -0,0 +1,41 @@
+import io
+
+from importacion import importar, leer_csv
+
+
+def subir(cliente, contenido, nombre='alumnos.csv'):
+    return cliente.post('/api/alumnos/importar', data={'archivo': (io.BytesIO(contenido), nombre)},
+                        content_type='multipart/form-data')
+
+
+def test_importar_requiere_sesion(anonimo):
+    assert subir(anonimo, b'matricula,apellidos,nombre,grupo\n').status_code == 401
+
+
+def test_importar_reporta_repetidas(cliente):
+    respuesta = subir(cliente, 'matricula,apellidos,nombre,grupo\n'
+                               'Z1,Uno,Ana,IS-1925\n'
+                               'A12345,Pérez,Juan,IS-1925\n'
+                               'Z1,Otra,Vez,IS-1925\n'
+                               'Z2,Dos,Bea,NO-EXISTE\n'.encode())
+    datos = respuesta.json
+    assert datos['insertados'] == 1
+    assert [(e['fila'], e['error']) for e in datos['errores']] == [
+        (3, 'Matrícula ya existe'), (4, 'Matrícula repetida en el archivo'), (5, 'Grupo no encontrado: NO-EXISTE'),
+    ]
+
+
+def test_csv_mal_formado_es_400_con_fila(cliente):
+    contenido = b'matricula,apellidos,nombre,grupo\nZ1,Uno,Ana,IS-1925\nZ2,"' + b'x' * 200000 + b'",Bea,IS-1925\n'
+    respuesta = subir(cliente, contenido)
+    assert respuesta.status_code == 400
+    assert 'fila 3' in respuesta.json['error']
+
+
+def test_matricula_existente_no_se_pierde_del_total(app):
+    from db import get_pool
+    with get_pool(app).connection() as conn:
+        filas = list(leer_csv(io.BytesIO(b'matricula,apellidos,nombre,grupo\nA12345,P,J,IS-1925\nZ9,Q,K,IS-1925\n')))
+        resultado = importar(conn, filas)
+    assert resultado['insertados'] == 1
+    assert resultado['total_errores'] == 1
@@ -0,0 +1,21 @@
+import json
+import re
+
+
+def test_hoja_requiere_sesion(anonimo):
+    respuesta = anonimo.get('/lista-asistencia?grupo_id=1&fecha=2025-02-03')
+    assert respuesta.status_code == 302
+    assert b'datos-hoja' not in respuesta.data
+
+
+def test_hoja_con_etag(cliente):
+    url = '/lista-asistencia?grupo_id=1&fecha=2025-02-03'
+    respuesta = cliente.get(url)
+    hoja = json.loads(re.search(rb'id="datos-hoja">(.*?)</script>', respuesta.data).group(1))
+    etag = respuesta.headers['ETag']
+    assert cliente.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+    # Una marca en la hoja cambia el ETag
+    cliente.post('/api/guardar-asistencia', json={'grupo_id': 1, 'fecha': '2025-02-03', 'alumnos': [
+        {'alumno_id': hoja['alumnos'][0][0], 'presente': True}]})
+    assert cliente.get(url, headers={'If-None-Match': etag}).status_code == 200
@@ -0,0 +1,54 @@
+import pytest
+
+from app import create_app, preparar_db
+from conftest import configuracion
+from db import get_pool
+from semillas import ADMIN_PASSWORD, ADMIN_USUARIO
+
+
+def _login(cliente, usuario=ADMIN_USUARIO, password=ADMIN_PASSWORD, ip=None):
+    encabezados = {'X-Forwarded-For': ip} if ip else {}
+    return cliente.post('/', data={'username': usuario, 'password': password}, headers=encabezados)
+
+
+def _hash(app):
+    with get_pool(app).connection() as conn:
+        return conn.execute('SELECT password FROM admin WHERE username = ?', (ADMIN_USUARIO,)).fetchone()[0]
+
+
+def test_login_recalcula_el_hash_con_el_metodo_configurado(app, anonimo):
+    assert not _hash(app).startswith('pbkdf2:sha256:1$')
+    assert _login(anonimo).status_code == 302
+    assert _hash(app).startswith('pbkdf2:sha256:1$')
+    # El hash nuevo sigue validando y ya no se reescribe
+    anterior = _hash(app)
+    assert _login(app.test_client()).status_code == 302
+    assert _hash(app) == anterior
+
+
+def test_bloqueo_por_usuario_tras_intentos_fallidos(app, anonimo):
+    for _ in range(app.config['LOGIN_MAX_INTENTOS_USUARIO']):
+        assert _login(anonimo, password='incorrecta').status_code == 200
+    bloqueado = _login(anonimo)
+    assert bloqueado.status_code == 429
+    assert int(bloqueado.headers['Retry-After']) > 0
+    # Otro usuario desde la misma IP todavía puede intentar
+    assert _login(anonimo, usuario='OTRO', password='x').status_code == 200
+
+
+@pytest.fixture
+def app_con_proxy(tmp_path):
+    app = create_app(configuracion(tmp_path, PROXIES_CONFIABLES=1, LOGIN_MAX_INTENTOS_IP=3))
+    preparar_db(app)
+    yield app
+    app.extensions['campus'].close_all()
+    get_pool(app).close_all()
+
+
+def test_detras_de_un_proxy_cuenta_la_ip_del_cliente(app_con_proxy):
+    cliente = app_con_proxy.test_client()
+    for numero in range(3):
+        _login(cliente, usuario=f'U{numero}', password='x', ip='203.0.113.7')
+    assert _login(cliente, ip='203.0.113.7').status_code == 429
+    # Todos llegan desde la IP del proxy, pero otro cliente no queda bloqueado
+    assert _login(cliente, ip='198.51.100.2').status_code == 302
@@ -0,0 +1,27 @@
+import pytest
+
+
+@pytest.mark.parametrize('valor', ['100', -1, True, [5], {'ms': 1}])
+def test_lento_ms_invalido(cliente, app, valor):
+    respuesta = cliente.post('/metrics/estado', json={'lento_ms': valor})
+    assert respuesta.status_code == 400
+    assert app.config['METRICAS_LENTO_MS'] is None
+
+
+@pytest.mark.parametrize('valor', [0, 250, 12.5, None])
+def test_lento_ms_valido(cliente, app, valor):
+    respuesta = cliente.post('/metrics/estado', json={'lento_ms': valor})
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['lento_ms'] == valor
+    # Con el valor guardado las peticiones siguientes no fallan
+    assert cliente.get('/health').status_code == 200
+
+
+def test_activas_debe_ser_booleano(cliente, app):
+    assert cliente.post('/metrics/estado', json={'activas': 'false'}).status_code == 400
+    assert app.config['METRICAS_ACTIVAS'] is True
+    assert cliente.post('/metrics/estado', json={'activas': False}).get_json()['activas'] is False
+
+
+def test_estado_requiere_sesion(anonimo):
+    assert anonimo.post('/metrics/estado', json={'activas': False}).status_code == 401
@@ -0,0 +1,67 @@
+import ast
+import os
+import subprocess
+import sys
+
+import migraciones
+from campus import PRINCIPAL
+from conftest import BASE_DIR
+from db import ConnectionPool
+from semillas import sembrar
+
+
+def test_migrar_dos_veces_no_cambia_nada(app):
+    campus = app.extensions['campus']
+    # preparar_db ya migró y sembró: la segunda pasada no aplica nada
+    assert campus.migrar(semillas=True) == {nombre: [] for nombre in campus.nombres()}
+    with campus.pool(PRINCIPAL).connection() as conn:
+        assert migraciones.version_actual(conn) == max(v for v, _, _ in migraciones.descubrir())
+        assert conn.execute('SELECT COUNT(*) FROM admin').fetchone()[0] == 1
+
+
+def test_migraciones_sobre_base_parcial(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'parcial.db'), size=1)
+    try:
+        with pool.connection() as conn:
+            todas = migraciones.descubrir()
+            migraciones.version_actual(conn)
+            # Una base que se quedó a medias (p. ej. un worker murió al migrar)
+            conn.execute('BEGIN IMMEDIATE')
+            for version, nombre, modulo in todas[:3]:
+                modulo.upgrade(conn)
+                conn.execute('INSERT INTO schema_version (version, nombre) VALUES (?, ?)', (version, nombre))
+            conn.commit()
+            aplicadas = migraciones.aplicar(conn)
+            sembrar(conn)
+            assert [v for v, _ in aplicadas] == [v for v, _, _ in todas[3:]]
+            assert migraciones.aplicar(conn) == []
+            assert conn.execute('SELECT COUNT(*) FROM admin').fetchone()[0] == 1
+            carreras = conn.execute('SELECT COUNT(*) FROM carreras').fetchone()[0]
+            sembrar(conn)
+            assert conn.execute('SELECT COUNT(*) FROM carreras').fetchone()[0] == carreras
+    finally:
+        pool.close_all()
+
+
+def test_importar_app_no_crea_hilos_ni_carpetas(tmp_path):
+    codigo = (
+        'import threading, app\n'
+        'assert threading.active_count() == 1, threading.enumerate()\n'
+        'assert app._app is None\n'
+    )
+    entorno = {**os.environ, 'DATABASE_PATH': str(tmp_path / 'db.db'),
+               'FLASK_REPORTES_FOLDER': str(tmp_path / 'reportes')}
+    subprocess.run([sys.executable, '-c', codigo], cwd=BASE_DIR, env=entorno, check=True)
+    assert os.listdir(tmp_path) == []
+
+
+def test_migraciones_no_importan_modulos_de_la_app():
+    modulos_app = {os.path.splitext(archivo)[0] for archivo in os.listdir(BASE_DIR) if archivo.endswith('.py')}
+    for _, nombre, modulo in migraciones.descubrir():
+        with open(modulo.__file__, encoding='utf-8') as f:
+            arbol = ast.parse(f.read())
+        importados = {alias.name.split('.')[0] for nodo in ast.walk(arbol) if isinstance(nodo, ast.Import)
+                      for alias in nodo.names}
+        importados |= {nodo.module.split('.')[0] for nodo in ast.walk(arbol)
+                       if isinstance(nodo, ast.ImportFrom) and nodo.module}
+        assert not importados & modulos_app, nombre
@@ -0,0 +1,51 @@
+import observaciones as obs
+from db import get_pool
+
+
+def _insertar(app, *filas):
+    with get_pool(app).connection() as conn, conn:
+        return [conn.execute('INSERT INTO observaciones (texto, fecha) VALUES (?, ?)', fila).lastrowid
+                for fila in filas]
+
+
+def test_busqueda_por_prefijo_sin_acentos_y_con_html_escapado(app, cliente):
+    riego, _, plaga = _insertar(app,
+                                ('Revisión del <b>riego</b> automático', '2025-01-01 08:00:00'),
+                                ('Cosecha de lechuga', '2025-01-02 08:00:00'),
+                                ('Plaga en el riego & bomba', '2025-01-03 08:00:00'))
+    items = cliente.get('/api/observaciones/buscar?q=rieg').get_json()['items']
+    assert [i['id'] for i in items] == [plaga, riego]
+    assert '&lt;b&gt;<mark>riego</mark>&lt;/b&gt;' in items[1]['fragmento']
+    assert '&amp;' in items[0]['fragmento']
+    # Sin distinguir acentos; la sintaxis FTS que escriba el usuario es texto literal
+    assert [i['id'] for i in cliente.get('/api/observaciones/buscar?q=revision').get_json()['items']] == [riego]
+    assert cliente.get('/api/observaciones/buscar?q=riego" OR "x').status_code == 200
+    assert cliente.get('/api/observaciones/buscar?q=***').get_json()['items'] == []
+
+
+def test_busqueda_paginada_por_id(app, cliente):
+    ids = _insertar(app, *[(f'Nota de riego {n}', '2025-01-01 08:00:00') for n in range(5)])
+    vistos, cursor = [], None
+    while True:
+        url = '/api/observaciones/buscar?q=riego&limite=2' + (f'&cursor={cursor}' if cursor else '')
+        datos = cliente.get(url).get_json()
+        vistos += [i['id'] for i in datos['items']]
+        cursor = datos['siguiente']
+        if cursor is None:
+            break
+    assert vistos == sorted(ids, reverse=True)
+    assert cliente.get('/api/observaciones/buscar?q=riego&cursor=abc').status_code == 400
+
+
+def test_pagina_por_fecha_e_id_sin_saltos(app):
+    # Varias observaciones con la misma fecha: el id desempata
+    ids = _insertar(app, *[(f'Nota {n}', f'2025-01-0{1 + n // 3} 08:00:00') for n in range(7)])
+    with get_pool(app).connection() as conn:
+        vistos, cursor = [], None
+        while True:
+            filas, cursor = obs.pagina(conn, cursor, limite=3)
+            vistos += [f['id'] for f in filas]
+            if cursor is None:
+                break
+    assert len(vistos) == len(set(vistos))
+    assert [i for i in vistos if i in ids] == ids[::-1]
@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import pdf_asistencia
+from pdf_asistencia import GeneradorPDF
+
+DATOS = {'id': 1, 'fecha': '2025-01-15', 'grupo': 'G', 'carrera': 'C', 'alumnos': [],
+         'presentes': 0, 'total': 0, 'porcentaje': 0}
+
+
+class Inmediato:
+    """Ejecutor que devuelve el futuro ya resuelto, como cuando el trabajo termina antes del callback."""
+
+    def submit(self, funcion, *args):
+        futuro = Future()
+        futuro.set_result(funcion(*args))
+        return futuro
+
+
+def test_peticiones_simultaneas_comparten_un_trabajo(tmp_path, monkeypatch):
+    llamadas = []
+    original = pdf_asistencia.dibujar
+
+    def lento(datos):
+        llamadas.append(datos)
+        time.sleep(0.2)
+        return original(datos)
+
+    monkeypatch.setattr(pdf_asistencia, 'dibujar', lento)
+    generador = GeneradorPDF(str(tmp_path), trabajadores=4)
+    futuros = [generador.solicitar(1, DATOS, 'abc') for _ in range(5)]
+    assert all(f is futuros[0] for f in futuros)
+    assert futuros[0].result(timeout=5) == generador.ruta(1, 'abc')
+    assert len(llamadas) == 1
+    # Ya en disco: una solicitud nueva no vuelve a dibujar
+    generador.solicitar(1, DATOS, 'abc').result(timeout=5)
+    assert len(llamadas) == 1
+
+
+def test_futuro_ya_terminado_no_bloquea(tmp_path):
+    generador = GeneradorPDF(str(tmp_path))
+    generador._pool = Inmediato()
+    hilo = threading.Thread(target=generador.solicitar, args=(1, DATOS, 'abc'), daemon=True)
+    hilo.start()
+    hilo.join(timeout=5)
+    assert not hilo.is_alive()
+    assert generador._en_curso == {}
+
+
+def test_cache_separada_por_campus(tmp_path):
+    generador = GeneradorPDF(str(tmp_path))
+    principal = generador.solicitar(1, DATOS, 'aaa').result(timeout=5)
+    norte = generador.solicitar(1, DATOS, 'bbb', campus='norte').result(timeout=5)
+    assert principal != norte
+    # Regenerar el PDF 1 del campus norte no borra el del principal
+    generador.solicitar(1, DATOS, 'ccc', campus='norte').result(timeout=5)
+    assert (tmp_path / 'asistencia_1_aaa.pdf').exists()
+    assert not (tmp_path / 'campus' / 'norte' / 'asistencia_1_bbb.pdf').exists()
+
+
+def test_ruta_pdf_con_etag(cliente):
+    alumnos = cliente.get('/api/alumnos/1').json
+    asistencia_id = cliente.post('/api/guardar-asistencia', json={
+        'grupo_id': 1, 'fecha': '2025-01-15', 'alumnos': [{'id': a['id'], 'presente': True} for a in alumnos]
+    }).json['asistencia_id']
+    respuesta = cliente.get(f'/generar-pdf-asistencia/{asistencia_id}')
+    assert respuesta.status_code == 200
+    assert respuesta.data.startswith(b'%PDF')
+    assert cliente.get(f'/generar-pdf-asistencia/{asistencia_id}',
+                       headers={'If-None-Match': respuesta.headers['ETag']}).status_code == 304
+
+
+def test_ruta_pdf_requiere_sesion(app, anonimo):
+    assert anonimo.get('/generar-pdf-asistencia/1').status_code == 401
+    assert not os.path.exists(app.config['PDF_CACHE_FOLDER']) or not os.listdir(app.config['PDF_CACHE_FOLDER'])
@@ -0,0 +1,74 @@
+import pytest
+
+from proyectos import a_numero
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('1.200', 1200.0),
+    ('1,200', 1200.0),
+    ('1.200.000', 1200000.0),
+    ('1.200,50', 1200.5),
+    ('1,200.50', 1200.5),
+    ('$12,500.00', 12500.0),
+    ('12,5', 12.5),
+    ('12.5', 12.5),
+    ('0.500', 0.5),
+    ('45%', 45.0),
+    ('', None),
+])
+def test_a_numero(texto, esperado):
+    assert a_numero(texto) == esperado
+
+
+def _version(cliente, proyecto_id=1):
+    return cliente.get(f'/get-proyecto/{proyecto_id}').get_json()['version']
+
+
+def test_avance_vacio_es_invalido(cliente):
+    respuesta = cliente.post('/actualizar-proyecto/1', json={'avance': ''})
+    assert respuesta.status_code == 400
+    assert 'avance' in respuesta.get_json()['error']
+
+
+def test_bloqueo_optimista(cliente):
+    version = _version(cliente)
+    primera = cliente.post('/actualizar-proyecto/1', json={'avance': '30%', 'version': version})
+    assert primera.status_code == 200
+    assert primera.get_json()['version'] == version + 1
+
+    # Segunda edición con la versión que se leyó antes del primer cambio
+    conflicto = cliente.post('/actualizar-proyecto/1', json={'avance': 50, 'version': version})
+    assert conflicto.status_code == 409
+    assert conflicto.get_json()['conflictos'] == [{'id': 1, 'version_actual': version + 1}]
+
+    lote = cliente.post('/api/proyectos/lote', json={'proyectos': [
+        {'id': 1, 'version': version + 1, 'avance': 60},
+        {'id': 2, 'version': _version(cliente, 2) + 5, 'avance': 60},
+    ]})
+    assert lote.status_code == 409
+    # El lote es atómico: el proyecto 1 tampoco cambió
+    assert _version(cliente) == version + 1
+
+
+def test_cambio_sin_diferencias_no_avanza_la_version(cliente):
+    proyecto = cliente.get('/get-proyecto/1').get_json()
+    mismo = cliente.post('/actualizar-proyecto/1', json={
+        'descripcion': proyecto['descripcion'], 'version': proyecto['version']})
+    assert mismo.status_code == 200
+    assert mismo.get_json()['version'] == proyecto['version']
+
+    distinto = cliente.post('/actualizar-proyecto/1', json={
+        'descripcion': 'Otra descripción', 'version': proyecto['version']})
+    assert distinto.get_json()['version'] == proyecto['version'] + 1
+
+
+def test_proyecto_inexistente(cliente):
+    respuesta = cliente.post('/actualizar-proyecto/9999', json={'avance': 10})
+    assert respuesta.status_code == 404
+
+    lote = cliente.post('/api/proyectos/lote', json={'proyectos': [
+        {'id': 1, 'version': _version(cliente), 'avance': 10},
+        {'id': 9999, 'version': 1, 'avance': 10},
+    ]})
+    assert lote.status_code == 404
+    assert lote.get_json()['ids'] == [9999]
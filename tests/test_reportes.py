@@ -0,0 +1,50 @@
+import time
+
+from db import get_pool
+from trabajos_reporte import cerrar_interrumpidos
+
+
+def test_reportes_requieren_sesion(anonimo):
+    assert anonimo.post('/generar-reporte').status_code == 401
+    assert anonimo.post('/generar-reporte/1').status_code == 401
+    assert anonimo.get('/api/trabajos-reporte/abc').status_code == 401
+
+
+def test_generar_reporte(cliente):
+    respuesta = cliente.post('/generar-reporte/1')
+    assert respuesta.status_code == 202
+    for _ in range(100):
+        trabajo = cliente.get(respuesta.get_json()['estado_url']).get_json()
+        if trabajo['estado'] in ('terminado', 'error'):
+            break
+        time.sleep(0.05)
+    assert trabajo['estado'] == 'terminado', trabajo
+    assert len(trabajo['reportes']) == 1
+
+
+def test_trabajos_interrumpidos_quedan_en_error(app):
+    with get_pool(app).connection() as conn:
+        with conn:
+            conn.executemany("INSERT INTO trabajos_reporte (id, estado) VALUES (?, ?)",
+                             [('a', 'pendiente'), ('b', 'en_proceso'), ('c', 'terminado')])
+        assert cerrar_interrumpidos(conn) == 2
+        estados = dict(conn.execute('SELECT id, estado FROM trabajos_reporte'))
+    assert estados == {'a': 'error', 'b': 'error', 'c': 'terminado'}
+
+
+def test_descargar_y_eliminar_requieren_sesion(app, anonimo, cliente):
+    respuesta = cliente.post('/generar-reporte/1')
+    for _ in range(100):
+        trabajo = cliente.get(respuesta.get_json()['estado_url']).get_json()
+        if trabajo['estado'] == 'terminado':
+            break
+        time.sleep(0.05)
+    reporte_id = trabajo['reportes'][0]['id']
+
+    assert anonimo.get(f'/descargar-reporte/{reporte_id}').status_code == 401
+    assert anonimo.delete(f'/eliminar-reporte/{reporte_id}').status_code == 401
+    with get_pool(app).connection() as conn:
+        # El DELETE anónimo no bajó la cuenta de referencias del objeto
+        assert conn.execute('SELECT referencias FROM objetos_reporte').fetchone()[0] == 1
+    assert cliente.get(f'/descargar-reporte/{reporte_id}').status_code == 200
+    assert cliente.delete(f'/eliminar-reporte/{reporte_id}').status_code == 200
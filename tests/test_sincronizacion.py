@@ -0,0 +1,66 @@
+import json
+import re
+
+
+def _hoja(cliente, fecha='2025-02-03'):
+    respuesta = cliente.get(f'/lista-asistencia?grupo_id=1&fecha={fecha}')
+    return json.loads(re.search(rb'id="datos-hoja">(.*?)</script>', respuesta.data).group(1))
+
+
+def _sync(cliente, token, *marcas):
+    respuesta = cliente.post('/api/sync-asistencia', json={'token': token, 'grupo_id': 1, 'cambios': [
+        {'grupo_id': 1, 'fecha': '2025-02-03', 'alumno_id': alumno_id, 'presente': presente, 'marcado_en': hora}
+        for alumno_id, presente, hora in marcas
+    ]})
+    assert respuesta.status_code == 200, respuesta.get_json()
+    return respuesta.get_json()
+
+
+def test_gana_la_marca_mas_reciente(cliente):
+    alumno_id = _hoja(cliente)['alumnos'][0][0]
+    _sync(cliente, None, (alumno_id, True, '2025-02-03T08:05:00Z'))
+    # Un dispositivo que estuvo sin conexión envía una marca anterior: no gana
+    _sync(cliente, None, (alumno_id, False, '2025-02-03T08:00:00Z'))
+    presentes = {a[0]: a[3] for a in _hoja(cliente)['alumnos']}
+    assert presentes[alumno_id]
+    # Reenviar la misma marca no genera cambios para nadie
+    token = _hoja(cliente)['token']
+    _sync(cliente, None, (alumno_id, True, '2025-02-03T08:05:00Z'))
+    assert _sync(cliente, token)['cambios'] == []
+
+
+def test_la_pagina_recibe_su_token(cliente):
+    pagina = _hoja(cliente)
+    alumno_id = pagina['alumnos'][0][0]
+    # Otro dispositivo marca después de que la página se cargó y antes de su
+    # primera sincronización: la página lo recibe con el token de la hoja
+    _sync(cliente, None, (alumno_id, True, '2025-02-03T09:00:00Z'))
+    primera = _sync(cliente, pagina['token'])
+    assert [(c['alumno_id'], c['presente']) for c in primera['cambios']] == [(alumno_id, 1)]
+    assert _sync(cliente, primera['token'])['cambios'] == []
+    # Sin token (el service worker) sólo se envían marcas
+    assert _sync(cliente, None)['cambios'] == []
+
+
+def test_service_worker_precarga_urls_versionadas(cliente):
+    respuesta = cliente.get('/sw.js')
+    recursos = json.loads(re.match(rb'const RECURSOS = (.*?);\n', respuesta.data).group(1))
+    assert set(recursos) == {'css/lista_asistencia.css', 'js/lista_asistencia.js', 'js/cola_asistencia.js'}
+    assert all(re.search(r'\?v=[0-9a-f]{12}$', url) for url in recursos.values())
+    assert cliente.get('/sw.js', headers={'If-None-Match': respuesta.headers['ETag']}).status_code == 304
+
+
+def test_solo_cuentan_y_se_publican_las_marcas_que_cambian(cliente, app):
+    broker = app.extensions['eventos']
+    alumno_id = _hoja(cliente)['alumnos'][0][0]
+    assert _sync(cliente, None, (alumno_id, True, '2025-02-03T08:05:00Z'))['aceptados'] == 1
+    publicados = broker.publicados
+
+    # Marca anterior (pierde), reenvío idéntico y mismo valor con hora nueva
+    assert _sync(cliente, None, (alumno_id, False, '2025-02-03T08:00:00Z'))['aceptados'] == 0
+    assert _sync(cliente, None, (alumno_id, True, '2025-02-03T08:05:00Z'))['aceptados'] == 0
+    assert _sync(cliente, None, (alumno_id, True, '2025-02-03T08:10:00Z'))['aceptados'] == 0
+    assert broker.publicados == publicados
+
+    assert _sync(cliente, None, (alumno_id, False, '2025-02-03T08:15:00Z'))['aceptados'] == 1
+    assert broker.publicados == publicados + 1
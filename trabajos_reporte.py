@@ -0,0 +1,127 @@
+import json
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from db import get_pool
+
+
+# --- Cola de trabajos de reportes ---
+# Los trabajos se registran en la tabla trabajos_reporte para que el estado
+# se pueda consultar desde cualquier proceso; el render ocurre en un pool de
+# hilos fuera del hilo de la petición. La tabla la crea
+# migraciones/0003_trabajos_reporte.py.
+
+
+def cerrar_interrumpidos(conn):
+    """Marca como error los trabajos que quedaron a medias en un proceso anterior.
+
+    La cola vive en memoria: un trabajo 'pendiente' o 'en_proceso' al arrancar
+    ya no lo va a terminar nadie. Se llama una sola vez antes de atender
+    peticiones (servidor.preparar_base, app.preparar_db), nunca por worker.
+    """
+    with conn:
+        return conn.execute('''
+            UPDATE trabajos_reporte
+            SET estado = 'error', error = 'Interrumpido por un reinicio del servidor',
+                terminado = CURRENT_TIMESTAMP
+            WHERE estado IN ('pendiente', 'en_proceso')
+        ''').rowcount
+
+
+def renderizar(proyecto, fecha):
+    # El contenido no incluye la hora para que dos reportes del mismo día con
+    # los mismos datos produzcan el mismo archivo.
+    return (
+        f"Reporte del proyecto: {proyecto['nombre']}\n"
+        f"Estado: {proyecto['estado']}\n"
+        f"Avance: {proyecto['avance']:g}%\n"
+        f"Fecha: {fecha}\n"
+    )
+
+
+class ColaReportes:
+    def __init__(self, app, almacen, trabajadores=2, eventos=None):
+        self.app = app
+        self.almacen = almacen
+        self.eventos = eventos
+        self._pool = ThreadPoolExecutor(max_workers=trabajadores, thread_name_prefix='reportes')
+
+    def encolar(self, conn, proyecto_id=None):
+        """Registra un trabajo (un proyecto o todos si es None) y lo envía al pool."""
+        trabajo_id = uuid.uuid4().hex
+        with conn:
+            conn.execute('INSERT INTO trabajos_reporte (id, proyecto_id) VALUES (?, ?)',
+                         (trabajo_id, proyecto_id))
+        self._pool.submit(self._ejecutar, trabajo_id, proyecto_id)
+        return trabajo_id
+
+    def estado(self, conn, trabajo_id):
+        trabajo = conn.execute('SELECT * FROM trabajos_reporte WHERE id = ?', (trabajo_id,)).fetchone()
+        if trabajo is None:
+            return None
+        datos = dict(trabajo)
+        ids = json.loads(datos.pop('reportes') or '[]')
+        datos['reportes'] = [dict(r) for r in conn.execute(f'''
+            SELECT r.id, r.nombre_archivo, p.nombre AS proyecto_nombre
+            FROM reportes r JOIN proyectos p ON p.id = r.proyecto_id
+            WHERE r.id IN ({','.join('?' * len(ids))})
+            ORDER BY r.proyecto_id
+        ''', ids)] if ids else []
+        return datos
+
+    def _ejecutar(self, trabajo_id, proyecto_id):
+        with get_pool(self.app).connection() as conn:
+            try:
+                with conn:
+                    conn.execute("UPDATE trabajos_reporte SET estado = 'en_proceso' WHERE id = ?",
+                                 (trabajo_id,))
+                reporte_ids = self._generar(conn, proyecto_id)
+                with conn:
+                    conn.execute('''
+                        UPDATE trabajos_reporte
+                        SET estado = 'terminado', reportes = ?, terminado = CURRENT_TIMESTAMP
+                        WHERE id = ?
+                    ''', (json.dumps(reporte_ids), trabajo_id))
+                if self.eventos is not None:
+                    self.eventos.publicar('reporte', {
+                        'trabajo_id': trabajo_id, 'proyecto_id': proyecto_id, 'reportes': reporte_ids,
+                    })
+            except Exception as e:
+                with conn:
+                    conn.execute('''
+                        UPDATE trabajos_reporte
+                        SET estado = 'error', error = ?, terminado = CURRENT_TIMESTAMP
+                        WHERE id = ?
+                    ''', (str(e), trabajo_id))
+
+    def _generar(self, conn, proyecto_id):
+        if proyecto_id is None:
+            proyectos = conn.execute('SELECT * FROM proyectos ORDER BY id').fetchall()
+        else:
+            proyectos = conn.execute('SELECT * FROM proyectos WHERE id = ?', (proyecto_id,)).fetchall()
+            if not proyectos:
+                raise LookupError("Proyecto no encontrado")
+
+        hoy = datetime.now()
+        reporte_ids = []
+        for proyecto in proyectos:
+            contenido = renderizar(proyecto, hoy.strftime('%Y-%m-%d')).encode('utf-8')
+            digest, _ = self.almacen.guardar(contenido)
+            nombre_seguro = re.sub(r'[^\w-]+', '_', proyecto['nombre']).strip('_')
+            nombre_archivo = f"reporte_{nombre_seguro}_{hoy.strftime('%Y%m%d')}_{digest[:12]}.txt"
+
+            # Mismo contenido => mismo hash: se reutiliza el registro existente
+            with conn:
+                self.almacen.asegurar(conn, digest, contenido)
+                conn.execute('''
+                    INSERT INTO reportes (proyecto_id, nombre_archivo, ruta_archivo, tipo, hash)
+                    SELECT ?, ?, ?, 'texto', ?
+                    WHERE NOT EXISTS (SELECT 1 FROM reportes WHERE hash = ? AND proyecto_id = ?)
+                ''', (proyecto['id'], nombre_archivo, self.almacen.relativa(digest), digest,
+                      digest, proyecto['id']))
+                reporte_ids.append(conn.execute(
+                    'SELECT MIN(id) FROM reportes WHERE hash = ? AND proyecto_id = ?', (digest, proyecto['id'])
+                ).fetchone()[0])
+        return reporte_ids